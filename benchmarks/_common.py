@@ -0,0 +1,84 @@
+"""Shared helpers for the benchmark scripts.
+
+The scripts are run from the repository root, e.g.
+`python benchmarks/bench_serial_reader.py`. This module puts `src/` and
+`tools/` on the import path so the application modules and the device
+emulator can be imported unchanged.
+"""
+
+import os
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "tools"))
+for _path in (SRC_DIR, TOOLS_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+
+def open_pty_serial(timeout):
+    """Open a pty pair and return (master_fd, serial port on the slave side).
+
+    Linux/macOS only. Bytes written to `master_fd` arrive at the returned
+    `serial.Serial` exactly as they would from a USB-serial adapter.
+    """
+    import serial
+
+    master_fd, slave_fd = os.openpty()
+    port = serial.Serial(os.ttyname(slave_fd), timeout=timeout)
+    os.close(slave_fd)
+    return master_fd, port
+
+
+class FakeSerial:
+    """In-memory stand-in for `serial.Serial` that replays a byte string.
+
+    `read` hands out at most `chunk_size` bytes per call, like a driver
+    buffer filling up between reads, and blocks for `timeout` once the
+    data is exhausted.
+    """
+
+    def __init__(self, data, chunk_size=4096, timeout=0.01):
+        self._data = memoryview(data)
+        self._pos = 0
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.is_open = True
+
+    @property
+    def in_waiting(self):
+        return min(self.chunk_size, len(self._data) - self._pos)
+
+    def read(self, size=1):
+        if self._pos >= len(self._data):
+            time.sleep(self.timeout)
+            return b""
+        size = min(size, self.chunk_size)
+        chunk = self._data[self._pos : self._pos + size].tobytes()
+        self._pos += len(chunk)
+        return chunk
+
+    def write(self, data):
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+
+def make_connection(cls, dispatcher_callback=None, update_terminal_callback=None):
+    """Create a `USBConnection` (or subclass) without touching a real port."""
+    conn = cls(
+        update_terminal_callback=update_terminal_callback or (lambda msg: None),
+        dispatcher_callback=dispatcher_callback or (lambda msg: None),
+    )
+    return conn
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers (nearest rank)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
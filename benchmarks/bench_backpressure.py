@@ -0,0 +1,123 @@
+"""Receive queue behaviour while the GUI side stalls.
+
+Streams synthetic TUNNEL or DATA lines through `USBConnection` with a fake
+serial port while the dispatcher blocks for `--stall` seconds (like a slow
+`plot_trisurf` redraw), then lets it catch up. Reports the peak number of
+queued lines, the Python heap peak (tracemalloc) and what was dropped or
+spilled, for the unbounded `queue.Queue` and each `ReceiveQueue` policy.
+
+The stream has a `<KIND>,DONE` marker every `--cycle` lines; every marker
+has to arrive under every policy (exit code 1 otherwise), since a lost
+TUNNEL,DONE stalls the tunnel loop.
+
+Usage: python benchmarks/bench_backpressure.py [--lines 500000] [--kind tunnel]
+"""
+
+import argparse
+import queue
+import threading
+import time
+import tracemalloc
+
+import _common
+from receive_queue import POLICIES, ReceiveQueue
+from usb_connection import USBConnection
+
+
+class UnboundedQueue(queue.Queue):
+    """The original unbounded `queue.Queue` with the ReceiveQueue counters."""
+
+    policy = "unbounded"
+    dropped = {}
+    dropped_total = 0
+    spilled = 0
+
+    def close(self):
+        pass
+
+
+def make_stream(kind, count, cycle):
+    """Stream bytes and the number of DONE markers in it."""
+    if kind == "tunnel":
+        lines = [f"TUNNEL,1,{(i * 37) % 2000 - 1000},{i % 65536}\n" for i in range(count)]
+    else:
+        lines = [f"DATA,{i % 200},{(i // 200) % 200},{(i * 7919) & 0xFFFF}\n" for i in range(count)]
+    done = f"{kind.upper()},DONE\n"
+    out = []
+    for start in range(0, count, cycle):
+        out.extend(lines[start:start + cycle])
+        out.append(done)
+    return ("".join(out) + "IDLE\n").encode(), len(out) - count
+
+
+def run(data_queue, data, stall):
+    done = threading.Event()
+    release = time.perf_counter() + stall
+    delivered = [0]
+    markers = [0]
+    peak = [0]
+
+    def dispatcher(messages):
+        delivered[0] += len(messages)
+        markers[0] += sum(1 for m in messages if m.endswith(",DONE"))
+        while time.perf_counter() < release:
+            peak[0] = max(peak[0], conn.data_queue.qsize())
+            time.sleep(0.01)
+        if messages[-1] == "IDLE":
+            done.set()
+
+    conn = _common.make_connection(USBConnection, dispatcher_callback=dispatcher)
+    conn.data_queue = data_queue
+    conn.connection = _common.FakeSerial(data)
+    conn.is_connected = True
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    conn.start_receiving()
+    done.wait(timeout=600)
+    elapsed = time.perf_counter() - t0
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    conn.close_connection()
+    return delivered[0], markers[0], peak[0], heap_peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--kind", choices=("tunnel", "data"), default="tunnel")
+    parser.add_argument("--stall", type=float, default=1.0, help="seconds")
+    parser.add_argument("--max-lines", type=int, default=50_000, help="queue bound")
+    parser.add_argument("--cycle", type=int, default=100, help="lines per DONE marker")
+    args = parser.parse_args()
+
+    data, sent_markers = make_stream(args.kind, args.lines, args.cycle)
+    print(f"{args.lines} {args.kind.upper()} lines, {sent_markers} DONE markers, "
+          f"dispatcher stalls {args.stall} s")
+    print(f"{'queue':<14} {'delivered':>9} {'DONE':>6} {'peak':>8} {'heap MB':>8} "
+          f"{'dropped':>8} {'spilled':>8} {'s':>6}")
+    failed = []
+
+    variants = [("unbounded", UnboundedQueue)]
+    for policy in POLICIES:
+        variants.append(
+            (policy, lambda p=policy: ReceiveQueue(max_lines=args.max_lines, policy=p))
+        )
+    for name, factory in variants:
+        data_queue = factory()
+        delivered, markers, peak, heap, elapsed = run(data_queue, data, args.stall)
+        if markers != sent_markers:
+            failed.append(name)
+        dropped = data_queue.dropped_total
+        spilled = data_queue.spilled
+        if isinstance(data_queue, queue.Queue):
+            peak = f"{peak}*"  # chunks, queue.Queue does not count lines
+        print(
+            f"{name:<14} {delivered:>9} {markers:>6} {peak:>8} {heap / 1e6:>8.1f} "
+            f"{dropped:>8} {spilled:>8} {elapsed:>6.2f}"
+        )
+    if failed:
+        raise SystemExit(f"DONE markers lost with: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
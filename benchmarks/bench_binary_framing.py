@@ -0,0 +1,102 @@
+"""End-to-end check and cost of the binary DATA framing.
+
+Runs a full MEASURE raster from the pty device emulator through
+`USBConnection` three times:
+
+- text:     firmware and host use the text protocol
+- binary:   FORMAT,BINARY handshake succeeds, points arrive as records
+- fallback: the firmware ignores the handshake, host stays on text
+- late:     the firmware answers after the handshake timed out and then
+            sends records; the host re-sends FORMAT,BINARY and must still
+            decode every point
+
+Each run checks that every point arrived with the right values and
+reports bytes per point and the time the stream would take on the wire
+at 460800 baud (10 bits per byte).
+
+Usage: python benchmarks/bench_binary_framing.py [--size 200]
+"""
+
+import argparse
+import threading
+import time
+
+import _common
+from rtm_emulator import RTMEmulator
+from usb_connection import USBConnection
+
+BAUD = 460800
+
+
+def surface(x, y):
+    return (x * 131 + y * 257) & 0xFFFF
+
+
+def run(size, firmware_binary, want_binary, format_delay=0.0):
+    emu = RTMEmulator(binary=firmware_binary, format_delay=format_delay, surface=surface)
+    emu.parameters.update(maxX=str(size - 1), maxY=str(size - 1))
+    emu.start()
+    done = threading.Event()
+    points = []
+
+    def dispatcher(lines):
+        for line in lines:
+            if line == "DATA,DONE":
+                done.set()
+            elif line.startswith("DATA,"):
+                points.append(line)
+
+    conn = _common.make_connection(USBConnection, dispatcher_callback=dispatcher)
+    conn.port = emu.port
+    try:
+        if not conn.establish_connection():
+            raise SystemExit(f"cannot open {emu.port}")
+        conn.start_receiving()
+        negotiated = conn.negotiate_binary() if want_binary else False
+        start_bytes = emu.bytes_sent
+        t0 = time.perf_counter()
+        conn.write_command("MEASURE")
+        if not done.wait(timeout=120):
+            raise SystemExit("timeout waiting for DATA,DONE")
+        elapsed = time.perf_counter() - t0
+        wire = emu.bytes_sent - start_bytes
+    finally:
+        conn.close_connection()
+        emu.stop()
+
+    expected = [
+        f"DATA,{x},{y},{surface(x, y)}"
+        for y in range(size)
+        for x in range(size)
+    ]
+    assert points == expected, f"{len(points)} of {len(expected)} points match"
+    errors = getattr(conn.decoder, "crc_errors", 0) + getattr(conn.decoder, "lost", 0)
+    # the late answer is confirmed while the scan runs
+    return negotiated or conn.binary_mode, wire, elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200)
+    args = parser.parse_args()
+    n = args.size * args.size
+
+    print(
+        f"{'mode':<9} {'binary':>6} {'bytes/pt':>8} {'wire s':>7} "
+        f"{'host s':>7} {'errors':>6}"
+    )
+    for name, firmware_binary, want_binary, delay in (
+        ("text", True, False, 0.0),
+        ("binary", True, True, 0.0),
+        ("fallback", False, True, 0.0),
+        ("late", True, True, 1.0),
+    ):
+        negotiated, wire, elapsed, errors = run(args.size, firmware_binary, want_binary, delay)
+        print(
+            f"{name:<9} {str(negotiated):>6} {wire / n:>8.2f} "
+            f"{wire * 10 / BAUD:>7.2f} {elapsed:>7.2f} {errors:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Dispatch throughput: original if/elif chain vs. the message router.
+
+Routes a stream of DATA/TUNNEL/ADJUST/PARAMETER lines, arriving in runs
+of random length like the device sends them, through
+`MasterGui`'s dispatcher with stub apps (no Tk widgets) and reports
+messages/second for both implementations. Checks first that a DONE marker
+in the middle of a run reaches the batch handler after the records before
+it and before the records after it.
+
+Usage: python benchmarks/bench_dispatch.py [--lines 500000]
+"""
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+import _common  # noqa: F401
+import main
+from legacy import legacy_dispatch
+from message_router import MessageRouter
+from packet_parser import parse_tunnel_lines
+from pipeline_metrics import PipelineMetrics
+from terminal_filter import TerminalFilter
+
+
+class StubApp:
+    is_active = True
+
+    def __init__(self):
+        self.count = 0
+
+    def update_data(self, message):
+        self.count += 1
+
+    def update_batch(self, lines, parsed):
+        records, others = parsed
+        self.count += len(records) + len(others)
+
+    def redraw_plot(self):
+        pass
+
+
+def make_messages(count, rng, max_run):
+    kinds = (
+        [lambda i: f"DATA,{i % 200},{(i // 200) % 200},{i & 0xFFFF}"] * 14
+        + [lambda i: f"TUNNEL,{i & 1},{(i * 31) & 0xFFFF},{i & 0xFFFF}"] * 4
+        + [lambda i: f"ADJUST,1.234,{i % 50},{i & 0x7FFF}"]
+        + [lambda i: "PARAMETER,measureMs,10"]
+    )
+    messages = []
+    while len(messages) < count:
+        kind = rng.choice(kinds)
+        run = rng.randint(1, max_run)
+        messages.extend(kind(len(messages) + j) for j in range(run))
+    return messages[:count]
+
+
+def make_gui():
+    gui = main.MasterGui.__new__(main.MasterGui)
+    gui.parameters = {"startX": "0"}
+    gui.idle_received = False
+    gui.target_adc = gui.tolerance_adc = 0
+    gui.update_terminal = lambda msg: None
+    gui.metrics = PipelineMetrics()
+    gui.terminal_filter = TerminalFilter()
+    gui._init_dispatch()
+    return gui
+
+
+def bench_legacy(messages, batch):
+    gui = make_gui()
+    app = StubApp()
+    gui.app_manager = SimpleNamespace(
+        app_frame=SimpleNamespace(),
+        get_adjust_app=lambda: app,
+        get_parameter_app=lambda: app,
+        get_tunnel_app=lambda: app,
+        get_measure_app=lambda: app,
+    )
+    t0 = time.perf_counter()
+    for i in range(0, len(messages), batch):
+        legacy_dispatch(gui, messages[i : i + batch])
+    return time.perf_counter() - t0, app.count
+
+
+def bench_router(messages, batch):
+    gui = make_gui()
+    app = StubApp()
+    gui.router.register_batch("DATA", app.update_batch)
+    gui.router.register_batch("TUNNEL", app.update_batch)
+    gui.router.register("ADJUST", app.update_data)
+    gui.router.register("PARAMETER", app.update_data)
+    t0 = time.perf_counter()
+    for i in range(0, len(messages), batch):
+        gui.dispatch_received_data(messages[i : i + batch])
+    return time.perf_counter() - t0, app.count
+
+
+def check_done_order():
+    """Records and DONE markers of one run arrive in stream order."""
+    events = []
+
+    def handler(lines, parsed):
+        records, others = parsed
+        events.extend(int(r["z"]) for r in records)
+        events.extend(others)
+
+    router = MessageRouter()
+    router.set_parser("TUNNEL", parse_tunnel_lines)
+    router.register_batch("TUNNEL", handler)
+    for size in (3, 40):  # per-line and vectorized parser path
+        events.clear()
+        lines = [f"TUNNEL,1,100,{z}" for z in range(size)]
+        router.dispatch(lines + ["TUNNEL,DONE"] + lines + ["TUNNEL,DONE"])
+        expected = list(range(size)) + ["TUNNEL,DONE"]
+        assert events == expected * 2, "DONE marker out of order"
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--max-run", type=int, default=200, help="longest same-type run")
+    args = parser.parse_args()
+
+    check_done_order()
+    messages = make_messages(args.lines, random.Random(1), args.max_run)
+    print(f"{'dispatch':<10} {'handled':>9} {'seconds':>8} {'msgs/s':>11}")
+    for name, fn in (("if/elif", bench_legacy), ("router", bench_router)):
+        elapsed, handled = fn(messages, args.batch)
+        print(f"{name:<10} {handled:>9} {elapsed:>8.2f} {args.lines / elapsed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main_()
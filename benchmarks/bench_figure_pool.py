@@ -0,0 +1,80 @@
+"""Opening and closing plot panes: pyplot figures vs `FigurePool`.
+
+Opens and closes a tunnel-like pane `--opens` times (axes, a scatter
+and a full draw on an off-screen Agg canvas, no Tk needed):
+
+- pyplot: `plt.subplots()` and a new canvas per open, nothing closed
+  when the pane goes away (the original behaviour).
+- pool: `FigurePool.acquire()` on open, `release_all()` on close, as
+  `AppManager._clear_app_frame` does.
+
+Reports the time per open, the RSS growth, the figures still held by
+pyplot and the pool's live figure/canvas counts.
+
+Usage: python benchmarks/bench_figure_pool.py [--opens 200]
+"""
+
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+import _common  # noqa: E402, F401
+from gui.figure_pool import FigurePool  # noqa: E402
+from soak_tunnel import rss_mb  # noqa: E402
+
+
+def draw_pane(fig, canvas):
+    ax = fig.add_subplot(111)
+    x = np.arange(200)
+    ax.scatter(x, np.sin(x / 10.0), marker="o")
+    ax.set_xlim(0, 200)
+    canvas.draw()
+
+
+def run_pyplot(opens):
+    times = []
+    for _ in range(opens):
+        t0 = time.perf_counter()
+        fig, _ = plt.subplots()
+        fig.clear()
+        draw_pane(fig, FigureCanvasAgg(fig))
+        times.append(time.perf_counter() - t0)
+    return times, None
+
+
+def run_pool(opens):
+    pool = FigurePool(None, canvas_class=FigureCanvasAgg)
+    times = []
+    for _ in range(opens):
+        t0 = time.perf_counter()
+        fig, canvas = pool.acquire("tunnel")
+        draw_pane(fig, canvas)
+        times.append(time.perf_counter() - t0)
+        pool.release_all()
+    return times, pool.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--opens", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.opens} pane opens/closes")
+    print(f"{'mode':<7} {'ms/open':>8} {'RSS +MB':>8} {'pyplot figs':>12} {'pool live':>10}")
+    for name, run in (("pool", run_pool), ("pyplot", run_pyplot)):
+        before = rss_mb()
+        times, stats = run(args.opens)
+        growth = rss_mb() - before
+        live = "-" if stats is None else f"{stats['figures']}/{stats['canvases']}"
+        print(f"{name:<7} {np.mean(times) * 1000.0:>8.1f} {growth:>8.1f} "
+              f"{len(plt.get_fignums()):>12} {live:>10}")
+
+
+if __name__ == "__main__":
+    main()
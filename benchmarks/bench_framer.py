@@ -0,0 +1,106 @@
+"""Line framer throughput and chunk-boundary fuzz check.
+
+Compares `LineFramer` with the original `str` buffer framing
+(`buffer += raw.decode(); buffer.split("\\n")`) on
+
+- a regular DATA stream delivered in random chunk sizes
+- one long line that stays unterminated across many small reads
+
+Before timing, `LineFramer` is fed random streams with randomly chosen
+chunk boundaries and must produce the same lines as splitting the whole
+stream at once. (The original framer fails this check when a multi-byte
+UTF-8 character straddles two reads.)
+
+Usage: python benchmarks/bench_framer.py [--seed 1] [--rounds 200]
+"""
+
+import argparse
+import random
+import time
+
+import _common  # noqa: F401
+from line_framer import LineFramer
+
+
+class StringFramer:
+    """The original framing from `esp_to_queue_loop`."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, raw):
+        self.buffer += raw.decode(errors="replace")
+        lines = self.buffer.split("\n")
+        self.buffer = lines.pop()
+        return [line for line in map(str.strip, lines) if line]
+
+
+def random_chunks(data, rng, max_chunk):
+    pos = 0
+    while pos < len(data):
+        size = rng.randint(1, max_chunk)
+        yield data[pos : pos + size]
+        pos += size
+
+
+def frame_all(framer, chunks):
+    out = []
+    for chunk in chunks:
+        out.extend(framer.feed(chunk))
+    return out
+
+
+def reference_lines(data):
+    complete = data[: data.rfind(b"\n") + 1]
+    return [line for line in map(str.strip, complete.decode().split("\n")) if line]
+
+
+def fuzz(rounds, rng):
+    alphabet = [b"DATA,1,2,3", b"TUNNEL,1,-5,300", b"", b"\r", b"  ", "ÄÖ".encode()]
+    for _ in range(rounds):
+        data = b"\n".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        chunks = list(random_chunks(data, rng, rng.randint(1, 16)))
+        expected = reference_lines(data)
+        got = frame_all(LineFramer(), chunks)
+        assert got == expected, (data, chunks, got, expected)
+
+        # Overlong lines are dropped, everything else passes through
+        long_line = b"X" * rng.randint(33, 200)
+        data = b"A\n" + long_line + b"\nB\n" + long_line
+        framer = LineFramer(max_line_length=32)
+        got = frame_all(framer, random_chunks(data, rng, rng.randint(1, 64)))
+        assert got == ["A", "B"], got
+        assert framer.overflows == 2 and framer.pending <= 32, framer.overflows
+
+
+def bench(name, factory, chunks):
+    framer = factory()
+    t0 = time.perf_counter()
+    n = len(frame_all(framer, chunks))
+    return n, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    fuzz(args.rounds, rng)
+    print(f"fuzz: {args.rounds} rounds OK")
+
+    stream = "".join(f"DATA,{i % 200},{i // 200},{i & 0xFFFF}\n" for i in range(200_000))
+    scenarios = {
+        "DATA stream": list(random_chunks(stream.encode(), rng, 4096)),
+        "long line": [b"Z" * 64] * 20_000 + [b"\n"],
+    }
+    print(f"{'scenario':<12} {'framer':<8} {'lines':>7} {'ms':>9}")
+    for label, chunks in scenarios.items():
+        for name, factory in (("str", StringFramer), ("bytes", LineFramer)):
+            n, elapsed = bench(name, factory, chunks)
+            print(f"{label:<12} {name:<8} {n:>7} {elapsed * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Latency and frame time of GUI updates: direct calls vs `GuiPump`.
+
+A producer thread plays the serial dispatcher: it emits ADJUST readings at
+`--adjust-hz` and DATA rows at `--rows-per-s` for `--seconds`. Each
+ADJUST reading updates a fake label (`--label-ms` of CPU) and each row
+change redraws a fake plot (`--redraw-ms` of CPU, like `canvas.draw`).
+
+- direct: handlers run on the producer thread as soon as the event is
+  produced (the old behaviour); a slow redraw delays everything behind it.
+- pump: events are posted to a `GuiPump` driven by a fake Tk `after()`
+  scheduler on the main thread; ADJUST is coalesced per frame and the
+  plot redraws at most once per frame.
+
+Reports event-to-screen latency for labels and plot rows, the number of
+label updates and redraws done, and the pump's frame times.
+
+Usage: python benchmarks/bench_gui_pump.py [--fps 50] [--seconds 3]
+"""
+
+import argparse
+import heapq
+import itertools
+import threading
+import time
+
+import _common
+from gui.gui_pump import GuiPump
+
+
+def busy(ms):
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+class FakeTk:
+    """Real-time `after()` scheduler standing in for the Tk main loop."""
+
+    def __init__(self):
+        self._timers = []
+        self._ids = itertools.count()
+        self._cancelled = set()
+
+    def after(self, ms, fn):
+        timer_id = next(self._ids)
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000.0, timer_id, fn))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self._cancelled.add(timer_id)
+
+    def run_until(self, stop):
+        while not stop.is_set():
+            if not self._timers:
+                time.sleep(0.001)
+                continue
+            due, timer_id, fn = self._timers[0]
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(min(wait, 0.005))
+                continue
+            heapq.heappop(self._timers)
+            if timer_id not in self._cancelled:
+                fn()
+
+
+class Screen:
+    """Fake widgets that record how late each update reached the screen."""
+
+    def __init__(self, label_ms, redraw_ms):
+        self.label_ms = label_ms
+        self.redraw_ms = redraw_ms
+        self.label_latency = []
+        self.row_latency = []
+        self.label_updates = 0
+        self.redraws = 0
+        self._rows_pending = []
+        self._lock = threading.Lock()
+
+    def on_adjust(self, t_event):
+        busy(self.label_ms)
+        self.label_updates += 1
+        self.label_latency.append((time.perf_counter() - t_event) * 1000.0)
+
+    def on_row(self, t_event):
+        with self._lock:
+            self._rows_pending.append(t_event)
+
+    def redraw(self):
+        busy(self.redraw_ms)
+        self.redraws += 1
+        now = time.perf_counter()
+        with self._lock:
+            pending, self._rows_pending = self._rows_pending, []
+        self.row_latency.extend((now - t) * 1000.0 for t in pending)
+
+
+def schedule(args):
+    events = []
+    for i in range(int(args.seconds * args.adjust_hz)):
+        events.append((i / args.adjust_hz, "ADJUST"))
+    for i in range(int(args.seconds * args.rows_per_s)):
+        events.append((i / args.rows_per_s, "ROW"))
+    events.sort()
+    return events
+
+
+def produce(events, sink):
+    t0 = time.perf_counter()
+    for offset, kind in events:
+        t_event = t0 + offset
+        delay = t_event - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sink(kind, t_event)
+
+
+def run_direct(args, events):
+    screen = Screen(args.label_ms, args.redraw_ms)
+
+    def sink(kind, t_event):
+        if kind == "ADJUST":
+            screen.on_adjust(t_event)
+        else:
+            screen.on_row(t_event)
+            screen.redraw()
+
+    produce(events, sink)
+    return screen, None
+
+
+def run_pump(args, events):
+    screen = Screen(args.label_ms, args.redraw_ms)
+    tk = FakeTk()
+    pump = GuiPump(tk, fps=args.fps)
+    pump.frame_ms = []
+    run_frame = pump.run_frame
+
+    def timed_frame():
+        t0 = time.perf_counter()
+        done = run_frame()
+        if done:
+            pump.frame_ms.append((time.perf_counter() - t0) * 1000.0)
+        return done
+
+    pump.run_frame = timed_frame
+    on_adjust = pump.wrap(screen.on_adjust, key="ADJUST")
+
+    def on_row(t_event):
+        screen.on_row(t_event)
+        pump.request_redraw("plot", screen.redraw)
+
+    def sink(kind, t_event):
+        if kind == "ADJUST":
+            on_adjust(t_event)
+        else:
+            pump.post(on_row, t_event)
+
+    stop = threading.Event()
+
+    def producer():
+        produce(events, sink)
+        # let the pump apply what is left
+        while pump.pending():
+            time.sleep(0.005)
+        stop.set()
+
+    thread = threading.Thread(target=producer, daemon=True)
+    pump.start()
+    thread.start()
+    tk.run_until(stop)
+    pump.stop()
+    thread.join()
+    return screen, pump
+
+
+def report(name, screen, pump, wall):
+    pct = _common.percentile
+
+    def lat(values):
+        if not values:
+            return "      -      -      -"
+        return f"{pct(values, 50):>7.1f}{pct(values, 99):>7.1f}{max(values):>7.1f}"
+
+    print(f"{name:<7}{wall:>6.2f}  labels {screen.label_updates:>6} {lat(screen.label_latency)}"
+          f"  redraws {screen.redraws:>5} {lat(screen.row_latency)}")
+    if pump is not None:
+        print(f"        frames {pump.frames}, coalesced ADJUST {pump.coalesced}, "
+              f"frame time p50/p99/max {lat(pump.frame_ms)} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--fps", type=float, default=50.0)
+    parser.add_argument("--adjust-hz", type=float, default=500.0)
+    parser.add_argument("--rows-per-s", type=float, default=40.0)
+    parser.add_argument("--label-ms", type=float, default=0.2)
+    parser.add_argument("--redraw-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    events = schedule(args)
+    print(f"{args.seconds:.0f} s: ADJUST {args.adjust_hz:.0f}/s ({args.label_ms} ms), "
+          f"rows {args.rows_per_s:.0f}/s (redraw {args.redraw_ms} ms), pump {args.fps:.0f} fps")
+    print(f"{'mode':<7}{'wall':>6}  {'':>13} p50    p99    max [ms]      {'':>11} p50    p99    max [ms]")
+    for name, runner in (("direct", run_direct), ("pump", run_pump)):
+        t0 = time.perf_counter()
+        screen, pump = runner(args, events)
+        report(name, screen, pump, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Measurement CSV throughput and crash safety.
+
+Writes a `--size` x `--size` scan point by point (as `update_data` did)
+and reports points/second for:
+
+- per-point: the original open/append/close of the file per DATA point.
+- writer-<policy>: one `MeasurementWriter` for the whole scan, flushed per
+  completed row, with each fsync policy (row, done, never).
+
+`--dir` puts the files on the disk under test (default: a temp dir; use a
+path on a slow disk or network share to see the difference there).
+
+Then checks crash safety: a child process writes rows with the writer and
+is killed with os._exit() in the middle of a row. The file must hold the
+header and every completed row, with only the interrupted row missing.
+
+Usage: python benchmarks/bench_measure_csv.py [--size 200] [--dir PATH]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import _common
+from legacy import legacy_store_point
+from measurement_writer import FSYNC_POLICIES, HEADER, MeasurementWriter
+
+CRASH_CHILD = """
+import os, sys
+sys.path.insert(0, {src!r})
+from measurement_writer import MeasurementWriter
+writer = MeasurementWriter({path!r}, fsync="never")
+size = {size}
+for y in range(size):
+    for x in range(size):
+        if y == {crash_row} and x == size // 2:
+            os._exit(1)
+        writer.write_points([x], [y], [(x * 7919 + y * 104729) & 0xFFFF])
+"""
+
+
+def scan(size):
+    for y in range(size):
+        for x in range(size):
+            yield x, y, (x * 7919 + y * 104729) & 0xFFFF
+
+
+def run_per_point(path, size):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(HEADER)
+    app = SimpleNamespace(measurement_file_path=path)
+    t0 = time.perf_counter()
+    for x, y, z in scan(size):
+        legacy_store_point(app, x, y, z)
+    return time.perf_counter() - t0
+
+
+def run_writer(path, size, policy):
+    t0 = time.perf_counter()
+    writer = MeasurementWriter(path, fsync=policy)
+    for x, y, z in scan(size):
+        writer.write_points([x], [y], [z])
+    writer.finish()
+    writer.close()
+    return time.perf_counter() - t0
+
+
+def check_file(path, size, rows):
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    expected = [HEADER.strip()] + [f"{x},{y},{z}" for x, y, z in scan(size)][: rows * size]
+    return lines == expected, len(lines) - 1
+
+
+def crash_check(folder, size):
+    path = os.path.join(folder, "crash.csv")
+    crash_row = size // 2
+    code = CRASH_CHILD.format(src=_common.SRC_DIR, path=path, size=size, crash_row=crash_row)
+    result = subprocess.run([sys.executable, "-c", code])
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    expected = [HEADER.strip()] + [f"{x},{y},{z}" for x, y, z in scan(size)][: crash_row * size]
+    ok = lines == expected
+    print(f"\ncrash in row {crash_row} (exit code {result.returncode}): "
+          f"{len(lines) - 1} points on disk, {crash_row} complete rows expected -> "
+          f"{'OK' if ok else 'FAILED'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--dir", help="folder for the CSV files (default: temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as folder:
+        points = args.size * args.size
+        print(f"{args.size}x{args.size} scan = {points} points in {folder}")
+        print(f"{'path':<14} {'s':>7} {'points/s':>10}  file")
+        variants = [("per-point", lambda p: run_per_point(p, args.size))]
+        for policy in FSYNC_POLICIES:
+            variants.append((f"writer-{policy}", lambda p, pol=policy: run_writer(p, args.size, pol)))
+        for name, runner in variants:
+            path = os.path.join(folder, f"{name}.csv")
+            elapsed = runner(path)
+            ok, count = check_file(path, args.size, args.size)
+            print(f"{name:<14} {elapsed:>7.3f} {points / elapsed:>10.0f}  "
+                  f"{'ok' if ok else 'MISMATCH'} ({count} points)")
+        ok = crash_check(folder, args.size)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""MeasureApp per-row render time and point storage as a scan progresses.
+
+Feeds a `--size` x `--size` scan row by row and renders the plot
+(off-screen Agg canvas, no Tk needed; the final copy to the Tk widget is
+not included):
+
+- lists: the original storage (growing x/y/z lists) and redraw (arrays
+  rebuilt from the lists, unique/rank checks, `plot_trisurf`), timed
+  every `--every` rows.
+- 3d: `HeightGrid` storage and `MeasureApp.redraw_plot` in the 3D surface
+  view, timed every `--every` rows.
+- 2d: the live image view, updated after every row (only the new row is
+  copied into the image, which is blitted over the saved background);
+  the time of the rows at the sample points is shown.
+
+Also reports the memory held by the point storage at each sample
+(tracemalloc, measured in a separate pass without plotting).
+
+Usage: python benchmarks/bench_measure_redraw.py [--size 200] [--every 25]
+"""
+
+import argparse
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+import _common  # noqa: E402, F401
+from height_grid import HeightGrid  # noqa: E402
+from legacy import legacy_measure_redraw  # noqa: E402
+from measure import MeasureApp  # noqa: E402
+
+
+def surface(size):
+    y, x = np.mgrid[0:size, 0:size]
+    z = 30000 + 8000 * np.sin(x / 9.0) * np.cos(y / 13.0)
+    return z.astype(np.uint16)
+
+
+def make_axes():
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection="3d")
+    return fig, ax, FigureCanvasAgg(fig)
+
+
+def make_lists_app():
+    fig, ax, canvas = make_axes()
+    app = SimpleNamespace(is_active=True, fig=fig, ax=ax, canvas=canvas, status_label=None)
+    app.x_data, app.y_data, app.z_data = [], [], []
+
+    def store(xs, ys, zs):
+        app.x_data.extend(xs)
+        app.y_data.extend(ys)
+        app.z_data.extend(zs)
+
+    return app, store, lambda: legacy_measure_redraw(app)
+
+
+def make_grid_app(size, view):
+    app = MeasureApp.__new__(MeasureApp)
+    app.is_active = True
+    app.fig = plt.figure()
+    app.canvas = FigureCanvasAgg(app.fig)
+    app.canvas.mpl_connect("draw_event", app._on_draw)
+    app.status_label = None
+    app.grid = HeightGrid(0, 0, size - 1, size - 1)
+    app.view = view
+    app.image = None
+    app._setup_axes()
+
+    def store(xs, ys, zs):
+        app.grid.set_points(xs, ys, zs)
+
+    return app, store, app.redraw_plot
+
+
+def rows(size):
+    z = surface(size)
+    xs = list(range(size))
+    for y in range(size):
+        yield y, xs, [y] * size, z[y].tolist()
+
+
+def time_redraws(make, size, every, every_row):
+    app, store, redraw = make()
+    times = {}
+    for y, xs, ys, zs in rows(size):
+        store(xs, ys, zs)
+        done = y + 1
+        sample = done % every == 0 or done == size
+        if sample or every_row:
+            t0 = time.perf_counter()
+            redraw()
+            elapsed = (time.perf_counter() - t0) * 1000.0
+            if sample:
+                times[done] = elapsed
+    plt.close(app.fig)
+    return times
+
+
+def storage_memory(make, size, every):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    app, store, _ = make()
+    after_setup = tracemalloc.get_traced_memory()[0]
+    memory = {}
+    for y, xs, ys, zs in rows(size):
+        store(xs, ys, zs)
+        done = y + 1
+        if done % every == 0 or done == size:
+            memory[done] = tracemalloc.get_traced_memory()[0] - after_setup
+    tracemalloc.stop()
+    plt.close(app.fig)
+    return memory, after_setup - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--every", type=int, default=25, help="rows between samples")
+    args = parser.parse_args()
+
+    variants = (
+        ("lists", make_lists_app, False),
+        ("3d", lambda: make_grid_app(args.size, "3d"), False),
+        ("2d", lambda: make_grid_app(args.size, "2d"), True),
+    )
+    results = {}
+    for name, make, every_row in variants:
+        times = time_redraws(make, args.size, args.every, every_row)
+        memory, _ = storage_memory(make, args.size, args.every)
+        results[name] = (times, memory)
+
+    print(f"{args.size}x{args.size} scan, render time [ms] and storage growth [KB] by completed rows")
+    header = f"{'rows':>5}" + "".join(f" {name + ' ms':>9} {name + ' KB':>9}" for name, _, _ in variants)
+    print(header)
+    for done in results["lists"][0]:
+        line = f"{done:>5}"
+        for name, _, _ in variants:
+            times, memory = results[name]
+            line += f" {times[done]:>9.1f} {memory[done] / 1024:>9.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
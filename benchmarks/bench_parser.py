@@ -0,0 +1,89 @@
+"""Batch NumPy parser vs. the per-line DATA/TUNNEL parsing path.
+
+The per-line path is what the app did per packet before: `split(",")`,
+three `int()` calls and, for TUNNEL, the int16 sign fix-up (done twice,
+once for display and once in TunnelApp). The batch path is
+`packet_parser.parse_*_lines` over runs of lines as they come out of
+the serial reader.
+
+Usage: python benchmarks/bench_parser.py [--lines 500000] [--batch 256]
+"""
+
+import argparse
+import time
+
+import _common  # noqa: F401
+from packet_parser import parse_data_lines, parse_tunnel_lines
+
+
+def per_line_data(lines):
+    out = []
+    for msg in lines:
+        data = msg.split(",")
+        out.append((int(data[1]), int(data[2]), int(data[3])))
+    return out
+
+
+def per_line_tunnel(lines):
+    out = []
+    for msg in lines:
+        # dispatch_received_data: sign fix-up and re-join for the terminal
+        ms = msg.split(",")
+        adc = int(ms[2])
+        if adc > 0x7FFF:
+            adc -= 0x10000
+        ms[2] = str(adc)
+        msg = ",".join(ms)
+        # TunnelApp.update_data: split again
+        data = msg.split(",")
+        out.append((int(data[1]), int(data[2]), int(data[3])))
+    return out
+
+
+def run(fn, lines, batch):
+    t0 = time.perf_counter()
+    for i in range(0, len(lines), batch):
+        fn(lines[i : i + batch])
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    n = args.lines
+    data = [f"DATA,{i % 200},{(i // 200) % 200},{(i * 7919) & 0xFFFF}" for i in range(n)]
+    tunnel = [f"TUNNEL,{i & 1},{(i * 7919) & 0xFFFF},{i & 0xFFFF}" for i in range(n)]
+
+    # Both paths must agree before they are timed
+    records, _ = parse_tunnel_lines(tunnel[:1000])
+    assert records.tolist() == per_line_tunnel(tunnel[:1000])
+    records, _ = parse_data_lines(data[:1000])
+    assert records.tolist() == per_line_data(data[:1000])
+    # A bad line is rejected on its own, on the per-line and the vectorized
+    # path, and the DONE marker always gets through
+    for good in (tunnel[:2], tunnel[:40]):
+        bad = ["TUNNEL,1,655350,5", "TUNNEL,1,2", "TUNNEL,1,2,3,4", "TUNNEL,1,-1,70000"]
+        records, others = parse_tunnel_lines(good[:1] + bad + good[1:] + ["TUNNEL,DONE"])
+        assert records.tolist() == per_line_tunnel(good)
+        assert others == bad + ["TUNNEL,DONE"]
+    for good in (data[:2], data[:40]):
+        bad = ["DATA,-1,2,3", "DATA,1,2", "DATA,1,2,3,4", "DATA,1,DATA,2"]
+        records, others = parse_data_lines(good[:1] + bad + good[1:] + ["DATA,DONE"])
+        assert records.tolist() == per_line_data(good)
+        assert others == bad + ["DATA,DONE"]
+
+    print(f"{'stream':<7} {'parser':<9} {'seconds':>8} {'lines/s':>11}")
+    for label, lines, slow, fast in (
+        ("DATA", data, per_line_data, parse_data_lines),
+        ("TUNNEL", tunnel, per_line_tunnel, parse_tunnel_lines),
+    ):
+        for name, fn in (("per-line", slow), ("numpy", fast)):
+            elapsed = run(fn, lines, args.batch)
+            print(f"{label:<7} {name:<9} {elapsed:>8.2f} {n / elapsed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
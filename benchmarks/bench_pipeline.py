@@ -0,0 +1,81 @@
+"""Throughput of the serial reader -> queue -> dispatcher pipeline.
+
+Feeds synthetic `DATA,x,y,z` lines through `USBConnection` using an
+in-memory fake serial port and reports lines/second for the original
+per-line hand-off and the current chunked hand-off, the latter also with
+`PipelineMetrics` attached to show the cost of the instrumentation.
+
+Usage: python benchmarks/bench_pipeline.py [--lines 1000000]
+"""
+
+import argparse
+import threading
+import time
+
+import _common
+from legacy import LegacyUSBConnection
+from pipeline_metrics import PipelineMetrics
+from usb_connection import USBConnection
+
+
+def make_stream(count):
+    return "".join(
+        f"DATA,{i % 200},{(i // 200) % 200},{(i * 7919) & 0xFFFF}\n"
+        for i in range(count)
+    ).encode()
+
+
+def run(cls, data, count, joined, metrics=None):
+    done = threading.Event()
+    received = [0]
+
+    if joined:
+        # Original MasterGui contract: one newline-joined string per call
+        def dispatcher(message):
+            for msg in message.split("\n"):
+                msg.split(",")
+                received[0] += 1
+            if received[0] >= count:
+                done.set()
+
+    else:
+
+        def dispatcher(messages):
+            for msg in messages:
+                msg.split(",")
+            received[0] += len(messages)
+            if received[0] >= count:
+                done.set()
+
+    conn = _common.make_connection(cls, dispatcher_callback=dispatcher)
+    conn.connection = _common.FakeSerial(data)
+    conn.is_connected = True
+    if metrics is not None:
+        conn.set_metrics(metrics)
+    t0 = time.perf_counter()
+    conn.start_receiving()
+    done.wait(timeout=600)
+    elapsed = time.perf_counter() - t0
+    conn.close_connection()
+    return received[0], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    data = make_stream(args.lines)
+    print(f"{args.lines} lines, {len(data) / 1e6:.1f} MB")
+    print(f"{'pipeline':<10} {'lines':>9} {'seconds':>8} {'lines/s':>11}")
+    for name, cls, joined, metrics in (
+        ("per-line", LegacyUSBConnection, True, None),
+        ("chunked", USBConnection, False, None),
+        ("+metrics", USBConnection, False, PipelineMetrics()),
+    ):
+        n, elapsed = run(cls, data, args.lines, joined, metrics)
+        print(f"{name:<10} {n:>9} {elapsed:>8.2f} {n / elapsed:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Scan acquisition with slow plot redraws: per-row redraw vs `RedrawScheduler`.
+
+A fake Tk main loop receives one scan row every `--row-ms` (the GUI pump
+delivering DATA) and each row asks for a redraw that costs `--draw-ms` of
+CPU on the Tk thread.
+
+- every-row: the redraw runs for each completed row, like the old
+  `update_data` path.
+- scheduler: `RedrawScheduler` with `--interval-ms`; requests are
+  coalesced and frames are dropped when drawing falls behind.
+
+Reports how far behind acquisition the handling of the last row was, the
+number of draws and dropped frames, and whether the final state (last
+row) was drawn.
+
+Usage: python benchmarks/bench_redraw_scheduler.py [--rows 200] [--draw-ms 60]
+"""
+
+import argparse
+import time
+
+import _common  # noqa: F401
+from bench_gui_pump import FakeTk, busy
+from gui.redraw_scheduler import RedrawScheduler
+
+
+def run(args, scheduled):
+    tk = FakeTk()
+    state = {"row": -1, "drawn_row": -1, "draws": 0, "lag_ms": 0.0}
+
+    def draw():
+        busy(args.draw_ms)
+        state["draws"] += 1
+        state["drawn_row"] = state["row"]
+
+    scheduler = RedrawScheduler(tk, draw, args.interval_ms) if scheduled else None
+    t0 = time.perf_counter()
+
+    def deliver(row):
+        # runs on the fake Tk thread, possibly late when drawing blocked it
+        due = t0 + row * args.row_ms / 1000.0
+        state["lag_ms"] = (time.perf_counter() - due) * 1000.0
+        state["row"] = row
+        if scheduler is not None:
+            scheduler.request()
+        else:
+            draw()
+
+    for row in range(args.rows):
+        tk.after(int(row * args.row_ms), lambda r=row: deliver(r))
+
+    class Stop:
+        def is_set(self):
+            done = state["row"] == args.rows - 1
+            return done and (scheduler is None or not scheduler.pending)
+
+    tk.run_until(Stop())
+    elapsed = time.perf_counter() - t0
+    dropped = scheduler.dropped if scheduler is not None else 0
+    return state, dropped, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--row-ms", type=float, default=20.0, help="time per scan row")
+    parser.add_argument("--draw-ms", type=float, default=60.0, help="cost of one redraw")
+    parser.add_argument("--interval-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    scan_s = args.rows * args.row_ms / 1000.0
+    print(f"{args.rows} rows every {args.row_ms} ms ({scan_s:.1f} s), redraw {args.draw_ms} ms, "
+          f"interval {args.interval_ms} ms")
+    print(f"{'mode':<10} {'last row lag ms':>15} {'draws':>6} {'dropped':>8} {'final drawn':>12} {'total s':>8}")
+    for name, scheduled in (("every-row", False), ("scheduler", True)):
+        state, dropped, elapsed = run(args, scheduled)
+        final = state["drawn_row"] == args.rows - 1
+        print(f"{name:<10} {state['lag_ms']:>15.0f} {state['draws']:>6} {dropped:>8} "
+              f"{'yes' if final else 'no':>12} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
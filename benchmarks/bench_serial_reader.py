@@ -0,0 +1,84 @@
+"""Idle CPU and per-line latency of the serial reader thread.
+
+Runs the original polling reader and the current blocking reader against a
+pty pair and reports:
+
+- CPU time consumed by the process while the port is idle
+- latency from writing a line on the device side until it appears in
+  `USBConnection.data_queue`
+
+Usage: python benchmarks/bench_serial_reader.py [--idle 2.0] [--lines 500]
+"""
+
+import argparse
+import os
+import queue
+import time
+
+import _common
+from legacy import LegacyUSBConnection
+from usb_connection import READ_TIMEOUT_S, USBConnection
+
+
+def _start_reader(cls):
+    master_fd, port = _common.open_pty_serial(READ_TIMEOUT_S)
+    conn = _common.make_connection(cls)
+    conn.connection = port
+    conn.is_connected = True
+    conn.start_esp_to_queue()
+    return master_fd, conn
+
+
+def measure_idle_cpu(cls, seconds):
+    master_fd, conn = _start_reader(cls)
+    try:
+        time.sleep(0.2)  # let the thread settle
+        cpu0 = time.process_time()
+        wall0 = time.perf_counter()
+        time.sleep(seconds)
+        cpu = time.process_time() - cpu0
+        wall = time.perf_counter() - wall0
+        return 100.0 * cpu / wall
+    finally:
+        conn.close_connection()
+        os.close(master_fd)
+
+
+def measure_latency(cls, count):
+    master_fd, conn = _start_reader(cls)
+    samples = []
+    try:
+        for i in range(count):
+            line = f"DATA,{i % 200},{i // 200},{i}\n".encode()
+            t0 = time.perf_counter_ns()
+            os.write(master_fd, line)
+            try:
+                conn.data_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            samples.append((time.perf_counter_ns() - t0) / 1000.0)
+            time.sleep(0.002)  # idle gap so every line is a fresh wake-up
+    finally:
+        conn.close_connection()
+        os.close(master_fd)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=float, default=2.0, help="idle seconds")
+    parser.add_argument("--lines", type=int, default=500, help="latency samples")
+    args = parser.parse_args()
+
+    print(f"{'reader':<10} {'idle CPU %':>10} {'p50 us':>9} {'p99 us':>9} {'lost':>5}")
+    for name, cls in (("polling", LegacyUSBConnection), ("blocking", USBConnection)):
+        cpu = measure_idle_cpu(cls, args.idle)
+        lat = measure_latency(cls, args.lines)
+        print(
+            f"{name:<10} {cpu:>10.1f} {_common.percentile(lat, 50):>9.0f} "
+            f"{_common.percentile(lat, 99):>9.0f} {args.lines - len(lat):>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
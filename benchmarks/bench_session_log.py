@@ -0,0 +1,89 @@
+"""Caller-side cost of logging terminal lines to disk.
+
+Writes `--lines` TUNNEL-like terminal lines (every 100th a `To STM:`
+command) and measures how long the *calling* thread (dispatcher or Tk)
+spends per line:
+
+- sync: format and write each line to the file and flush it, the
+  simplest way to get the lines on disk.
+- async: `SessionLog.write` (deque append); a writer thread formats,
+  writes and flushes in batches.
+
+Reports per-call p50/p99/max in microseconds, the total caller time and
+the time until the async log is completely on disk.
+
+Usage: python benchmarks/bench_session_log.py [--lines 200000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import _common
+from session_log import SENT_PREFIX, SessionLog, _timestamp
+
+
+def make_lines(count):
+    return [
+        f"{SENT_PREFIX}TUNNEL,100" if i % 100 == 0 else f"TUNNEL,1,{(i * 37) % 2000 - 1000},{i & 0xFFFF}"
+        for i in range(count)
+    ]
+
+
+def run_sync(lines, folder):
+    costs = []
+    clock = time.perf_counter_ns
+    with open(os.path.join(folder, "sync.log"), "a", encoding="utf-8") as f:
+        t_start = clock()
+        for line in lines:
+            t0 = clock()
+            if line.startswith(SENT_PREFIX):
+                f.write(f"{_timestamp(time.time())} TX {line[len(SENT_PREFIX):]}\n")
+            else:
+                f.write(f"{_timestamp(time.time())} RX {line}\n")
+            f.flush()
+            costs.append(clock() - t0)
+        total = clock() - t_start
+    return costs, total, total
+
+
+def run_async(lines, folder, compress):
+    costs = []
+    clock = time.perf_counter_ns
+    log = SessionLog(folder, prefix="async", compress=compress).start()
+    t_start = clock()
+    for line in lines:
+        t0 = clock()
+        log.write(line)
+        costs.append(clock() - t0)
+    total = clock() - t_start
+    log.close()
+    return costs, total, clock() - t_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--gzip", action="store_true", help="gzip the async segment on close")
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    pct = _common.percentile
+    print(f"{args.lines} lines")
+    print(f"{'mode':<6} {'p50 us':>8} {'p99 us':>8} {'max us':>9} {'caller s':>9} {'on disk s':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        for name, runner in (
+            ("sync", lambda: run_sync(lines, folder)),
+            ("async", lambda: run_async(lines, folder, args.gzip)),
+        ):
+            costs, caller_ns, disk_ns = runner()
+            us = [c / 1000.0 for c in costs]
+            print(
+                f"{name:<6} {pct(us, 50):>8.2f} {pct(us, 99):>8.2f} {max(us):>9.1f} "
+                f"{caller_ns / 1e9:>9.3f} {disk_ns / 1e9:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
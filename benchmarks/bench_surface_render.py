@@ -0,0 +1,89 @@
+"""Tk-thread time of a 3D surface update: local draw vs render process.
+
+Fills a `--size` x `--size` height grid row by row and every `--every`
+rows updates the 3D surface (off-screen Agg canvas of the same size as
+the default MeasureApp figure):
+
+- local: `draw_surface` + `canvas.draw()` on the calling (Tk) thread.
+- process: `SurfaceRenderer.submit()` (snapshot into shared memory), then
+  polling until the RGBA image is back and copying it into the canvas
+  buffer. Only submit and copy block the calling thread; the latency
+  column is the time until the image is shown.
+
+On a machine with one CPU the worker competes with the caller for the
+core, so the latency is higher there than with a free core.
+
+Usage: python benchmarks/bench_surface_render.py [--size 200] [--every 25]
+"""
+
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import numpy as np  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+import _common  # noqa: E402, F401
+import surface_renderer  # noqa: E402
+from height_grid import HeightGrid  # noqa: E402
+from surface_renderer import draw_surface  # noqa: E402
+
+
+def fill_rows(grid, size, upto, start):
+    y, x = np.mgrid[start:upto, 0:size]
+    z = (30000 + 8000 * np.sin(x / 9.0) * np.cos(y / 13.0)).astype(np.uint16)
+    grid.set_points(x.ravel(), y.ravel(), z.ravel())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--every", type=int, default=25)
+    args = parser.parse_args()
+
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection="3d")
+    canvas.draw()
+    renderer = surface_renderer.get_renderer()
+    # first render starts the worker's matplotlib; not part of the numbers
+    warm = HeightGrid(0, 0, 1, 1)
+    renderer.submit(warm, fig.bbox.width, fig.bbox.height, fig.dpi, ax.elev, ax.azim)
+    while renderer.poll() is None:
+        time.sleep(0.005)
+
+    grid = HeightGrid(0, 0, args.size - 1, args.size - 1)
+    print(f"{args.size}x{args.size} scan, {int(fig.bbox.width)}x{int(fig.bbox.height)} px")
+    print(f"{'rows':>5} {'local ms':>9} {'submit ms':>10} {'copy ms':>8} {'latency ms':>11} {'worker ms':>10}")
+    done = 0
+    while done < args.size:
+        start, done = done, min(done + args.every, args.size)
+        fill_rows(grid, args.size, done, start)
+
+        t0 = time.perf_counter()
+        ax.clear()
+        draw_surface(ax, grid.z, grid.filled, grid.extent)
+        canvas.draw()
+        local_ms = (time.perf_counter() - t0) * 1000.0
+
+        t0 = time.perf_counter()
+        renderer.submit(grid, fig.bbox.width, fig.bbox.height, fig.dpi, ax.elev, ax.azim)
+        submit_ms = (time.perf_counter() - t0) * 1000.0
+        result = None
+        while result is None:
+            time.sleep(0.002)
+            result = renderer.poll()
+        t1 = time.perf_counter()
+        buffer = np.asarray(canvas.get_renderer().buffer_rgba())
+        buffer[:] = result[1]
+        t2 = time.perf_counter()
+        print(f"{done:>5} {local_ms:>9.1f} {submit_ms:>10.2f} {(t2 - t1) * 1000.0:>8.2f} "
+              f"{(t2 - t0) * 1000.0:>11.1f} {renderer.last_render_ms:>10.1f}")
+    surface_renderer.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Tk event-queue depth and terminal memory over a long TUNNEL/ADJUST stream.
+
+Simulates `--minutes` of terminal output at `--rate` lines/s in virtual
+time, so a 10-minute stream takes seconds and needs no display:
+
+- legacy: the original path, one `after(0)` callback per line (insert +
+  see(END)), plus the `update_idletasks()` that `MasterGui.update_terminal`
+  forced for every line.
+- buffered: the current `TerminalView` (ring buffer, one insert per GUI
+  pump frame, trimming to `--max-lines`) driven by a `GuiPump`.
+
+The Tk thread is modelled as one worker with per-call costs of a Text
+widget (`--insert-us`, `--see-us`, `--idle-us`, ...) and is blocked for
+`--stall-ms` once per second, like a slow plot redraw. The costs are
+assumptions; the structure of the result (callbacks per line vs per
+frame, bounded vs unbounded widget) does not depend on their exact value.
+
+Reports Tk callbacks run, Tk busy time, pending callbacks (event-queue
+depth) and the size of the widget contents once per simulated minute.
+
+Usage: python benchmarks/bench_terminal.py [--minutes 10] [--rate 500]
+"""
+
+import argparse
+import heapq
+import itertools
+from types import SimpleNamespace
+
+import _common  # noqa: F401
+from gui.gui_pump import GuiPump
+from legacy import legacy_terminal_update
+from terminal import TerminalView
+
+
+class SimTk:
+    """Virtual-time Tk thread: an `after()` timer heap and a busy clock."""
+
+    def __init__(self, callback_us):
+        self.now = 0.0
+        self.busy_until = 0.0
+        self.busy_total = 0.0
+        self.callbacks = 0
+        self.callback_us = callback_us
+        self._cost = 0.0
+        self._timers = []
+        self._ids = itertools.count()
+        self._cancelled = set()
+
+    def after(self, ms, fn):
+        timer_id = next(self._ids)
+        heapq.heappush(self._timers, (self.now + ms / 1000.0, timer_id, fn))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self._cancelled.add(timer_id)
+
+    def winfo_exists(self):
+        return True
+
+    def charge(self, us):
+        self._cost += us / 1e6
+
+    def pending(self):
+        return len(self._timers)
+
+    def next_start(self):
+        if not self._timers:
+            return None
+        return max(self._timers[0][0], self.busy_until)
+
+    def run_next(self):
+        start = self.next_start()
+        _, timer_id, fn = heapq.heappop(self._timers)
+        if timer_id in self._cancelled:
+            return
+        self.now = start
+        self._cost = self.callback_us / 1e6
+        fn()
+        self.callbacks += 1
+        self.busy_until = start + self._cost
+        self.busy_total += self._cost
+
+    def block(self, us):
+        """Synchronous work forced onto the Tk thread from another thread."""
+        start = max(self.now, self.busy_until)
+        self.busy_until = start + us / 1e6
+        self.busy_total += us / 1e6
+
+
+class FakeText:
+    """Text widget stand-in that stores lines and charges Tk time."""
+
+    def __init__(self, tk, costs):
+        self.tk = tk
+        self.costs = costs
+        self.lines = []
+        self.chars = 0
+
+    def winfo_exists(self):
+        return True
+
+    def insert(self, index, text):
+        self.tk.charge(self.costs.insert_us + self.costs.char_us * len(text))
+        new = text.split("\n")[:-1]
+        self.lines.extend(new)
+        self.chars += len(text)
+
+    def delete(self, first, last):
+        count = int(str(last).split(".")[0]) - 1
+        removed = self.lines[:count]
+        del self.lines[:count]
+        self.chars -= sum(len(line) + 1 for line in removed)
+        self.tk.charge(self.costs.delete_us + self.costs.line_us * count)
+
+    def see(self, index):
+        self.tk.charge(self.costs.see_us)
+
+
+def messages(rate, seconds):
+    for i in range(int(rate * seconds)):
+        t = i / rate
+        if i % 4 == 3:
+            yield t, f"ADJUST,{1.0 + (i % 1000) / 1000:.3f},{(i % 997) / 10:.1f},{i % 32768}"
+        else:
+            yield t, f"TUNNEL,{i & 1},{(i * 37) % 2000 - 1000},{(i * 7919) & 0xFFFF}"
+
+
+def simulate(args, buffered):
+    tk = SimTk(args.callback_us)
+    text = FakeText(tk, args)
+    if buffered:
+        pump = GuiPump(tk, fps=args.fps)
+        view = TerminalView.__new__(TerminalView)
+        view.parent = tk
+        view.terminal = text
+        view._init_buffer(pump, args.max_lines)
+        pump.start()
+
+        def deliver(msg):
+            view.update(msg)
+
+    else:
+        view = SimpleNamespace(parent=tk, terminal=text)
+
+        def deliver(msg):
+            legacy_terminal_update(view, msg)
+            # MasterGui.update_terminal forced update_idletasks() per line
+            tk.block(args.idle_us)
+
+    seconds = args.minutes * 60
+    samples = []
+    depth_sum = depth_max = count = 0
+    next_sample = 60.0
+    next_stall = 1.0
+    for t, msg in messages(args.rate, seconds):
+        if t >= next_stall:
+            tk.now = next_stall
+            tk.block(args.stall_ms * 1000.0)
+            next_stall += 1.0
+        while True:
+            start = tk.next_start()
+            if start is None or start > t:
+                break
+            tk.run_next()
+        tk.now = t
+        deliver(msg)
+        depth = tk.pending()
+        depth_sum += depth
+        depth_max = max(depth_max, depth)
+        count += 1
+        if t >= next_sample:
+            samples.append((t, depth, len(text.lines), text.chars))
+            next_sample += 60.0
+    # drain what is left (stop at the pump's own periodic timer)
+    while tk.pending() > (1 if buffered else 0):
+        tk.run_next()
+    samples.append((seconds, tk.pending(), len(text.lines), text.chars))
+    return tk, text, samples, depth_sum / max(count, 1), depth_max
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=500.0, help="lines/s")
+    parser.add_argument("--fps", type=float, default=50.0)
+    parser.add_argument("--max-lines", type=int, default=2000)
+    parser.add_argument("--callback-us", type=float, default=5.0, help="Tk callback overhead")
+    parser.add_argument("--insert-us", type=float, default=30.0)
+    parser.add_argument("--char-us", type=float, default=0.02)
+    parser.add_argument("--see-us", type=float, default=40.0)
+    parser.add_argument("--delete-us", type=float, default=20.0)
+    parser.add_argument("--line-us", type=float, default=0.5, help="per trimmed line")
+    parser.add_argument("--idle-us", type=float, default=150.0, help="update_idletasks per line")
+    parser.add_argument("--stall-ms", type=float, default=100.0, help="Tk blocked once per second")
+    args = parser.parse_args()
+
+    total = int(args.rate * args.minutes * 60)
+    print(f"{args.minutes:.0f} min at {args.rate:.0f} lines/s = {total} lines (virtual time)")
+    for name, buffered in (("legacy", False), ("buffered", True)):
+        tk, text, samples, depth_mean, depth_max = simulate(args, buffered)
+        busy = 100.0 * tk.busy_total / (args.minutes * 60)
+        print(f"\n{name}: {tk.callbacks} Tk callbacks, Tk busy {busy:.1f}%, "
+              f"pending callbacks mean {depth_mean:.1f} max {depth_max}")
+        print(f"  {'minute':>6} {'pending':>8} {'widget lines':>13} {'widget KB':>10}")
+        for t, depth, lines, chars in samples:
+            print(f"  {t / 60:>6.0f} {depth:>8} {lines:>13} {chars / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
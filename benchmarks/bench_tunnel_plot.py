@@ -0,0 +1,142 @@
+"""Tunnel plot frame time: clear-and-rescatter vs artist updates with blitting.
+
+Streams one tunnel cycle of `tunnelcounts` points in batches of `--batch`
+points (off-screen Agg canvas of the default figure size, no Tk needed;
+the final copy to the Tk widget is not included):
+
+- legacy: the original `redraw_plot` (axes cleared and rebuilt, two
+  scatters from Python lists, full draw); it only ran at TUNNEL,DONE,
+  so its frame is the one redraw at the end of the cycle.
+- artists: `TunnelApp.update_batch` + `redraw_plot` after every batch
+  (offsets/colors of the new points from the NumPy arrays, drawn on the
+  cached image of the points so far and blitted); the first frame is the
+  full draw that caches the background.
+
+Before timing, a restart check delivers two cycles in one batch each with
+`restart()` in between and compares the blitted frame with a full redraw
+(the cached points of the previous cycle must not be reused).
+
+Usage: python benchmarks/bench_tunnel_plot.py [--batch 64]
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import matplotlib
+
+matplotlib.use("Agg")
+import numpy as np  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+import _common  # noqa: E402
+from gui.figure_pool import FigurePool  # noqa: E402
+from legacy import legacy_tunnel_redraw  # noqa: E402
+from packet_parser import TUNNEL_DTYPE  # noqa: E402
+from tunnel import TunnelApp  # noqa: E402
+
+COUNTS = (100, 1000, 10000)
+
+
+def make_app(pool, counts):
+    app = TunnelApp.__new__(TunnelApp)
+    app.is_active = True
+    app.target_adc, app.tolerance_adc = 1000, 200
+    app.adc_limits = None
+    app.gui_pump = None
+    app.is_frozen = False
+    app.closing = False
+    app.tunnel_counts = float(counts)
+    app.rolling, app.ring = False, None
+    app.figure_pool = pool
+    app.fig, app.canvas = pool.acquire("tunnel")
+    app.ax = app.fig.add_subplot(111)
+    app._init_plot_elements()
+    app._init_stats()
+    app.clear_plot_data()
+    return app
+
+
+def batches(counts, size, rng):
+    adc = rng.normal(1000, 300, counts).astype(np.int16)
+    records = np.empty(counts, dtype=TUNNEL_DTYPE)
+    records["flag"] = np.abs(adc - 1000) <= 200
+    records["adc"] = adc
+    records["z"] = 32768 + np.cumsum(rng.integers(-50, 51, counts))
+    for start in range(0, counts, size):
+        yield records[start:start + size]
+
+
+def run_artists(pool, counts, size):
+    app = make_app(pool, counts)
+    times = []
+    for batch in batches(counts, size, np.random.default_rng(0)):
+        t0 = time.perf_counter()
+        # update_batch asks for the redraw (no GUI pump: right away)
+        app.update_batch(None, (batch, []))
+        times.append((time.perf_counter() - t0) * 1000.0)
+    pool.release_all()
+    return times
+
+
+def check_restart(pool, counts):
+    """True if the frame after a restart shows the new cycle, not the old one."""
+    app = make_app(pool, counts)
+    app.send_tunnel_command = lambda: None
+    frames = []
+    for seed in (1, 2):
+        if frames:
+            app.restart()
+        # the whole cycle in one batch: count reaches the previous `_drawn`
+        for batch in batches(counts, counts, np.random.default_rng(seed)):
+            app.update_batch(None, (batch, []))
+        frames.append(bytes(app.canvas.buffer_rgba()))
+    app._background = None
+    app.redraw_plot()
+    full = bytes(app.canvas.buffer_rgba())
+    pool.release_all()
+    return frames[0] != frames[1] and frames[1] == full
+
+
+def run_legacy(pool, counts, size):
+    fig, canvas = pool.acquire("tunnel")
+    app = SimpleNamespace(
+        fig=fig, canvas=canvas, ax=fig.add_subplot(111), tunnel_counts=float(counts),
+        target_adc=1000, tolerance_adc=200, adc_data=[], z_data=[], colors=[],
+    )
+    for batch in batches(counts, size, np.random.default_rng(0)):
+        app.adc_data.extend(batch["adc"].tolist())
+        app.z_data.extend(batch["z"].tolist())
+        app.colors.extend(np.where(batch["flag"] == 1, "green", "red").tolist())
+    t0 = time.perf_counter()
+    legacy_tunnel_redraw(app)
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    pool.release_all()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=64, help="points per batch")
+    args = parser.parse_args()
+
+    pool = FigurePool(None, canvas_class=FigureCanvasAgg)
+    # warm up fonts and the Agg renderer
+    run_artists(pool, 100, args.batch)
+    if not check_restart(pool, 100):
+        raise SystemExit("restart check failed: the previous cycle is still shown")
+    print("restart check: OK")
+    print(f"frame time [ms], batches of {args.batch} points")
+    print(f"{'counts':>7} {'legacy':>8} {'first':>7} {'live p50':>9} {'live p99':>9} "
+          f"{'live max':>9} {'frames':>7}")
+    for counts in COUNTS:
+        legacy = run_legacy(pool, counts, args.batch)
+        times = run_artists(pool, counts, args.batch)
+        live = times[1:] or times
+        print(f"{counts:>7} {legacy:>8.1f} {times[0]:>7.1f} "
+              f"{_common.percentile(live, 50):>9.2f} {_common.percentile(live, 99):>9.2f} "
+              f"{max(live):>9.2f} {len(times):>7}")
+
+
+if __name__ == "__main__":
+    main()
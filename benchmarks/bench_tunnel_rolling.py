@@ -0,0 +1,128 @@
+"""Dead time of the tunnel loop: cycle mode vs rolling monitor.
+
+Runs the tunnel loop for `--seconds` against the pty device emulator
+sending `--rate` points per second (USBConnection, message router,
+`TunnelApp` on an Agg canvas with a fake Tk main loop):
+
+- cycle: `TUNNEL,n`, wait for TUNNEL,DONE, pause `RESTART_DELAY_MS`,
+  restart (the plot shows one cycle).
+- rolling: the next `TUNNEL,n` is sent on TUNNEL,DONE and the plot shows
+  the last `--window` samples, redrawn through the `RedrawScheduler`.
+
+Reports the samples received per second (against the device rate), the
+share of the time without incoming samples, the longest gap between two
+batches and the redraw time.
+
+Usage: python benchmarks/bench_tunnel_rolling.py [--rate 2000] [--counts 100]
+"""
+
+import argparse
+import queue
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import _common  # noqa: E402
+from bench_gui_pump import FakeTk  # noqa: E402
+from gui.redraw_scheduler import RedrawScheduler  # noqa: E402
+from message_router import MessageRouter  # noqa: E402
+from packet_parser import parse_tunnel_lines  # noqa: E402
+from rtm_emulator import RTMEmulator  # noqa: E402
+from soak_tunnel import make_app  # noqa: E402
+from usb_connection import USBConnection  # noqa: E402
+
+
+def run(args, rolling):
+    emu = RTMEmulator(rate=args.rate, noise=300).start()
+    inbox = queue.Queue()
+    conn = _common.make_connection(USBConnection, dispatcher_callback=inbox.put)
+    conn.port = emu.port
+    if not conn.establish_connection():
+        raise SystemExit(f"cannot open {emu.port}")
+    conn.start_receiving()
+
+    tk = FakeTk()
+    app = make_app(tk, conn.write_command, args.counts)
+    app.RESTART_DELAY_MS = TunnelDelay.ms
+    app.rolling_samples = args.window
+    draw_ms = []
+    redraw = app.redraw_plot
+
+    def timed_redraw():
+        t0 = time.perf_counter()
+        redraw()
+        draw_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    app.redraw_plot = timed_redraw
+    app.redraw_scheduler = RedrawScheduler(tk, timed_redraw, args.redraw_ms)
+    app.btn_mode = None
+    if rolling:
+        app.set_rolling(True)
+
+    router = MessageRouter()
+    router.set_parser("TUNNEL", parse_tunnel_lines)
+    router.register_batch(["TUNNEL"], app.update_batch)
+    arrivals = []
+    samples = [0]
+
+    def count(lines, parsed):
+        arrivals.append(time.perf_counter())
+        samples[0] += len(parsed[0])
+
+    router.register_batch(["TUNNEL"], count)
+
+    def pump():
+        try:
+            while True:
+                router.dispatch(inbox.get_nowait())
+        except queue.Empty:
+            pass
+        tk.after(1, pump)
+
+    t0 = time.perf_counter()
+
+    class Stop:
+        def is_set(self):
+            return time.perf_counter() - t0 >= args.seconds
+
+    try:
+        tk.after(0, pump)
+        app.send_tunnel_command()
+        tk.run_until(Stop())
+    finally:
+        conn.close_connection()
+        emu.stop()
+    elapsed = time.perf_counter() - t0
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    # a gap much longer than one batch at the device rate is dead time
+    batch_s = emu.chunk / args.rate
+    idle = sum(g - batch_s for g in gaps if g > 2 * batch_s)
+    return samples[0] / elapsed, idle / elapsed, max(gaps, default=0.0), draw_ms
+
+
+class TunnelDelay:
+    ms = 500
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=2000.0, help="device points per second")
+    parser.add_argument("--counts", type=int, default=100, help="points per TUNNEL cycle")
+    parser.add_argument("--window", type=int, default=2000, help="rolling samples")
+    parser.add_argument("--redraw-ms", type=float, default=50.0)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{args.rate:.0f} points/s, {args.counts} per cycle, {args.seconds:.0f} s per mode")
+    print(f"{'mode':<8} {'samples/s':>10} {'idle %':>7} {'max gap ms':>11} "
+          f"{'redraws':>8} {'draw p50 ms':>12}")
+    for name, rolling in (("cycle", False), ("rolling", True)):
+        rate, idle, gap, draw_ms = run(args, rolling)
+        print(f"{name:<8} {rate:>10.0f} {idle * 100:>7.1f} {gap * 1000:>11.0f} "
+              f"{len(draw_ms):>8} {_common.percentile(draw_ms, 50) or 0:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
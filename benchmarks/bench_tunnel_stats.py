@@ -0,0 +1,85 @@
+"""Tunnel statistics per batch: incremental vs recomputed from the history.
+
+Feeds `--samples` tunnel samples in batches of `--batch` points:
+
+- recompute: the statistics of the panel (in-limit ratio, mean/std/min/max
+  of ADC and DAC Z, ADC histogram) computed again from all samples so far
+  after every batch, as a naive panel would.
+- incremental: `TunnelStats.update` with the new batch only.
+
+Reports the time per batch at the start and end of the run and checks
+that both give the same values.
+
+Usage: python benchmarks/bench_tunnel_stats.py [--samples 100000] [--batch 64]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import _common
+from packet_parser import TUNNEL_DTYPE
+from tunnel_stats import TunnelStats
+
+TARGET, TOLERANCE = 1000, 200
+
+
+def make_samples(n, rng):
+    records = np.empty(n, dtype=TUNNEL_DTYPE)
+    adc = rng.normal(TARGET, 300, n).astype(np.int16)
+    records["flag"] = np.abs(adc - TARGET) <= TOLERANCE
+    records["adc"] = adc
+    records["z"] = 32768 + np.cumsum(rng.integers(-50, 51, n))
+    return records
+
+
+def recompute(history, edges):
+    adc = history["adc"].astype(float)
+    z = history["z"].astype(float)
+    index = np.clip(np.searchsorted(edges, adc, side="right"), 0, len(edges))
+    return {
+        "in_limit_ratio": np.count_nonzero(history["flag"] == 1) / len(history),
+        "adc": (adc.mean(), adc.std(ddof=1) if len(adc) > 1 else 0.0, adc.min(), adc.max()),
+        "z": (z.mean(), z.std(ddof=1) if len(z) > 1 else 0.0, z.min(), z.max()),
+        "histogram": np.bincount(index, minlength=len(edges) + 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=64, help="points per batch")
+    args = parser.parse_args()
+
+    records = make_samples(args.samples, np.random.default_rng(0))
+    stats = TunnelStats(TARGET, TOLERANCE)
+    edges = stats.edges()
+    naive, incremental = [], []
+    result = None
+    for end in range(args.batch, args.samples + 1, args.batch):
+        batch = records[end - args.batch:end]
+        t0 = time.perf_counter()
+        result = recompute(records[:end], edges)
+        naive.append((time.perf_counter() - t0) * 1000.0)
+        t0 = time.perf_counter()
+        stats.update(batch["flag"], batch["adc"], batch["z"])
+        incremental.append((time.perf_counter() - t0) * 1000.0)
+
+    same = (
+        np.isclose(result["in_limit_ratio"], stats.in_limit_ratio)
+        and np.allclose(result["adc"], (stats.adc.mean, stats.adc.std, stats.adc.min, stats.adc.max))
+        and np.allclose(result["z"], (stats.z.mean, stats.z.std, stats.z.min, stats.z.max))
+        and np.array_equal(result["histogram"], stats.histogram)
+    )
+    tenth = max(1, len(naive) // 10)
+    print(f"{stats.count} samples in batches of {args.batch}, time per batch [ms]")
+    print(f"{'':<12} {'first 10% p50':>14} {'last 10% p50':>13} {'total ms':>9}")
+    for name, times in (("recompute", naive), ("incremental", incremental)):
+        print(f"{name:<12} {_common.percentile(times[:tenth], 50):>14.3f} "
+              f"{_common.percentile(times[-tenth:], 50):>13.3f} {sum(times):>9.0f}")
+    print(f"same values: {'OK' if same else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""Reference copies of the original serial pipeline.
+
+Benchmarks compare the current implementation against these verbatim
+copies of the code paths they replaced, so "before" numbers stay
+reproducible after the originals are gone from `src/`.
+"""
+
+import time
+
+import numpy as np
+from matplotlib import cm
+
+import _common  # noqa: F401  (puts src/ on sys.path)
+from usb_connection import USBConnection
+
+
+class LegacyUSBConnection(USBConnection):
+    """`USBConnection` with the original polling reader and dispatcher loops.
+
+    The dispatcher callback receives one newline-joined string per call.
+    """
+
+    def read_queue_loop(self):
+        buffer = ""
+        while self.running:
+            while not self.data_queue.empty():
+                buffer += self.data_queue.get() + "\n"
+                lines = buffer.split("\n")
+                buffer = lines.pop()
+
+                if lines:
+                    self.dispatcher_callback("\n".join(lines))
+            time.sleep(0.01)
+
+    def stop_read_queue(self):
+        self.running = False
+        if self.reading_thread:
+            self.reading_thread.join(timeout=0.5)
+
+    def esp_to_queue_loop(self):
+        buffer = ""
+        while self.receive_running:
+            try:
+                if not self.connection:
+                    time.sleep(0.01)
+                    continue
+
+                in_wait = 0
+                try:
+                    in_wait = self.connection.in_waiting
+                except Exception:
+                    in_wait = 0
+
+                if in_wait > 0:
+                    raw = self.connection.read(in_wait)
+                    try:
+                        buffer += raw.decode(errors="replace")
+                    except Exception:
+                        buffer += str(raw)
+                    lines = buffer.split("\n")
+                    buffer = lines.pop()
+
+                    for line in lines:
+                        if line.strip():
+                            self.data_queue.put(line.strip())
+            except Exception as e:
+                print(f"Error in esp_to_queue: {e}")
+                self.receive_running = False
+                break
+
+
+def legacy_dispatch(self, messages):
+    """The original `MasterGui.dispatch_received_data` if/elif chain.
+
+    `self` needs update_terminal, app_manager (get_*_app), parameters,
+    calculate_adc_value and the idle/target attributes.
+    """
+    for msg in messages:
+        ms = msg.split(",")
+        messagetype = ms[0]
+        if messagetype in ("STOPPED", "IDLE"):
+            self.idle_received = True
+        if messagetype == "ADJUST":
+            self.update_terminal(msg)
+            adjust_app = None
+            if hasattr(self, "app_manager") and self.app_manager:
+                adjust_app = self.app_manager.get_adjust_app()
+            if adjust_app and getattr(adjust_app, "is_active", False):
+                adjust_app.update_data(msg)
+        elif messagetype == "PARAMETER":
+            try:
+                if len(ms) >= 3:
+                    self.parameters[ms[1]] = ms[2]
+                    try:
+                        if hasattr(self.app_manager, "app_frame"):
+                            setattr(self.app_manager.app_frame, "parameters", self.parameters)
+                    except Exception:
+                        pass
+            except Exception:
+                pass
+            self.update_terminal(msg)
+            if ms[1] == "targetNa":
+                self.target_adc = self.calculate_adc_value(ms[2])
+            if ms[1] == "toleranceNa":
+                self.tolerance_adc = self.calculate_adc_value(ms[2])
+            parameter_app = None
+            if hasattr(self, "app_manager") and self.app_manager:
+                parameter_app = self.app_manager.get_parameter_app()
+            if parameter_app:
+                parameter_app.update_data(msg)
+        elif messagetype == "TUNNEL":
+            if len(ms) >= 2 and ms[1] == "DONE":
+                self.update_terminal(msg)
+                tunnel_app = None
+                if hasattr(self, "app_manager") and self.app_manager:
+                    tunnel_app = self.app_manager.get_tunnel_app()
+                if tunnel_app:
+                    tunnel_app.update_data(msg)
+            elif len(ms) >= 4:
+                adc_value = int(ms[2])
+                if adc_value > 0x7FFF:
+                    adc_value -= 0x10000
+                ms[2] = str(adc_value)
+                msg = ",".join(ms)
+                self.update_terminal(msg)
+                tunnel_app = None
+                if hasattr(self, "app_manager") and self.app_manager:
+                    tunnel_app = self.app_manager.get_tunnel_app()
+                if tunnel_app:
+                    tunnel_app.update_data(msg)
+            else:
+                self.update_terminal(f"Invalid TUNNEL message: {msg}")
+        elif messagetype == "FIND":
+            self.update_terminal(msg)
+        elif messagetype == "DATA":
+            try:
+                if len(ms) == 2 and ms[1] == "DONE":
+                    measure_app = None
+                    if hasattr(self, "app_manager") and self.app_manager:
+                        measure_app = self.app_manager.get_measure_app()
+                    if measure_app:
+                        measure_app.redraw_plot()
+                    self.update_terminal("Measurement complete.")
+                if len(ms) == 4:
+                    measure_app = None
+                    if hasattr(self, "app_manager") and self.app_manager:
+                        measure_app = self.app_manager.get_measure_app()
+                    if measure_app:
+                        measure_app.update_data(msg)
+                if ms[1] == self.parameters.get("startX"):
+                    self.update_terminal(f"Processing Y {ms[2]}")
+            except Exception as e:
+                self.update_terminal(f"Error measure: {msg}, \nError: {e}")
+
+
+def legacy_terminal_update(self, message):
+    """Original `TerminalView.update` when called from the dispatcher thread:
+    one `after(0, ...)` callback per message (the main-thread branch and the
+    error fallbacks are left out)."""
+    if not getattr(self, "terminal", None):
+        return
+    try:
+        if not self.terminal.winfo_exists():
+            return
+    except Exception:
+        pass
+    self.parent.after(0, lambda: legacy_terminal_do_update(self, message))
+
+
+def legacy_terminal_do_update(self, message):
+    """Original `TerminalView._do_update`: insert and scroll per message."""
+    if not getattr(self, "terminal", None):
+        return
+    try:
+        if not self.terminal.winfo_exists():
+            return
+    except Exception:
+        pass
+    self.terminal.insert("end", message + "\n")
+    self.terminal.see("end")
+
+
+def legacy_store_point(self, x, y, z):
+    """Original file write of `MeasureApp.update_data`: open, append and close
+    the measurement file for every DATA point."""
+    try:
+        with open(
+            self.measurement_file_path, "a", encoding="utf-8", newline=""
+        ) as file:
+            file.write(f"{x},{y},{z}\n")
+    except Exception as e:
+        print(f"Warning: failed to write measurement to file: {e}")
+
+
+def legacy_measure_redraw(self):
+    """Original `MeasureApp.redraw_plot`: rebuilds arrays from the x/y/z
+    lists and runs a full `plot_trisurf` over all points."""
+    # Safety check to ensure the object is still active and has required attributes
+    if not hasattr(self, "is_active") or not self.is_active:
+        return
+    if not hasattr(self, "ax") or not hasattr(self, "canvas"):
+        return
+
+    # Clear the plot and redraw
+    self.ax.clear()
+    self.ax.set_xlim(0, 200)
+    self.ax.set_ylim(0, 200)
+    self.ax.set_zlim(0, 0xFFFF)
+
+    # Check if there is enough data to create a surface
+    if len(self.x_data) > 2 and len(self.y_data) > 2 and len(self.z_data) > 2:
+        # Prepare data for the 3D plot
+        x = np.array(self.x_data)
+        y = np.array(self.y_data)
+        z = np.array(self.z_data)
+
+        # Avoid passing degenerate data to the Delaunay triangulation (qhull).
+        # - Require at least 3 unique (x,y) points
+        # - Ensure points are not (near-)collinear
+        try:
+            xy = np.vstack((x, y)).T
+            # count unique (x,y) pairs
+            uniq_xy = np.unique(xy, axis=0)
+            if uniq_xy.shape[0] < 3:
+                msg = "MeasureApp: not enough unique (x,y) points for triangulation; skipping trisurf"
+                print(msg)
+                # fallback: simple scatter
+                self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
+                try:
+                    if getattr(self, "status_label", None):
+                        self.status_label.config(text="Plot: not enough unique (x,y), using scatter")
+                except Exception:
+                    pass
+            else:
+                # check for collinearity: rank < 2 => collinear
+                centered = uniq_xy - uniq_xy.mean(axis=0)
+                rank = np.linalg.matrix_rank(centered)
+                if rank < 2:
+                    msg = "MeasureApp: (x,y) points are collinear; skipping trisurf"
+                    print(msg)
+                    self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
+                    try:
+                        if getattr(self, "status_label", None):
+                            self.status_label.config(text="Plot: (x,y) collinear, using scatter")
+                    except Exception:
+                        pass
+                else:
+                    # safe to attempt triangular surface; catch qhull errors
+                    try:
+                        self.ax.plot_trisurf(x, y, z, cmap=cm.coolwarm, linewidth=0.2)
+                    except Exception as e:
+                        msg = f"MeasureApp: triangulation failed ({e}); falling back to scatter"
+                        print(msg)
+                        try:
+                            if getattr(self, "status_label", None):
+                                self.status_label.config(text="Plot: triangulation failed, using scatter")
+                        except Exception:
+                            pass
+                        self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
+        except Exception as e:
+            # Protect plotting from any unexpected failures
+            print(f"MeasureApp: error preparing plot data: {e}")
+            try:
+                self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
+            except Exception:
+                pass
+
+    # Redraw the canvas
+    self.canvas.draw()
+
+
+def legacy_tunnel_restart(self, make_canvas):
+    """Figure handling of the original `TunnelApp.restart`.
+
+    The original destroyed the frame and re-ran `__init__`, which created
+    a new `plt.subplots()` figure and canvas every cycle without closing
+    the old one. `make_canvas(fig)` stands in for `FigureCanvasTkAgg`.
+    """
+    import matplotlib.pyplot as plt
+
+    self.adc_data, self.z_data, self.colors = [], [], []
+    self.fig, self.ax = plt.subplots()
+    self.canvas = make_canvas(self.fig)
+    self.is_active = True
+    self.send_tunnel_command()
+
+
+def legacy_tunnel_update_batch(self, lines, parsed):
+    """Original `TunnelApp.update_batch`: points kept in lists, the plot is
+    only redrawn at TUNNEL,DONE."""
+    records, others = parsed
+    if len(records):
+        flags = records["flag"]
+        keep = (flags == 0) | (flags == 1)
+        self.adc_data.extend(records["adc"][keep].tolist())
+        self.z_data.extend(records["z"][keep].tolist())
+        self.colors.extend(np.where(flags[keep] == 1, "green", "red").tolist())
+    if "TUNNEL,DONE" in others:
+        self._on_cycle_done()
+
+
+def legacy_tunnel_redraw(self):
+    """Original `TunnelApp.redraw_plot` (clears and rebuilds the axes)."""
+    self.ax.clear()
+    self.ax.plot([], [], "o", label="Tunnel")
+    self.ax.plot([], [], "x", label="DAC Z")
+    self.ax.axhline(
+        y=self.target_adc + self.tolerance_adc, color="orange", linestyle="--", label="Limit hi"
+    )
+    self.ax.axhline(
+        y=self.target_adc - self.tolerance_adc, color="orange", linestyle="--", label="Limit Lo"
+    )
+    self.ax.scatter(
+        range(len(self.adc_data)), self.adc_data, c=self.colors, marker="o", label="Tunnel"
+    )
+    self.ax.scatter(
+        range(len(self.z_data)), self.z_data, c="black", marker="x", label="DAC Z"
+    )
+    self.ax.set_xlim(0, self.tunnel_counts)
+    self.ax.set_ylim(-1000, 0xFFFF)
+    self.ax.set_xlabel("Counter")
+    self.ax.set_ylabel("ADC and DAC Z")
+    self.ax.set_title("Tunnel Current ADC and DAC Z")
+    self.ax.legend()
+    self.fig.subplots_adjust(left=0.2, right=0.95, top=0.9, bottom=0.1)
+    self.canvas.draw()
@@ -0,0 +1,158 @@
+"""Soak test of the tunnel loop: memory over many TUNNEL cycles.
+
+Runs `--cycles` tunnel cycles of `--counts` points against the pty device
+emulator through `USBConnection`, the message router and
+`TunnelApp.update_batch`, with the restart delay set to zero. Every cycle
+is redrawn on an off-screen Agg canvas (no Tk needed); a fake Tk main
+loop provides `after()`.
+
+Prints the process RSS and the number of pyplot figures every
+`--report` cycles and fails (exit code 1) when RSS grew by more than
+`--max-growth-mb` after the warm-up or when figures accumulate.
+
+`--legacy` runs the original cycle instead (a new pyplot figure and
+canvas per restart, axes cleared and rebuilt on every redraw) to show
+the growth it caused.
+
+Usage: python benchmarks/soak_tunnel.py [--cycles 10000] [--counts 200] [--legacy]
+"""
+
+import argparse
+import os
+import queue
+import sys
+import time
+from types import MethodType
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+
+import _common  # noqa: E402
+from bench_gui_pump import FakeTk  # noqa: E402
+from gui.figure_pool import FigurePool  # noqa: E402
+from legacy import (  # noqa: E402
+    legacy_tunnel_redraw,
+    legacy_tunnel_restart,
+    legacy_tunnel_update_batch,
+)
+from message_router import MessageRouter  # noqa: E402
+from packet_parser import parse_tunnel_lines  # noqa: E402
+from rtm_emulator import RTMEmulator  # noqa: E402
+from tunnel import TunnelApp  # noqa: E402
+from usb_connection import USBConnection  # noqa: E402
+
+
+def rss_mb():
+    """Resident set size of this process in MB (Linux)."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def make_app(tk, write_command, counts):
+    """TunnelApp with an Agg canvas instead of the Tk widgets."""
+    app = TunnelApp.__new__(TunnelApp)
+    app.master = tk
+    app.write_command = write_command
+    app.return_to_main = lambda: None
+    app.is_active = True
+    app.target_adc, app.tolerance_adc = 1000, 200
+    app.adc_limits = None
+    app.simulate = False
+    app.gui_pump = None
+    app.is_frozen = False
+    app.closing = False
+    app.after_id = None
+    app.cycles = 0
+    app.RESTART_DELAY_MS = 0
+    app.tunnel_counts = float(counts)
+    app.rolling, app.ring = False, None
+    app.figure_pool = FigurePool(None, canvas_class=FigureCanvasAgg)
+    app.fig, app.canvas = app.figure_pool.acquire("tunnel")
+    app.ax = app.fig.add_subplot(111)
+    app._init_plot_elements()
+    app._init_stats()
+    app.clear_plot_data()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=10000)
+    parser.add_argument("--counts", type=int, default=200, help="points per cycle")
+    parser.add_argument("--report", type=int, default=1000, help="cycles between reports")
+    parser.add_argument("--warmup", type=int, default=500, help="cycles before the baseline")
+    parser.add_argument("--max-growth-mb", type=float, default=10.0)
+    parser.add_argument("--legacy", action="store_true", help="original restart path")
+    args = parser.parse_args()
+
+    emu = RTMEmulator(noise=300).start()
+    inbox = queue.Queue()
+    conn = _common.make_connection(USBConnection, dispatcher_callback=inbox.put)
+    conn.port = emu.port
+    if not conn.establish_connection():
+        raise SystemExit(f"cannot open {emu.port}")
+    conn.start_receiving()
+
+    tk = FakeTk()
+    app = make_app(tk, conn.write_command, args.counts)
+    if args.legacy:
+        app.adc_data, app.z_data, app.colors = [], [], []
+        app.update_batch = MethodType(legacy_tunnel_update_batch, app)
+        app.restart = lambda: legacy_tunnel_restart(app, FigureCanvasAgg)
+        app.redraw_plot = MethodType(legacy_tunnel_redraw, app)
+    router = MessageRouter()
+    router.set_parser("TUNNEL", parse_tunnel_lines)
+    router.register_batch(["TUNNEL"], app.update_batch)
+
+    def pump():
+        # the dispatcher thread hands over lists of lines, like GuiPump does
+        try:
+            while True:
+                router.dispatch(inbox.get_nowait())
+        except queue.Empty:
+            pass
+        tk.after(1, pump)
+
+    samples = []
+    figures = len(plt.get_fignums())
+    t0 = time.perf_counter()
+
+    class Stop:
+        last = 0
+
+        def is_set(self):
+            if app.cycles != self.last:
+                self.last = app.cycles
+                if app.cycles == args.warmup or app.cycles % args.report == 0:
+                    samples.append((app.cycles, rss_mb(), len(plt.get_fignums()),
+                                    time.perf_counter() - t0))
+                    cycles, rss, figs, elapsed = samples[-1]
+                    print(f"{cycles:>7} {rss:>8.1f} {figs:>8} {elapsed:>8.1f}", flush=True)
+            return app.cycles >= args.cycles
+
+    mode = "legacy" if args.legacy else "current"
+    print(f"{args.cycles} cycles of {args.counts} points ({mode})")
+    print(f"{'cycles':>7} {'RSS MB':>8} {'figures':>8} {'s':>8}")
+    try:
+        tk.after(0, pump)
+        app.send_tunnel_command()
+        tk.run_until(Stop())
+    finally:
+        conn.close_connection()
+        emu.stop()
+
+    baseline = next(rss for cycles, rss, _, _ in samples if cycles >= args.warmup)
+    growth = samples[-1][1] - baseline
+    figures_end = samples[-1][2]
+    ok = growth <= args.max_growth_mb and figures_end == figures
+    print(f"RSS growth after warm-up: {growth:+.1f} MB, figures: {figures} -> {figures_end}: "
+          f"{'OK' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -142,6 +142,8 @@ class AdjustApp:
 
     def update_data(self, message):
         """Updates the Adjust interface with new data"""
+        if not self.is_active:
+            return
 
         data = message.split(",")
         if data[0] == "ADJUST":
@@ -0,0 +1,113 @@
+"""Compact binary framing for DATA and TUNNEL records.
+
+After a successful `FORMAT,BINARY` handshake the firmware sends scan and
+tunnel points as fixed-size records instead of text lines:
+
+    offset  size  field
+    0       2     sync marker A5 5A
+    2       1     kind: 'D' (DATA) or 'T' (TUNNEL)
+    3       2     sequence counter (uint16, wraps)
+    5       2     DATA: x   | TUNNEL: flag
+    7       2     DATA: y   | TUNNEL: adc (raw uint16)
+    9       2     DATA: z   | TUNNEL: dac z
+    11      2     CRC-16/CCITT-FALSE over bytes 2..10
+
+All integers are little-endian. That is 13 bytes per point instead of
+~18 for `DATA,123,45,65535\\n`. Everything else (IDLE, PARAMETER, the DONE
+markers, ...) stays a text line, so the stream is a mix of both.
+
+`BinaryFramer` decodes such a mixed stream and returns the same text
+lines `LineFramer` would, so everything downstream of `USBConnection` is
+unchanged.
+"""
+
+import struct
+from binascii import crc_hqx
+
+from line_framer import LineFramer
+
+SYNC = b"\xa5\x5a"
+RECORD = struct.Struct("<2scHHHHH")
+RECORD_SIZE = RECORD.size  # 13
+KIND_DATA = b"D"
+KIND_TUNNEL = b"T"
+
+_PREFIX = {KIND_DATA: "DATA", KIND_TUNNEL: "TUNNEL"}
+
+
+def record_crc(body):
+    """CRC-16/CCITT-FALSE of the record bytes between sync marker and CRC."""
+    return crc_hqx(body, 0xFFFF)
+
+
+def encode_record(kind, seq, a, b, c):
+    """Build one binary record (used by the device emulator)."""
+    body = struct.pack("<cHHHH", kind, seq & 0xFFFF, a, b, c)
+    return SYNC + body + struct.pack("<H", record_crc(body))
+
+
+class BinaryFramer:
+    """Decode a stream of text lines mixed with binary records.
+
+    Offers the same interface as `LineFramer` (`feed`, `reset`, `pending`,
+    `overflows`) plus `crc_errors` (records dropped because the CRC or the
+    kind byte did not match) and `lost` (records missing according to the sequence counter).
+    """
+
+    def __init__(self, max_line_length=None):
+        self._text = LineFramer(max_line_length=max_line_length)
+        self.crc_errors = 0
+        self.lost = 0
+        self.records = 0
+        self.reset()
+
+    def reset(self):
+        self._buffer = bytearray()
+        self._text.reset()
+        self._next_seq = None
+
+    @property
+    def pending(self):
+        return len(self._buffer) + self._text.pending
+
+    @property
+    def overflows(self):
+        return self._text.overflows
+
+    def feed(self, data):
+        """Append `data` and return the lines (decoded records included) it completed."""
+        buf = self._buffer
+        buf += data
+        out = []
+        pos = 0
+        end = len(buf)
+        while pos < end:
+            sync = buf.find(SYNC, pos)
+            if sync == -1:
+                # No record start; keep a trailing A5 that may begin one
+                stop = end - 1 if buf[end - 1] == SYNC[0] else end
+                if stop > pos:
+                    out.extend(self._text.feed(buf[pos:stop]))
+                pos = stop
+                break
+            if sync > pos:
+                out.extend(self._text.feed(buf[pos:sync]))
+                pos = sync
+            if end - pos < RECORD_SIZE:
+                break  # wait for the rest of the record
+            _, kind, seq, a, b, c, crc = RECORD.unpack_from(buf, pos)
+            prefix = _PREFIX.get(kind)
+            if prefix is None or record_crc(buf[pos + 2 : pos + 11]) != crc:
+                # Not a valid record: treat the first byte as text and resync
+                self.crc_errors += 1
+                out.extend(self._text.feed(buf[pos : pos + 1]))
+                pos += 1
+                continue
+            if self._next_seq is not None and seq != self._next_seq:
+                self.lost += (seq - self._next_seq) & 0xFFFF
+            self._next_seq = (seq + 1) & 0xFFFF
+            self.records += 1
+            out.append(f"{prefix},{a},{b},{c}")
+            pos += RECORD_SIZE
+        del buf[:pos]
+        return out
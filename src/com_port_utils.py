@@ -1,3 +1,4 @@
+import os
 from tkinter import END, SINGLE, Button, Frame, Listbox, Toplevel, messagebox
 
 import serial.tools.list_ports
@@ -33,7 +34,13 @@ def set_selected_port(port_listbox, port_dialog):
 def is_com_port_available(port):
     # Check if the specified COM port is available
     available_ports = [p.device for p in serial.tools.list_ports.comports()]
-    return port in available_ports
+    if port in available_ports:
+        return True
+    # Pseudo terminals (e.g. tools/rtm_emulator.py) are not enumerated
+    if os.name != "nt" and port and port != "None":
+        real = os.path.realpath(port)
+        return real.startswith("/dev/pts/") and os.path.exists(real)
+    return False
 
 
 def select_port(master):
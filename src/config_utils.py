@@ -52,6 +52,12 @@ def create_default_config():
     default_config.add_section("USB")
     default_config.set("USB", "port", "COM3")
     default_config.set("USB", "baudrate", "460800")
+    # "binary" tries the FORMAT,BINARY handshake for compact scan data
+    default_config.set("USB", "protocol", "text")
+    # receive queue bound; TUNNEL/ADJUST overflow policy:
+    # drop-oldest, drop-newest or coalesce (DATA spills to disk instead)
+    default_config.set("USB", "queue_max_lines", "200000")
+    default_config.set("USB", "queue_policy", "drop-oldest")
 
     # ADC_TO_NA section
     default_config.add_section("ADC_TO_NA")
@@ -62,6 +68,49 @@ def create_default_config():
     # TUNNEL section
     default_config.add_section("TUNNEL")
     default_config.set("TUNNEL", "tunnelcounts", "100")
+    # cycle: one plot per TUNNEL cycle, 500 ms pause in between;
+    # rolling: last rolling_samples samples, next cycle sent on TUNNEL,DONE
+    default_config.set("TUNNEL", "mode", "cycle")
+    default_config.set("TUNNEL", "rolling_samples", "2000")
+    default_config.set("TUNNEL", "rolling_redraw_ms", "50")
+    # append per-cycle statistics to measurements/tunnel_stats_<date>.csv
+    default_config.set("TUNNEL", "stats_export", "false")
+
+    # MEASURE section: when measurement CSV files are fsynced
+    # (row = every completed row, done = at the end of the scan, never)
+    default_config.add_section("MEASURE")
+    default_config.set("MEASURE", "fsync", "done")
+    # plot while scanning and after DATA,DONE: 2d (live image) or 3d (surface)
+    default_config.set("MEASURE", "live_view", "2d")
+    default_config.set("MEASURE", "done_view", "3d")
+    # at most one plot redraw per interval while scanning
+    default_config.set("MEASURE", "redraw_interval_ms", "100")
+    # render the 3D surface in a worker process (off the Tk thread)
+    default_config.set("MEASURE", "render_process", "true")
+
+    # SESSION section: record the serial traffic to sessions/*.stmrec
+    default_config.add_section("SESSION")
+    default_config.set("SESSION", "record", "false")
+    # rotating log of the terminal lines in logs/*.log (gzip when closed)
+    default_config.set("SESSION", "log", "true")
+    default_config.set("SESSION", "log_max_mb", "50")
+    default_config.set("SESSION", "log_max_age_min", "60")
+    default_config.set("SESSION", "log_gzip", "true")
+
+    # GUI section: frame rate of the GUI update pump
+    default_config.add_section("GUI")
+    default_config.set("GUI", "fps", "50")
+
+    # TERMINAL section: scrollback of the terminal output
+    default_config.add_section("TERMINAL")
+    default_config.set("TERMINAL", "max_lines", "2000")
+    # display mode per message type: all, nth:N, summary or hide
+    for msg_type in ("tunnel", "adjust", "data", "parameter"):
+        default_config.set("TERMINAL", f"filter_{msg_type}", "all")
+
+    # DIAGNOSTICS section: metrics snapshots to diagnostics/*.jsonl (0 = off)
+    default_config.add_section("DIAGNOSTICS")
+    default_config.set("DIAGNOSTICS", "snapshot_interval_s", "10")
 
     # Write the config file
     with open(config_file, "w") as configfile:
@@ -2,6 +2,7 @@ from tkinter import Frame
 
 import measure
 from adjust import AdjustApp
+from gui.figure_pool import FigurePool
 from parameter import ParameterApp
 from sinus import SinusApp
 from tunnel import TunnelApp
@@ -18,12 +19,17 @@ class AppManager:
     def __init__(
         self,
         master,
+        router=None,
+        gui_pump=None,
         write_command=None,
         return_to_main=None,
         disable_menu_cb=None,
         enable_menu_cb=None,
     ):
         self.master = master
+        self.router = router
+        # GuiPump that moves handler calls onto the Tk thread (optional)
+        self.gui_pump = gui_pump
         self.write_command = write_command
         self.return_to_main_cb = return_to_main
         self.disable_menu_cb = disable_menu_cb
@@ -32,6 +38,8 @@ class AppManager:
         # Frame that holds app content (placed on the right)
         self.app_frame = Frame(self.master)
         self.app_frame.pack(side="right", fill="both", expand=True)
+        # Matplotlib figures/canvases of the panes, reused across opens
+        self.figures = FigurePool(self.app_frame)
 
         # App instances
         self.measure_app = None
@@ -42,13 +50,65 @@ class AppManager:
 
         self.target_adc = 0
         self.tolerance_adc = 0
+        # optional callable returning the current (target_adc, tolerance_adc)
+        self.adc_limits = None
+
+        # (message type, handler, batch) triples registered by the open app
+        self._app_handlers = []
+        # bumped when the open app closes, so queued pump events are skipped
+        self._generation = 0
 
     def set_write_command(self, write_command):
         self.write_command = write_command
 
+    def _register_handlers(self, handlers, batch=False, latest=False):
+        """Route the given {message type: handler} pairs to the open app.
+
+        batch=True registers batch handlers, called as handler(lines, parsed).
+        With a GUI pump the handlers run on the Tk thread; latest=True only
+        applies the newest message of each type per frame.
+        """
+        if self.router is None:
+            return
+        for msg_type, handler in handlers.items():
+            handler = self._on_gui_thread(handler, msg_type if latest else None)
+            if batch:
+                self.router.register_batch(msg_type, handler)
+            else:
+                self.router.register(msg_type, handler)
+            self._app_handlers.append((msg_type, handler, batch))
+
+    def _on_gui_thread(self, handler, key=None):
+        """Wrap `handler` so it is applied by the GUI pump (if there is one)."""
+        if self.gui_pump is None:
+            return handler
+        generation = self._generation
+
+        def apply(*args):
+            # the app may have closed while the event waited for its frame
+            if self._generation == generation:
+                handler(*args)
+
+        apply.__name__ = getattr(handler, "__name__", "handler")
+        return self.gui_pump.wrap(apply, key=key)
+
+    def _unregister_handlers(self):
+        if self.router is not None:
+            for msg_type, handler, batch in self._app_handlers:
+                if batch:
+                    self.router.unregister_batch(msg_type, handler)
+                else:
+                    self.router.unregister(msg_type, handler)
+        self._app_handlers = []
+        self._generation += 1
+
     def _clear_app_frame(self):
+        self._unregister_handlers()
+        # hand the figures back first; pooled canvases survive the cleanup
+        self.figures.release_all()
         for widget in self.app_frame.winfo_children():
-            widget.destroy()
+            if not self.figures.owns(widget):
+                widget.destroy()
 
     def disable_menu(self):
         if callable(self.disable_menu_cb):
@@ -76,7 +136,9 @@ class AppManager:
             start_y=_to_int(sy, None),
             max_x=_to_int(mx, None),
             max_y=_to_int(my, None),
+            figure_pool=self.figures,
         )
+        self._register_handlers({"DATA": self.measure_app.update_batch}, batch=True)
         self.disable_menu()
 
     def open_measure_simulate(self):
@@ -91,7 +153,11 @@ class AppManager:
             target_adc=self.target_adc,
             tolerance_adc=self.tolerance_adc,
             simulate=simulate,
+            gui_pump=self.gui_pump,
+            figure_pool=self.figures,
+            adc_limits=self.adc_limits,
         )
+        self._register_handlers({"TUNNEL": self.tunnel_app.update_batch}, batch=True)
         self.disable_menu()
 
     def open_tunnel_simulate(self):
@@ -104,6 +170,7 @@ class AppManager:
             write_command=self.write_command,
             return_to_main=self.return_to_main_cb,
         )
+        self._register_handlers({"ADJUST": self.adjust_app.update_data}, latest=True)
         self.disable_menu()
 
     def open_sinus(self):
@@ -125,13 +192,14 @@ class AppManager:
         self.parameter_app = ParameterApp(
             self.app_frame, self.write_command, self.return_to_main_cb
         )
+        self._register_handlers({"PARAMETER": self.parameter_app.update_data})
         try:
             self.parameter_app.request_parameter()
         except Exception:
             pass
         self.disable_menu()
 
-    # Helpers used by MasterGui.dispatch_received_data:
+    # Accessors for the currently open apps:
     def get_adjust_app(self):
         return self.adjust_app
 
@@ -0,0 +1,111 @@
+"""Tools -> Diagnostics: live view of the pipeline metrics.
+
+A small Toplevel that refreshes once per second from a `PipelineMetrics`
+snapshot. It stays open while measure/tunnel panes run.
+"""
+
+from tkinter import Toplevel, ttk
+
+REFRESH_MS = 1000
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def format_snapshot(snap):
+    """Render a metrics snapshot as text rows for the diagnostics pane."""
+    rates = snap.get("rates", {})
+    rows = [
+        f"Uptime            {snap['uptime_s']:.0f} s",
+        f"Bytes in          {snap['bytes_in']}  ({rates.get('bytes_per_s', 0):.0f} B/s)",
+        f"Lines in          {snap['lines_in']}  ({rates.get('lines_per_s', 0):.0f} /s)",
+        f"Queue depth       {snap['queue_depth']}  (max {snap['queue_max']})",
+        f"Queue overload    {snap['queue_dropped']} dropped, {snap['queue_spilled']} spilled",
+        f"Decode errors     {snap['decode_errors']}",
+        f"Handler errors    {snap['dispatch_errors']}",
+        "",
+        "Lines per type            total       /s",
+    ]
+    by_type = rates.get("lines_per_s_by_type", {})
+    for msg_type, count in sorted(snap["lines_by_type"].items()):
+        rows.append(f"  {msg_type:<16}{count:>13}{by_type.get(msg_type, 0):>9.0f}")
+    rows.append("")
+    rows.append("Timing [ms]               mean    p50    p99    max")
+    for label, key in (
+        ("receive->dispatch", "receive_to_dispatch"),
+        ("dispatch->render", "dispatch_to_render"),
+        ("GUI frame time", "frame_time"),
+    ):
+        h = snap[key]
+        rows.append(
+            f"  {label:<20}{_ms(h['mean_ms']):>8}{_ms(h['p50_ms']):>7}"
+            f"{_ms(h['p99_ms']):>7}{_ms(h['max_ms']):>7}"
+        )
+    figures = snap.get("figures")
+    if figures:
+        rows.append("")
+        rows.append(
+            f"Figures/canvases  {figures['figures']}/{figures['canvases']}"
+            f"  ({figures['in_use']} in use, {figures['idle']} idle)"
+        )
+        rows.append(
+            f"  created {figures['created']}, reused {figures['reused']},"
+            f" destroyed {figures['destroyed']}"
+        )
+    return "\n".join(rows)
+
+
+class DiagnosticsWindow:
+    def __init__(self, master, metrics, snapshot_path=None):
+        self.metrics = metrics
+        self.win = Toplevel(master)
+        self.win.title("Diagnostics")
+        self.win.resizable(False, False)
+        container = ttk.Frame(self.win, padding=12)
+        container.pack(fill="both", expand=True)
+        self.label = ttk.Label(container, font="TkFixedFont", justify="left")
+        self.label.pack(anchor="w")
+        if snapshot_path:
+            ttk.Label(container, text=f"Snapshots: {snapshot_path}").pack(
+                anchor="w", pady=(8, 0)
+            )
+        ttk.Button(container, text="Close", command=self.close).pack(
+            anchor="e", pady=(12, 0)
+        )
+        self.win.protocol("WM_DELETE_WINDOW", self.close)
+        self._previous = None
+        self._after_id = None
+        self.refresh()
+
+    def is_open(self):
+        try:
+            return bool(self.win.winfo_exists())
+        except Exception:
+            return False
+
+    def lift(self):
+        try:
+            self.win.lift()
+        except Exception:
+            pass
+
+    def refresh(self):
+        snap = self.metrics.snapshot(self._previous)
+        self._previous = snap
+        try:
+            self.label.config(text=format_snapshot(snap))
+            self._after_id = self.win.after(REFRESH_MS, self.refresh)
+        except Exception:
+            self._after_id = None
+
+    def close(self):
+        try:
+            if self._after_id is not None:
+                self.win.after_cancel(self._after_id)
+        except Exception:
+            pass
+        try:
+            self.win.destroy()
+        except Exception:
+            pass
@@ -0,0 +1,178 @@
+"""Matplotlib figures and canvases for the app panes, without pyplot.
+
+Figures made with `plt.figure()`/`plt.subplots()` are registered in
+pyplot's global figure manager and live until `plt.close()`, so every
+open/close of a pane used to leak a figure with its Agg buffers.
+
+`FigurePool` creates plain `matplotlib.figure.Figure` objects with a
+`FigureCanvasTkAgg` and hands them out per pane type ("measure",
+"tunnel", ...):
+
+- `acquire(pane, container)` returns (figure, canvas), reusing an idle
+  pair of the same pane type when there is one; the canvas widget is
+  packed into `container`.
+- `connect()` registers matplotlib event handlers that are disconnected
+  again on release.
+- `release_all()` (called by `AppManager._clear_app_frame`) clears the
+  figures in use and keeps up to `max_idle` per pane type for the next
+  open; the rest are destroyed right away.
+
+The canvas widgets are children of the pool's `parent` (the app frame),
+so destroying a pane's own frame does not destroy a pooled canvas.
+"""
+
+from matplotlib.figure import Figure
+
+
+class FigurePool:
+    def __init__(self, parent, canvas_class=None, max_idle=1):
+        """parent: Tk widget the canvases are created in; it must contain
+        the pane frames passed to `acquire`.
+        canvas_class: canvas type (default `FigureCanvasTkAgg`).
+        """
+        if canvas_class is None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+            canvas_class = FigureCanvasTkAgg
+        self.parent = parent
+        self.canvas_class = canvas_class
+        self.max_idle = max_idle
+        self._idle = {}  # pane type -> [(figure, canvas), ...]
+        self._in_use = {}  # id(canvas) -> (pane type, figure, canvas)
+        self._cids = {}  # id(canvas) -> [connection ids]
+        # figure/canvas pairs alive (in use + idle); plain int so other
+        # threads (metrics snapshots) can read it
+        self.live = 0
+        # statistics
+        self.created = 0
+        self.reused = 0
+        self.destroyed = 0
+
+    def acquire(self, pane, container=None, **pack):
+        """Return (figure, canvas) for a pane of type `pane`.
+
+        The figure is empty; the canvas widget is packed into `container`
+        with `pack` options (default: top, fill both, expand).
+        """
+        idle = self._idle.get(pane)
+        if idle:
+            fig, canvas = idle.pop()
+            self.reused += 1
+        else:
+            fig = Figure()
+            canvas = self._new_canvas(fig)
+            self.created += 1
+            self.live += 1
+        self._in_use[id(canvas)] = (pane, fig, canvas)
+        widget = self._tk_widget(canvas)
+        if widget is not None and container is not None:
+            options = {"side": "top", "fill": "both", "expand": True}
+            options.update(pack)
+            widget.pack(in_=container, **options)
+            # a reused widget is older than the pane frame; keep it on top
+            widget.lift()
+        return fig, canvas
+
+    def connect(self, canvas, event, handler):
+        """`canvas.mpl_connect` that is undone when the canvas is released."""
+        cid = canvas.mpl_connect(event, handler)
+        self._cids.setdefault(id(canvas), []).append(cid)
+        return cid
+
+    def release(self, canvas):
+        """Return a canvas (and its figure) to the pool."""
+        entry = self._in_use.pop(id(canvas), None)
+        if entry is None:
+            return
+        pane, fig, canvas = entry
+        for cid in self._cids.pop(id(canvas), ()):
+            try:
+                canvas.mpl_disconnect(cid)
+            except Exception:
+                pass
+        try:
+            fig.clear()
+        except Exception as e:
+            print(f"FigurePool: could not clear figure: {e}")
+        widget = self._tk_widget(canvas)
+        if widget is not None:
+            try:
+                widget.pack_forget()
+            except Exception:
+                pass
+        idle = self._idle.setdefault(pane, [])
+        if len(idle) < self.max_idle and self._widget_alive(widget):
+            idle.append((fig, canvas))
+        else:
+            self._destroy(fig, canvas)
+
+    def release_all(self):
+        """Release every canvas in use (the app frame is being cleared)."""
+        for _, _, canvas in list(self._in_use.values()):
+            self.release(canvas)
+
+    def owns(self, widget):
+        """True if `widget` is the Tk widget of a pooled canvas."""
+        for _, canvas in self._pairs():
+            if self._tk_widget(canvas) is widget:
+                return True
+        return False
+
+    def close(self):
+        """Destroy all figures and canvases, idle and in use."""
+        self.release_all()
+        for pairs in self._idle.values():
+            for fig, canvas in pairs:
+                self._destroy(fig, canvas)
+        self._idle = {}
+
+    def stats(self):
+        """Live figure/canvas counts for diagnostics."""
+        live = self.live
+        in_use = len(self._in_use)
+        return {
+            "figures": live,
+            "canvases": live,
+            "in_use": in_use,
+            "idle": max(0, live - in_use),
+            "created": self.created,
+            "reused": self.reused,
+            "destroyed": self.destroyed,
+        }
+
+    def _pairs(self):
+        for _, fig, canvas in self._in_use.values():
+            yield fig, canvas
+        for pairs in self._idle.values():
+            yield from pairs
+
+    def _new_canvas(self, fig):
+        if hasattr(self.canvas_class, "get_tk_widget"):
+            # Tk canvas: the widget lives in the pool's parent
+            return self.canvas_class(fig, master=self.parent)
+        return self.canvas_class(fig)
+
+    @staticmethod
+    def _tk_widget(canvas):
+        get_widget = getattr(canvas, "get_tk_widget", None)
+        return get_widget() if callable(get_widget) else None
+
+    @staticmethod
+    def _widget_alive(widget):
+        if widget is None:
+            return True
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def _destroy(self, fig, canvas):
+        widget = self._tk_widget(canvas)
+        if widget is not None:
+            try:
+                widget.destroy()
+            except Exception:
+                pass
+        fig.clear()
+        self.destroyed += 1
+        self.live -= 1
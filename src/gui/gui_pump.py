@@ -0,0 +1,162 @@
+"""Frame-based update pump that applies GUI work on the Tk thread.
+
+The serial dispatcher runs on a background thread; Tk widgets must only be
+touched from the thread running the Tk main loop. Background code posts
+work into the `GuiPump` instead of calling widgets directly, and the pump
+applies it from a Tk `after()` timer at a fixed frame rate:
+
+- `post(fn, *args)`: applied in order, every call (terminal lines, DATA
+  and TUNNEL batches).
+- `post_latest(key, fn, *args)`: coalesced, only the newest call per key
+  and frame is applied (ADJUST readings for the labels).
+- `request_redraw(key, fn)`: called once at the end of the frame no matter
+  how often it was requested (plot redraws).
+
+Ordered events are applied until the frame budget is used up; the rest
+waits for the next frame so the UI stays responsive under load.
+Coalesced updates and redraws run every frame.
+"""
+
+import threading
+import time
+from collections import deque
+
+from pipeline_metrics import LatencyHistogram
+
+
+class GuiPump:
+    def __init__(self, master, fps=50, budget_ms=None, metrics=None):
+        """master: any Tk widget (for `after`).
+
+        fps: frame rate of the pump; budget_ms: time per frame for ordered
+        events (default: half a frame). metrics: optional PipelineMetrics
+        that receives frame statistics.
+        """
+        self.master = master
+        self.interval_ms = max(1, int(round(1000.0 / fps)))
+        self.budget_s = (budget_ms if budget_ms is not None else self.interval_ms / 2) / 1000.0
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._events = deque()
+        self._latest = {}
+        self._redraws = {}
+        self._after_id = None
+        self.running = False
+        # statistics
+        self.frames = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.redraws = 0
+        self.frame_time = LatencyHistogram()
+        self.post_to_apply = LatencyHistogram()
+
+    # any thread
+    def post(self, fn, *args):
+        """Apply fn(*args) on the Tk thread, in posting order."""
+        item = (time.perf_counter_ns(), fn, args)
+        with self._lock:
+            self._events.append(item)
+
+    def post_latest(self, key, fn, *args):
+        """Apply fn(*args) on the Tk thread; newer posts with `key` replace it."""
+        item = (time.perf_counter_ns(), fn, args)
+        with self._lock:
+            if key in self._latest:
+                self.coalesced += 1
+            self._latest[key] = item
+
+    def request_redraw(self, key, fn):
+        """Call fn() once at the end of the next frame."""
+        with self._lock:
+            self._redraws[key] = fn
+
+    def wrap(self, handler, key=None):
+        """Return a callable that posts handler(*args) instead of calling it.
+
+        With `key` the posts are coalesced (see post_latest).
+        """
+        if key is None:
+            return lambda *args: self.post(handler, *args)
+        return lambda *args: self.post_latest(key, handler, *args)
+
+    def pending(self):
+        with self._lock:
+            return len(self._events) + len(self._latest) + len(self._redraws)
+
+    # Tk thread
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._after_id = self.master.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        self.running = False
+        if self._after_id is not None:
+            try:
+                self.master.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        if not self.running:
+            return
+        t0 = time.perf_counter()
+        try:
+            self.run_frame()
+        finally:
+            if self.running:
+                # keep a fixed rate: subtract the time spent in this frame
+                spent_ms = (time.perf_counter() - t0) * 1000.0
+                delay = max(1, int(self.interval_ms - spent_ms))
+                try:
+                    self._after_id = self.master.after(delay, self._tick)
+                except Exception:
+                    self.running = False
+
+    def run_frame(self):
+        """Apply one frame of pending work; returns the number of calls made."""
+        t0 = time.perf_counter()
+        deadline = t0 + self.budget_s
+        done = 0
+        events = self._events
+        while events:
+            # deque.popleft is atomic, posting threads only append
+            t_post, fn, args = events.popleft()
+            self._apply(t_post, fn, args)
+            done += 1
+            if time.perf_counter() > deadline:
+                break
+        with self._lock:
+            latest = self._latest
+            redraws = self._redraws
+            self._latest = {}
+            self._redraws = {}
+        for t_post, fn, args in latest.values():
+            self._apply(t_post, fn, args)
+            done += 1
+        for fn in redraws.values():
+            try:
+                fn()
+            except Exception as e:
+                print(f"GuiPump: redraw failed: {e}")
+            done += 1
+        self.redraws += len(redraws)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        self.frames += 1
+        if done:
+            self.frame_time.add(elapsed_ms)
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.frame(elapsed_ms if done else None, caught_up=not events)
+        return done
+
+    def _apply(self, t_post, fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"GuiPump: error in {getattr(fn, '__name__', fn)}: {e}")
+        self.applied += 1
+        self.post_to_apply.add((time.perf_counter_ns() - t_post) / 1e6)
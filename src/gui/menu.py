@@ -12,7 +12,7 @@ def create_menu(master, callbacks=None):
     Expected keys: open_settings, on_closing, open_measure, open_parameter,
     open_adjust, open_sinus, open_tunnel, open_tunnel_simulate,
     open_measure_simulate, show_simulation_info,
-    show_about
+    show_about, show_diagnostics
     """
     if callbacks is None:
         callbacks = {}
@@ -53,5 +53,9 @@ def create_menu(master, callbacks=None):
     )
 
     tools_menu.add_command(label="Info Simulation", command=cb("show_simulation_info"))
+    tools_menu.add_separator()
+    tools_menu.add_command(label="Diagnostics", command=cb("show_diagnostics"))
+    # kept so disable_menu can leave Diagnostics usable while an app runs
+    menu_bar.tools_menu = tools_menu
 
     return menu_bar
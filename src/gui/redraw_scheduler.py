@@ -0,0 +1,86 @@
+"""Coalescing redraw scheduler for plots.
+
+Data handlers call `request()` as often as they like; the scheduler runs
+the draw function from a Tk `after()` timer, at most once per
+`interval_ms`. Requests that arrive while a draw is already scheduled are
+merged into it and counted as dropped frames. When a draw takes longer
+than the interval, the next one waits as long as the last draw took, so
+drawing never uses more than half of the Tk thread and acquisition keeps
+up; the frames in between are dropped, not queued.
+
+The last request is always drawn: every request after a draw schedules
+one more. `flush()` draws pending work immediately (end of a scan).
+"""
+
+import time
+
+
+class RedrawScheduler:
+    def __init__(self, widget, draw, interval_ms=100, clock=time.perf_counter):
+        """widget: any Tk widget (for `after`); draw: callable doing the redraw."""
+        self.widget = widget
+        self.draw = draw
+        self.interval_s = max(0.0, interval_ms / 1000.0)
+        self.clock = clock
+        self._after_id = None
+        self._last_start = None
+        self._last_end = None
+        self._last_duration = 0.0
+        # statistics
+        self.requests = 0
+        self.drawn = 0
+        self.dropped = 0
+
+    @property
+    def pending(self):
+        return self._after_id is not None
+
+    def request(self):
+        """Ask for a redraw; merged into an already scheduled one."""
+        self.requests += 1
+        if self._after_id is not None:
+            self.dropped += 1
+            return
+        try:
+            self._after_id = self.widget.after(self._delay_ms(), self._run)
+        except Exception as e:
+            print(f"RedrawScheduler: could not schedule redraw: {e}")
+
+    def flush(self):
+        """Draw a pending request now."""
+        if self._after_id is None:
+            return
+        self.cancel()
+        self._run()
+
+    def cancel(self):
+        if self._after_id is None:
+            return
+        try:
+            self.widget.after_cancel(self._after_id)
+        except Exception:
+            pass
+        self._after_id = None
+
+    def _delay_ms(self):
+        if self._last_start is None:
+            return 0
+        if self._last_duration <= self.interval_s:
+            due = self._last_start + self.interval_s
+        else:
+            # drawing is slower than the interval: leave as much time free
+            # as the last draw took
+            due = self._last_end + self._last_duration
+        return max(0, int((due - self.clock()) * 1000.0))
+
+    def _run(self):
+        self._after_id = None
+        self.drawn += 1
+        start = self.clock()
+        try:
+            self.draw()
+        except Exception as e:
+            print(f"RedrawScheduler: redraw failed: {e}")
+        self._last_start = start
+        self._last_end = self.clock()
+        self._last_duration = self._last_end - start
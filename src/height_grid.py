@@ -0,0 +1,104 @@
+"""Preallocated height map of a scan.
+
+The scan area (startX..maxX, startY..maxY, both inclusive) is known before
+the first DATA point arrives, so `HeightGrid` allocates one `uint16` array
+for the z values plus a boolean mask of the cells received so far. Storing
+a point is an index assignment; memory does not grow during the scan and
+the plot and export code read the grid instead of rebuilding arrays from
+lists of points.
+
+A point outside the area (parameters changed on the device, or unknown at
+start) grows the grid once to include it.
+"""
+
+import numpy as np
+
+
+class HeightGrid:
+    def __init__(self, start_x, start_y, max_x, max_y):
+        self.x0 = int(start_x)
+        self.y0 = int(start_y)
+        width = max(1, int(max_x) - self.x0 + 1)
+        height = max(1, int(max_y) - self.y0 + 1)
+        self.z = np.zeros((height, width), dtype=np.uint16)
+        self.filled = np.zeros((height, width), dtype=bool)
+        self.count = 0
+        # highest row index (into the grid) that received a point, -1 = none
+        self.last_row = -1
+
+    @property
+    def shape(self):
+        return self.z.shape
+
+    @property
+    def extent(self):
+        """(x_min, x_max, y_min, y_max) of the grid in device coordinates."""
+        height, width = self.z.shape
+        return self.x0, self.x0 + width - 1, self.y0, self.y0 + height - 1
+
+    def set_point(self, x, y, z):
+        """Store one point (O(1))."""
+        col = x - self.x0
+        row = y - self.y0
+        height, width = self.z.shape
+        if not (0 <= row < height and 0 <= col < width):
+            self._grow(x, x, y, y)
+            col = x - self.x0
+            row = y - self.y0
+        if not self.filled[row, col]:
+            self.filled[row, col] = True
+            self.count += 1
+        self.z[row, col] = min(max(z, 0), 0xFFFF)
+        if row > self.last_row:
+            self.last_row = row
+
+    def set_points(self, xs, ys, zs):
+        """Store a run of points (arrays or lists) with one scatter assignment."""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if not len(xs):
+            return
+        cols = xs - self.x0
+        rows = ys - self.y0
+        height, width = self.z.shape
+        if cols.min() < 0 or rows.min() < 0 or cols.max() >= width or rows.max() >= height:
+            self._grow(xs.min(), xs.max(), ys.min(), ys.max())
+            cols = xs - self.x0
+            rows = ys - self.y0
+        new = ~self.filled[rows, cols]
+        if new.any():
+            # a run can repeat a cell; count each new cell once
+            self.count += len(np.unique(rows[new] * self.z.shape[1] + cols[new]))
+            self.filled[rows, cols] = True
+        self.z[rows, cols] = np.clip(zs, 0, 0xFFFF)
+        self.last_row = max(self.last_row, int(rows.max()))
+
+    def complete_rows(self):
+        """Number of leading rows that are completely filled."""
+        if self.last_row < 0:
+            return 0
+        done = self.filled[: self.last_row + 1].all(axis=1)
+        incomplete = np.flatnonzero(~done)
+        return int(incomplete[0]) if len(incomplete) else self.last_row + 1
+
+    def points(self):
+        """(x, y, z) arrays of all filled cells, in row-major order."""
+        rows, cols = np.nonzero(self.filled)
+        return cols + self.x0, rows + self.y0, self.z[rows, cols]
+
+    def _grow(self, x_min, x_max, y_min, y_max):
+        _, old_x1, _, old_y1 = self.extent
+        x0 = min(self.x0, int(x_min))
+        y0 = min(self.y0, int(y_min))
+        x1 = max(old_x1, int(x_max))
+        y1 = max(old_y1, int(y_max))
+        z = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=np.uint16)
+        filled = np.zeros(z.shape, dtype=bool)
+        dy, dx = self.y0 - y0, self.x0 - x0
+        height, width = self.z.shape
+        z[dy : dy + height, dx : dx + width] = self.z
+        filled[dy : dy + height, dx : dx + width] = self.filled
+        self.z, self.filled = z, filled
+        self.x0, self.y0 = x0, y0
+        if self.last_row >= 0:
+            self.last_row += dy
@@ -0,0 +1,77 @@
+"""Incremental line framing for the serial byte stream.
+
+`LineFramer` collects raw bytes in a `bytearray`, searches only the newly
+appended bytes for newlines and decodes nothing but complete lines, so a
+line that stays unterminated across many reads is never re-copied or
+re-decoded, and a multi-byte character split across two reads is decoded
+correctly. An optional maximum line length protects against a corrupt
+stream that never sends a newline.
+"""
+
+
+class LineFramer:
+    """Split a byte stream into stripped, non-empty text lines.
+
+    Parameters
+    - max_line_length: longest accepted line (None = unlimited). Longer
+      lines are discarded up to the next newline and counted in
+      `overflows`; a partial line is never buffered beyond this many bytes.
+    - encoding/errors: passed to the decoder for each complete line
+    """
+
+    def __init__(self, max_line_length=None, encoding="utf-8", errors="replace"):
+        self.max_line_length = max_line_length
+        self.encoding = encoding
+        self.errors = errors
+        self.overflows = 0
+        self.reset()
+
+    def reset(self):
+        """Drop any buffered partial line."""
+        self._buffer = bytearray()
+        self._scan_from = 0
+        self._discarding = False
+
+    @property
+    def pending(self):
+        """Number of buffered bytes that do not form a complete line yet."""
+        return len(self._buffer)
+
+    def feed(self, data):
+        """Append `data` and return the list of lines it completed."""
+        buf = self._buffer
+        buf += data
+        limit = self.max_line_length
+        # Only the newly appended bytes can contain the next newline
+        end = buf.rfind(b"\n", self._scan_from)
+        if end == -1:
+            if limit is not None and len(buf) > limit:
+                # No newline in sight: drop the partial line instead of growing
+                if not self._discarding:
+                    self.overflows += 1
+                    self._discarding = True
+                del buf[:]
+            self._scan_from = len(buf)
+            return []
+
+        # Decode all complete lines in one go, keep the partial tail as bytes
+        with memoryview(buf) as view:
+            text = str(view[:end], self.encoding, self.errors)
+        del buf[: end + 1]
+        self._scan_from = len(buf)
+
+        parts = text.split("\n")
+        if self._discarding:
+            # tail of an overlong line that was already dropped
+            parts[0] = ""
+            self._discarding = False
+        if limit is not None and len(text) > limit:
+            kept = [part for part in parts if len(part) <= limit]
+            self.overflows += len(parts) - len(kept)
+            parts = kept
+        if limit is not None and len(buf) > limit:
+            self.overflows += 1
+            self._discarding = True
+            del buf[:]
+            self._scan_from = 0
+        return [line for line in map(str.strip, parts) if line]
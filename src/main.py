@@ -1,16 +1,28 @@
 import atexit
+import multiprocessing
 import os
 import sys
 import time
+from datetime import datetime
 from tkinter import Frame, Tk, messagebox, ttk, Toplevel
 
 import com_port_utils  # Import the com_port_utils module
 import config_utils
 import usb_connection
 from gui.app_manager import AppManager
+from gui.diagnostics import DiagnosticsWindow
+from gui.gui_pump import GuiPump
 from gui.menu import create_menu
+from message_router import MessageRouter, message_type
+from packet_parser import parse_data_lines, parse_tunnel_lines
+from pipeline_metrics import MetricsSnapshotWriter, PipelineMetrics
+import terminal
 from terminal import TerminalView
+from terminal_filter import TerminalFilter
 import parameters
+from session_log import SessionLog
+from session_recorder import SessionRecorder
+import surface_renderer
 
 ## Use fcntl over msvcrt if Linux is used
 IS_WINDOWS = os.name == "nt"
@@ -91,10 +103,7 @@ def cleanup_tasks():
 
 def global_on_close():
     print("on_close: Function triggered")
-    try:
-        esp_api_client.usb_conn.write_command("STOP")
-    except Exception as e:
-        print(f"Error sending STOP command: {e}")
+    esp_api_client.shutdown()
     cleanup_tasks()
     root.destroy()
 
@@ -119,12 +128,30 @@ class MasterGui:
         except Exception as e:
             print(f"Icon not set (ignored): {e}")
 
+        # storage for latest device parameters (key -> raw string value)
+        self.parameters = {}
+        # Initialize the idle_received attribute
+        self.idle_received = False
+        self.target_adc = 0
+        self.tolerance_adc = 0
+        # Rotating on-disk copy of the terminal ([SESSION] log)
+        self.session_log = self.start_session_log()
+        # Per-type terminal display modes (Filter button in the terminal pane)
+        self.terminal_filter = TerminalFilter.from_config()
+        # Message routing table; apps add their handlers when they open
+        self._init_dispatch()
+        # Pipeline counters for Tools -> Diagnostics and the snapshot file
+        self.metrics = PipelineMetrics()
+        self.router.count_lines = self.metrics.lines_dispatched
+        self.metrics_writer = None
+        self.diagnostics_window = None
+        # All widget updates from the serial threads go through the pump
+        self.gui_pump = self._create_gui_pump()
+
         self.setup_gui_interface()
         # Initialize the USB connection handler
         self.initialize_usb_connection()
-
-        # Initialize the idle_received attribute
-        self.idle_received = False
+        self.start_metrics_snapshots()
 
         # Initialize the AdjustApp instance
         self.adjust_app = None
@@ -137,10 +164,6 @@ class MasterGui:
         # dispatch_received_data is called before those apps are opened.
         self.tunnel_app = None
         self.sinus_app = None
-        self.target_adc = 0
-        self.tolerance_adc = 0
-        # storage for latest device parameters (key -> raw string value)
-        self.parameters = {}
         # register global provider so other modules can call parameters.get_parameter()
         try:
             parameters.set_provider(self)
@@ -153,6 +176,8 @@ class MasterGui:
             update_terminal_callback=self.update_terminal,
             dispatcher_callback=self.dispatch_received_data,
         )
+        self.usb_conn.set_metrics(self.metrics)
+        self.start_session_recording()
         # Provide the write_command callback to the terminal view if present
         try:
             if hasattr(self, "terminal_view"):
@@ -162,6 +187,109 @@ class MasterGui:
         except Exception:
             pass
     
+    def start_session_recording(self):
+        """Record the serial session if enabled in config ([SESSION] record)."""
+        enabled = str(config_utils.get_config("SESSION", "record", "false")).lower()
+        if enabled not in ("1", "true", "yes", "on"):
+            return None
+        folder = os.path.join(os.getcwd(), "sessions")
+        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(folder, f"session_{ts}.stmrec")
+        try:
+            recorder = SessionRecorder(path)
+        except Exception as e:
+            self.update_terminal(f"Could not start session recording: {e}")
+            return None
+        self.usb_conn.set_recorder(recorder)
+        print(f"Recording serial session to {path}")
+        return recorder
+
+    def start_session_log(self):
+        """Log every terminal line to logs/terminal_<ts>.log ([SESSION] log).
+
+        Segments rotate after log_max_mb or log_max_age_min and are gzipped
+        if log_gzip is set.
+        """
+        enabled = str(config_utils.get_config("SESSION", "log", "true")).lower()
+        if enabled not in ("1", "true", "yes", "on"):
+            return None
+        try:
+            max_mb = float(config_utils.get_config("SESSION", "log_max_mb", 50))
+            max_age_min = float(config_utils.get_config("SESSION", "log_max_age_min", 60))
+        except (TypeError, ValueError):
+            max_mb, max_age_min = 50.0, 60.0
+        compress = str(config_utils.get_config("SESSION", "log_gzip", "true")).lower()
+        try:
+            session_log = SessionLog(
+                os.path.join(os.getcwd(), "logs"),
+                max_bytes=int(max_mb * 1024 * 1024),
+                max_age_s=max_age_min * 60.0,
+                compress=compress in ("1", "true", "yes", "on"),
+            ).start()
+        except Exception as e:
+            print(f"Could not start terminal log: {e}")
+            return None
+        print(f"Logging terminal to {session_log.path}")
+        return session_log
+
+    def stop_session_log(self):
+        try:
+            if self.session_log is not None:
+                self.session_log.close()
+                self.session_log = None
+        except Exception as e:
+            print(f"Error closing terminal log: {e}")
+
+    def _create_gui_pump(self):
+        """GuiPump on the Tk thread; [GUI] fps sets the frame rate."""
+        try:
+            fps = float(config_utils.get_config("GUI", "fps", 50))
+        except (TypeError, ValueError):
+            fps = 50.0
+        pump = GuiPump(self.master, fps=min(max(fps, 10.0), 120.0), metrics=self.metrics)
+        pump.start()
+        return pump
+
+    def start_metrics_snapshots(self):
+        """Append metrics snapshots to diagnostics/metrics_<ts>.jsonl.
+
+        [DIAGNOSTICS] snapshot_interval_s sets the period, 0 disables it.
+        """
+        try:
+            interval = float(
+                config_utils.get_config("DIAGNOSTICS", "snapshot_interval_s", 10)
+            )
+        except (TypeError, ValueError):
+            interval = 10.0
+        if interval <= 0:
+            return None
+        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(os.getcwd(), "diagnostics", f"metrics_{ts}.jsonl")
+        try:
+            self.metrics_writer = MetricsSnapshotWriter(
+                self.metrics, path, interval
+            ).start()
+        except Exception as e:
+            print(f"Could not start metrics snapshots: {e}")
+            self.metrics_writer = None
+        return self.metrics_writer
+
+    def stop_metrics(self):
+        try:
+            if self.metrics_writer is not None:
+                self.metrics_writer.stop()
+                self.metrics_writer = None
+        except Exception as e:
+            print(f"Error stopping metrics snapshots: {e}")
+
+    def show_diagnostics(self):
+        # Only one diagnostics window; bring an open one to the front
+        if self.diagnostics_window is not None and self.diagnostics_window.is_open():
+            self.diagnostics_window.lift()
+            return
+        path = self.metrics_writer.path if self.metrics_writer else None
+        self.diagnostics_window = DiagnosticsWindow(self.master, self.metrics, path)
+
     def show_about(self):
         win = Toplevel(self.master)
         win.title("About")
@@ -252,6 +380,7 @@ class MasterGui:
             "open_measure_simulate": self.open_measure_simulate,
             "show_simulation_info": self.show_simulation_info,
             "show_about": self.show_about,
+            "show_diagnostics": self.show_diagnostics,
         }
         self.menu_bar = create_menu(self.master, callbacks=callbacks)
 
@@ -264,7 +393,18 @@ class MasterGui:
         except Exception:
             pass
         self.terminal_frame.pack(side="left", fill="y")
-        self.terminal_view = TerminalView(self.terminal_frame)
+        try:
+            max_lines = int(
+                config_utils.get_config("TERMINAL", "max_lines", terminal.MAX_LINES)
+            )
+        except (TypeError, ValueError):
+            max_lines = terminal.MAX_LINES
+        self.terminal_view = TerminalView(
+            self.terminal_frame,
+            gui_pump=self.gui_pump,
+            max_lines=max_lines,
+            terminal_filter=self.terminal_filter,
+        )
         # Ensure the terminal_frame grid expands correctly
         try:
             self.terminal_frame.grid_rowconfigure(0, weight=1)
@@ -275,11 +415,17 @@ class MasterGui:
         # Create the app manager which holds the right-side content
         self.app_manager = AppManager(
             master=self.master,
+            router=self.router,
+            gui_pump=self.gui_pump,
             write_command=None,
             return_to_main=self.return_to_main,
             disable_menu_cb=self.disable_menu,
             enable_menu_cb=self.enable_menu,
         )
+        # live figure/canvas counts for Tools -> Diagnostics
+        self.metrics.figure_stats = self.app_manager.figures.stats
+        # the tunnel pane follows targetNa/toleranceNa changes between cycles
+        self.app_manager.adc_limits = self.adc_limits
         # expose parameters dict on the app_frame so apps can read it via their master
         try:
             if hasattr(self.app_manager, "app_frame"):
@@ -322,8 +468,20 @@ class MasterGui:
                 return False
         time.sleep(0.1)
         STATUS = "IDLE"
+        self.negotiate_protocol()
         return True
 
+    def negotiate_protocol(self):
+        """Switch scan data to binary records if configured and supported."""
+        protocol = str(config_utils.get_config("USB", "protocol", "text")).lower()
+        if protocol != "binary":
+            return False
+        if self.usb_conn.negotiate_binary():
+            self.update_terminal("Binary scan data enabled")
+            return True
+        self.update_terminal("Firmware has no binary mode, using text protocol")
+        return False
+
     def try_to_connect(self):
         # Try to establish a connection and select port if it fails
         result = self.connect()
@@ -342,136 +500,132 @@ class MasterGui:
         self.usb_conn.write_command("PARAMETER,?")
 
     def update_terminal(self, message):
-        # Update the terminal with a new message
+        # Update the terminal with a new message; called from any thread, the
+        # terminal buffers it and writes once per GUI frame
         try:
+            session_log = getattr(self, "session_log", None)
+            if session_log is not None:
+                session_log.write(message)
             if hasattr(self, "terminal_view"):
                 self.terminal_view.update(message)
-                try:
-                    self.master.update_idletasks()
-                except Exception:
-                    pass
             else:
                 # fallback: print to stdout
                 print(message)
         except Exception as e:
             print(f"Error updating terminal: {e}")
 
-    def dispatch_received_data(self, message):
-        # Dispatch received data based on the current status
-        global STATUS
-        messages = message.split("\n")
-        
-        for msg in messages:
-            ms = msg.split(",")
-            messagetype = ms[0]
-            # Treat both STOPPED and IDLE as indicating the device is idle
-            if messagetype in ("STOPPED", "IDLE"):
-                self.idle_received = True
-            if messagetype == "ADJUST":
+    def _init_dispatch(self):
+        """Create the message router and register the global handlers."""
+        self.router = MessageRouter(on_error=self._on_dispatch_error)
+        # DATA and TUNNEL runs are parsed once and shared by all batch handlers
+        self.router.set_parser("DATA", parse_data_lines)
+        self.router.set_parser("TUNNEL", parse_tunnel_lines)
+        self.router.register(("STOPPED", "IDLE"), self._on_idle)
+        self.router.register(("ADJUST", "FIND", "FORMAT"), self._echo)
+        self.router.register("PARAMETER", self._on_parameter)
+        self.router.register_batch("TUNNEL", self._on_tunnel)
+        self.router.register_batch("DATA", self._on_data)
+
+    def dispatch_received_data(self, messages):
+        # Dispatch a batch of received lines based on their message type
+        self.router.dispatch(messages)
+        # completed by the next GUI pump frame that leaves no work behind
+        self.metrics.mark_dispatched()
+
+    def _on_dispatch_error(self, msg, error):
+        self.metrics.dispatch_error()
+        self.update_terminal(f"Error handling {msg}: {error}")
+
+    def _echo(self, msg):
+        # Show a received line unless its type is filtered in the terminal
+        for line in self.terminal_filter.lines(message_type(msg), [msg]):
+            self.update_terminal(line)
+
+    def _on_idle(self, msg):
+        # Treat both STOPPED and IDLE as indicating the device is idle
+        self.idle_received = True
+        # streams ended: show the last partial summaries
+        for line in self.terminal_filter.finish_all():
+            self.update_terminal(line)
+
+    def _on_parameter(self, msg):
+        # store parameter value for access by apps
+        ms = msg.split(",")
+        if len(ms) >= 3:
+            self.parameters[ms[1]] = ms[2]
+        self._echo(msg)
+        if len(ms) < 3:
+            return
+        if ms[1] == "targetNa":
+            self.target_adc = self.calculate_adc_value(ms[2])
+        if ms[1] == "toleranceNa":
+            self.tolerance_adc = self.calculate_adc_value(ms[2])
+
+    def adc_limits(self):
+        """Current tunnel set-point and tolerance in ADC digits."""
+        return self.target_adc, self.tolerance_adc
+
+    def _on_tunnel(self, lines, parsed):
+        # Echo "TUNNEL,flag,adc,z" with the ADC value already signed; lines
+        # filtered in the terminal are not formatted at all
+        records, others = parsed
+        shown, summary = self.terminal_filter.take("TUNNEL", len(records), lines[-1])
+        if summary:
+            self.update_terminal(summary)
+        for flag, adc, z in records[shown].tolist():
+            self.update_terminal(f"TUNNEL,{flag},{adc},{z}")
+        for msg in others:
+            if msg == "TUNNEL,DONE":
+                summary = self.terminal_filter.finish("TUNNEL")
+                if summary:
+                    self.update_terminal(summary)
                 self.update_terminal(msg)
-                adjust_app = None
-                if hasattr(self, "app_manager") and self.app_manager:
-                    adjust_app = self.app_manager.get_adjust_app()
-                if adjust_app and getattr(adjust_app, "is_active", False):
-                    adjust_app.update_data(msg)
-            elif messagetype == "PARAMETER":
-                # store parameter value for access by apps
-                try:
-                    if len(ms) >= 3:
-                        key = ms[1]
-                        val = ms[2]
-                        self.parameters[key] = val
-                        # keep app_frame.parameters in sync if present
-                        try:
-                            if hasattr(self.app_manager, "app_frame"):
-                                setattr(
-                                    self.app_manager.app_frame,
-                                    "parameters",
-                                    self.parameters,
-                                )
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-
-                self.update_terminal(msg)
-                if ms[1] == "targetNa":
-                    self.target_adc = self.calculate_adc_value(ms[2])
-                if ms[1] == "toleranceNa":
-                    self.tolerance_adc = self.calculate_adc_value(ms[2])
-                parameter_app = None
-                if hasattr(self, "app_manager") and self.app_manager:
-                    parameter_app = self.app_manager.get_parameter_app()
-                if parameter_app:
-                    parameter_app.update_data(msg)
-            elif messagetype == "TUNNEL":
-                # Handle both "TUNNEL,DONE" and "TUNNEL,flag,adc,z" formats
-                if len(ms) >= 2 and ms[1] == "DONE":
-                    # Pass DONE message directly without conversion
-                    self.update_terminal(msg)
-                    tunnel_app = None
-                    if hasattr(self, "app_manager") and self.app_manager:
-                        tunnel_app = self.app_manager.get_tunnel_app()
-                    if tunnel_app:
-                        tunnel_app.update_data(msg)
-                elif len(ms) >= 4:
-                    # Handle data messages with flag, adc, z
-                    adc_value = int(ms[2])
-                    if (
-                        adc_value > 0x7FFF
-                    ):  # If greater than the max positive value for int16
-                        adc_value -= 0x10000  # Convert to signed value
-                    ms[2] = str(adc_value)
-                    msg = ",".join(ms)
-
-                    self.update_terminal(msg)
-                    tunnel_app = None
-                    if hasattr(self, "app_manager") and self.app_manager:
-                        tunnel_app = self.app_manager.get_tunnel_app()
-                    if tunnel_app:
-                        tunnel_app.update_data(msg)
-                else:
-                    # Invalid TUNNEL message format
-                    self.update_terminal(f"Invalid TUNNEL message: {msg}")
-            elif messagetype == "FIND":
-                self.update_terminal(msg)
-            elif messagetype == "DATA":
-                try:
-                    if len(ms) == 2 and ms[1] == "DONE":
-                        measure_app = None
-                        if hasattr(self, "app_manager") and self.app_manager:
-                            measure_app = self.app_manager.get_measure_app()
-                        if measure_app:
-                            measure_app.redraw_plot()
-                        self.update_terminal("Measurement complete.")
-
-                    # self.return_to_main()
-                    if len(ms) == 4:
-                        measure_app = None
-                        if hasattr(self, "app_manager") and self.app_manager:
-                            measure_app = self.app_manager.get_measure_app()
-                        if measure_app:
-                            measure_app.update_data(msg)
-
-                    # Plot next set of data when the message flag matches the device's startX
-                    if ms[1] == self.parameters.get("startX"):
-                        self.update_terminal(f"Processing Y {ms[2]}")
-                except Exception as e:
-                    self.update_terminal(f"Error measure: {msg}, \nError: {e}")
+            else:
+                self.update_terminal(f"Invalid TUNNEL message: {msg}")
+
+    def _on_data(self, lines, parsed):
+        records, others = parsed
+        # Report progress when a new row starts at the device's startX
+        start_x = self.get_parameter("startX", int, None)
+        if start_x is not None and len(records):
+            rows = records["y"][records["x"] == start_x]
+            if len(rows):
+                shown, summary = self.terminal_filter.take("DATA", len(rows), lines[-1])
+                if summary:
+                    self.update_terminal(summary)
+                for y in rows[shown].tolist():
+                    self.update_terminal(f"Processing Y {y}")
+        for msg in others:
+            if msg == "DATA,DONE":
+                self.update_terminal("Measurement complete.")
+            else:
+                self.update_terminal(f"Error measure: {msg}")
 
     def disable_menu(self):
         # Disable all menu points
         self.menu_bar.entryconfig("File", state="disabled")
         self.menu_bar.entryconfig("Measure", state="disabled")
         self.menu_bar.entryconfig("Settings", state="disabled")
-        self.menu_bar.entryconfig("Tools", state="disabled")
+        self._set_tools_state("disabled")
 
     def enable_menu(self):
         # Enable all menu points
         self.menu_bar.entryconfig("File", state="normal")
         self.menu_bar.entryconfig("Measure", state="normal")
         self.menu_bar.entryconfig("Settings", state="normal")
-        self.menu_bar.entryconfig("Tools", state="normal")
+        self._set_tools_state("normal")
+
+    def _set_tools_state(self, state):
+        # Tools entries follow the menu state, Diagnostics stays available
+        tools_menu = getattr(self.menu_bar, "tools_menu", None)
+        if tools_menu is None:
+            self.menu_bar.entryconfig("Tools", state=state)
+            return
+        for i in range(tools_menu.index("end") + 1):
+            if tools_menu.type(i) != "command":
+                continue
+            if tools_menu.entrycget(i, "label") != "Diagnostics":
+                tools_menu.entryconfig(i, state=state)
 
     def open_measure(self):
         # Open the MEASURE interface
@@ -627,13 +781,29 @@ class MasterGui:
         )
 
     def on_closing(self):
+        # File -> Exit: the same shutdown as closing the window
+        self.shutdown()
+        cleanup_tasks()
+        self.master.destroy()
+
+    def shutdown(self):
+        """Stop the device and flush everything written in the background.
+
+        Shared by both exit paths (window close and File -> Exit) and safe
+        to call twice.
+        """
         try:
             self.usb_conn.write_command("STOP")
-        except:
-            pass
-        finally:
-            self.close_usb_connection()
-            self.master.destroy()
+        except Exception as e:
+            print(f"Error sending STOP command: {e}")
+        # stops the serial threads and flushes an active session recording
+        self.close_usb_connection()
+        # the writer thread is a daemon: without this its pending lines
+        # are lost and the last segment is not gzipped
+        self.stop_session_log()
+        # final metrics snapshot; the 3D render worker and its shared memory
+        self.stop_metrics()
+        surface_renderer.shutdown()
 
     def close_usb_connection(self):
         # Close the USB connection to free the COM port
@@ -641,6 +811,12 @@ class MasterGui:
             self.usb_conn.close_connection()
         except Exception as e:
             self.update_terminal(f"Error closing USB connection: {e}")
+        try:
+            if self.usb_conn.recorder is not None:
+                self.usb_conn.recorder.close()
+                self.usb_conn.set_recorder(None)
+        except Exception as e:
+            print(f"Error closing session recording: {e}")
 
     def calculate_adc_value(self, nA):
         # Convert nA to float
@@ -666,6 +842,8 @@ class MasterGui:
 
 
 if __name__ == "__main__":
+    # the 3D render worker is a separate process (also in the frozen app)
+    multiprocessing.freeze_support()
     prevent_multiple_instances()
 
     root = Tk()
@@ -1,7 +1,9 @@
 """Measurement UI pane.
 
-Provides `MeasureApp` which displays incoming (x,y,z) measurement points
-in a 3D plot and stores them to timestamped CSV files under `measurements/`.
+Provides `MeasureApp` which collects incoming (x,y,z) measurement points
+in a preallocated `HeightGrid`, displays them as a 3D surface and stores
+them to timestamped CSV files under `measurements/` through a
+`MeasurementWriter` that stays open for the whole scan.
 
 This refactor extracts plot and file initialization into helpers and adds
 safer file I/O with encoding and basic error handling.
@@ -11,11 +13,25 @@ import os
 from datetime import datetime
 from tkinter import Button, Frame, Label
 
-import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib import cm  # Import colormap utilities
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import config_utils
 import parameters
+from gui.figure_pool import FigurePool
+from gui.redraw_scheduler import RedrawScheduler
+from height_grid import HeightGrid
+import surface_renderer
+from surface_renderer import draw_surface
+from measurement_writer import FSYNC_POLICIES, MeasurementWriter
+
+VIEWS = ("2d", "3d")
+# How often to check the render process for a finished 3D image
+RENDER_POLL_MS = 20
+
+
+def _config_view(key, default):
+    view = str(config_utils.get_config("MEASURE", key, default)).strip().lower()
+    return view if view in VIEWS else default
 
 
 class MeasureApp:
@@ -29,6 +45,7 @@ class MeasureApp:
         start_y=None,
         max_x=None,
         max_y=None,
+        figure_pool=None,
     ):
         """Create MeasureApp.
 
@@ -36,6 +53,8 @@ class MeasureApp:
         write_command: callable to send commands to device
         return_to_main: callable to switch UI back to main view
         simulate: if True, send simulated MEASURE command
+        figure_pool: FigurePool providing the figure and canvas (a private
+            one when None)
         """
         self.master = master
         self.write_command = write_command
@@ -46,21 +65,30 @@ class MeasureApp:
         # Create a frame to hold the widgets
         self.frame = Frame(master)
         self.frame.pack()
+        self.figure_pool = figure_pool if figure_pool is not None else FigurePool(self.frame)
 
         # Create a Back button to return to the main interface
         self.btn_back = Button(
             self.frame, text="Close", command=self.wrapper_return_to_main
         )
         self.btn_back.pack(anchor="w", padx=10, pady=10)
+        # Switch between the live 2D image and the 3D surface
+        self.btn_view = Button(self.frame, text="3D View", command=self.toggle_view)
+        self.btn_view.pack(anchor="w", padx=10, pady=(0, 10))
         # Status label to show short status messages to the user
         try:
             self.status_label = Label(self.frame, text="")
             self.status_label.pack(anchor="w", padx=10, pady=(0, 6))
         except Exception:
             self.status_label = None
-        # Debounce redraws to avoid excessive plotting when many packets arrive
-        self._redraw_scheduled = False
-        self._redraw_delay_ms = 100
+        # Coalesce redraws to avoid excessive plotting when many packets arrive:
+        # at most one per [MEASURE] redraw_interval_ms, frames are dropped when
+        # drawing falls behind the acquisition
+        try:
+            interval_ms = float(config_utils.get_config("MEASURE", "redraw_interval_ms", 100))
+        except (TypeError, ValueError):
+            interval_ms = 100.0
+        self.redraw_scheduler = RedrawScheduler(self.frame, self._draw_frame, interval_ms)
 
         # Create a Reset Rotation button to reset the 3D plot rotation
         self.btn_reset_rotation = Button(
@@ -69,34 +97,6 @@ class MeasureApp:
         self.btn_reset_rotation.pack(anchor="w", padx=10, pady=10)
         self.btn_reset_rotation.pack_forget()  # Initially hide the Reset Rotation button
 
-        # Initialize plotting and file storage
-        self._init_plot()
-        self._create_measurement_file()
-
-        # Start the measurement process (only if write_command is callable)
-        try:
-            cmd = "MEASURE SIMULATE" if self.simulate else "MEASURE"
-            if callable(self.write_command):
-                self.write_command(cmd)
-            else:
-                print(f"MeasureApp: write_command not set, skipping send: {cmd}")
-        except Exception as e:
-            print(f"MeasureApp: error sending command '{cmd}': {e}")
-
-        # measurement file created by _create_measurement_file
-
-        # Bind the Escape key on the toplevel so it can be unbound cleanly
-        try:
-            toplevel = self.frame.winfo_toplevel()
-            toplevel.bind_all("<Escape>", lambda event: self.wrapper_return_to_main())
-        except Exception:
-            try:
-                self.master.bind_all(
-                    "<Escape>", lambda event: self.wrapper_return_to_main()
-                )
-            except Exception:
-                pass
-
         # Parameters are read on-demand via the global accessor
 
         # Prefer explicit constructor values; fall back to global accessor
@@ -121,15 +121,12 @@ class MeasureApp:
                 if max_y is not None
                 else parameters.get_parameter("maxY", int, 200)
             )
-            
-            
         except Exception:
             self.start_x = 0
             self.start_y = 0
             self.max_x = 200
             self.max_y = 200
-            
-            
+
         # Print initial parameter values to the terminal for debugging
         try:
             print(
@@ -138,9 +135,42 @@ class MeasureApp:
         except Exception:
             pass
 
+        # Initialize plotting and file storage
+        self._init_plot()
+        self.btn_view.config(text="2D View" if self.view == "3d" else "3D View")
+        self._create_measurement_file()
+        # Flush and close the file however the pane goes away
+        self.frame.bind("<Destroy>", lambda event: self._on_destroy(), add="+")
+
+        # Start the measurement process (only if write_command is callable)
+        try:
+            cmd = "MEASURE SIMULATE" if self.simulate else "MEASURE"
+            if callable(self.write_command):
+                self.write_command(cmd)
+            else:
+                print(f"MeasureApp: write_command not set, skipping send: {cmd}")
+        except Exception as e:
+            print(f"MeasureApp: error sending command '{cmd}': {e}")
+
+        # measurement file created by _create_measurement_file
+
+        # Bind the Escape key on the toplevel so it can be unbound cleanly
+        try:
+            toplevel = self.frame.winfo_toplevel()
+            toplevel.bind_all("<Escape>", lambda event: self.wrapper_return_to_main())
+        except Exception:
+            try:
+                self.master.bind_all(
+                    "<Escape>", lambda event: self.wrapper_return_to_main()
+                )
+            except Exception:
+                pass
+
     def wrapper_return_to_main(self):
         # Set is_active to False and return to the main interface
         self.is_active = False
+        self.redraw_scheduler.cancel()
+        self.close_measurement_file()
         # Unbind escape handler to avoid leaking handlers
         try:
             toplevel = self.frame.winfo_toplevel()
@@ -152,56 +182,61 @@ class MeasureApp:
                 pass
         self.return_to_main()
 
-    def update_data(self, message):
-        # Safety check to ensure the object is still active
-        if not hasattr(self, "is_active") or not self.is_active:
-            return False
-
-        # NOTE: do not refresh parameters here to avoid per-packet reloading.
-        # Parameter refresh should happen at well-defined moments (e.g. on UI change
-        # or at measurement start) to keep measurement values stable.
-
-        # Update the Parameter interface with new data
-        data = message.split(",")
-
-        # Handle DONE message
-        if len(data) > 1 and data[1] == "DONE":
-            print("Measurement completed")
-            self.wrapper_return_to_main()
-            return True
+    def update_batch(self, lines, parsed):
+        """Router entry point for a run of DATA lines.
 
-        try:
-            x, y, z = int(data[1]), int(data[2]), int(data[3])
-        except (IndexError, ValueError) as e:
-            print(f"Error parsing data: {e}, \n{message}")
-            return False
+        parsed: (records, other_lines) from `packet_parser.parse_data_lines`.
+        """
+        if not getattr(self, "is_active", False):
+            return
+        records, others = parsed
+        if len(records):
+            self._store_points(
+                records["x"].tolist(), records["y"].tolist(), records["z"].tolist()
+            )
+        if "DATA,DONE" in others:
+            self._finish_measurement_file()
+            if self.done_view != self.view:
+                # post-scan rendering, e.g. the 3D surface of the finished scan
+                self.set_view(self.done_view)
+            else:
+                # always show the final state, without waiting for the interval
+                self.request_redraw()
+                self.redraw_scheduler.flush()
+
+    def _store_points(self, xs, ys, zs):
+        """Append points to the measurement file and the height map."""
+        # Append the data to the file (buffered, flushed per completed row)
+        writer = self.measurement_writer
+        if writer is not None:
+            try:
+                writer.write_points(xs, ys, zs)
+            except Exception as e:
+                print(f"Warning: failed to write measurement to file: {e}")
 
-        # Append the data to the file (safe write)
+        # Store the points in the height map (index assignment, no growth)
+        prev_y = getattr(self, "_last_y", None)
         try:
-            with open(
-                self.measurement_file_path, "a", encoding="utf-8", newline=""
-            ) as file:
-                file.write(f"{x},{y},{z}\n")
+            if len(xs) == 1:
+                self.grid.set_point(xs[0], ys[0], zs[0])
+            else:
+                self.grid.set_points(xs, ys, zs)
         except Exception as e:
-            print(f"Warning: failed to write measurement to file: {e}")
-
-        # Update the plot data buffers
-        prev_y = getattr(self, "_last_y", None)
-        self.x_data.append(x)
-        self.y_data.append(y)
-        self.z_data.append(z)
+            print(f"MeasureApp: failed to store points: {e}")
 
         # Trigger redraw when Y changes from previous point (row change)
-        if prev_y is not None and y != prev_y:
-            # Immediate redraw on new row
+        if prev_y is None:
+            prev_y = ys[0]
+        if any(y != prev_y for y in ys):
+            # Redraw on new row
             try:
-                self.redraw_plot()
+                self.request_redraw()
             except Exception:
                 pass
 
         # remember last seen y for next update
-        self._last_y = y
-        
+        self._last_y = ys[-1]
+
     def _refresh_parameters(self):
         """Refresh parameter-backed attributes from the master parameter store."""
         # refresh typed values using the global parameters accessor
@@ -229,16 +264,31 @@ class MeasureApp:
         # Deferred retries removed: parameters should be read on-demand.
         return
 
-    def _perform_redraw(self):
-        """Called on the GUI thread (via after) to perform the queued redraw."""
+    def request_redraw(self):
+        """Redraw soon; requests are coalesced by the redraw scheduler."""
+        self.redraw_scheduler.request()
+
+    def _draw_frame(self):
+        """Called by the redraw scheduler on the GUI thread."""
+        self.redraw_plot()
         try:
-            self._redraw_scheduled = False
+            if getattr(self, "status_label", None):
+                scheduler = self.redraw_scheduler
+                self.status_label.config(
+                    text=f"Redraws: {scheduler.drawn}, dropped frames: {scheduler.dropped}"
+                )
+        except Exception:
+            pass
+
+    def _on_destroy(self):
+        self.redraw_scheduler.cancel()
+        if self._render_poll_id is not None:
             try:
-                self.redraw_plot()
+                self.frame.after_cancel(self._render_poll_id)
             except Exception:
                 pass
-        except Exception:
-            pass
+            self._render_poll_id = None
+        self.close_measurement_file()
 
     def redraw_plot(self):
         # Safety check to ensure the object is still active and has required attributes
@@ -246,74 +296,201 @@ class MeasureApp:
             return
         if not hasattr(self, "ax") or not hasattr(self, "canvas"):
             return
+        if self.view == "2d":
+            self._update_image()
+        else:
+            self._draw_surface()
+
+    def set_view(self, view):
+        """Switch between the live 2D image ("2d") and the 3D surface ("3d")."""
+        if view not in VIEWS:
+            raise ValueError(f"unknown view {view!r}")
+        self.view = view
+        # the full redraw below shows the current state
+        self.redraw_scheduler.cancel()
+        try:
+            if getattr(self, "btn_view", None):
+                self.btn_view.config(text="2D View" if view == "3d" else "3D View")
+            if view == "2d":
+                self.btn_reset_rotation.pack_forget()
+        except Exception:
+            pass
+        self._setup_axes()
+        self.redraw_plot()
 
-        # Clear the plot and redraw
-        self.ax.clear()
-        self.ax.set_xlim(0, 200)
-        self.ax.set_ylim(0, 200)
-        self.ax.set_zlim(0, 0xFFFF)
+    def toggle_view(self):
+        self.set_view("2d" if self.view == "3d" else "3d")
+
+    def _setup_axes(self):
+        """Create the axes for the current view on a cleared figure."""
+        self.fig.clear()
+        self.image = None
+        self._background = None
+        self._surface_image = None
+        if self.view == "3d":
+            self.ax = self.fig.add_subplot(111, projection="3d")
+            # Store the initial rotation state
+            self.initial_elev = self.ax.elev
+            self.initial_azim = self.ax.azim
+            return
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_xlabel("X")
+        self.ax.set_ylabel("Y")
+        self._new_image()
+
+    def _new_image(self):
+        """(Re)create the image artist for the current grid size."""
+        grid = self.grid
+        x_min, x_max, y_min, y_max = grid.extent
+        # float copy of the grid with NaN for cells not measured yet
+        self._image_data = np.full(grid.shape, np.nan, dtype=np.float32)
+        self._image_row = 0
+        self._image_shape = grid.shape
+        self._clim = None
+        if self.image is not None:
+            self.image.remove()
+        # animated: left out of full draws and drawn by blitting on top of
+        # the saved background (see _on_draw)
+        self.image = self.ax.imshow(
+            self._image_data,
+            origin="lower",
+            extent=(x_min - 0.5, x_max + 0.5, y_min - 0.5, y_max + 0.5),
+            cmap=cm.coolwarm,
+            interpolation="nearest",
+            animated=True,
+        )
+        self._background = None
 
-        # Check if there is enough data to create a surface
-        if len(self.x_data) > 2 and len(self.y_data) > 2 and len(self.z_data) > 2:
-            # Prepare data for the 3D plot
-            x = np.array(self.x_data)
-            y = np.array(self.y_data)
-            z = np.array(self.z_data)
+    def _on_draw(self, event):
+        """After a full draw: save the background and draw the image on it.
 
-            # Avoid passing degenerate data to the Delaunay triangulation (qhull).
-            # - Require at least 3 unique (x,y) points
-            # - Ensure points are not (near-)collinear
-            try:
-                xy = np.vstack((x, y)).T
-                # count unique (x,y) pairs
-                uniq_xy = np.unique(xy, axis=0)
-                if uniq_xy.shape[0] < 3:
-                    msg = "MeasureApp: not enough unique (x,y) points for triangulation; skipping trisurf"
-                    print(msg)
-                    # fallback: simple scatter
-                    self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
-                    try:
-                        if getattr(self, "status_label", None):
-                            self.status_label.config(text="Plot: not enough unique (x,y), using scatter")
-                    except Exception:
-                        pass
-                else:
-                    # check for collinearity: rank < 2 => collinear
-                    centered = uniq_xy - uniq_xy.mean(axis=0)
-                    rank = np.linalg.matrix_rank(centered)
-                    if rank < 2:
-                        msg = "MeasureApp: (x,y) points are collinear; skipping trisurf"
-                        print(msg)
-                        self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
-                        try:
-                            if getattr(self, "status_label", None):
-                                self.status_label.config(text="Plot: (x,y) collinear, using scatter")
-                        except Exception:
-                            pass
-                    else:
-                        # safe to attempt triangular surface; catch qhull errors
-                        try:
-                            self.ax.plot_trisurf(x, y, z, cmap=cm.coolwarm, linewidth=0.2)
-                        except Exception as e:
-                            msg = f"MeasureApp: triangulation failed ({e}); falling back to scatter"
-                            print(msg)
-                            try:
-                                if getattr(self, "status_label", None):
-                                    self.status_label.config(text="Plot: triangulation failed, using scatter")
-                            except Exception:
-                                pass
-                            self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
-            except Exception as e:
-                # Protect plotting from any unexpected failures
-                print(f"MeasureApp: error preparing plot data: {e}")
-                try:
-                    self.ax.scatter(x, y, z, c=z, cmap=cm.coolwarm)
-                except Exception:
-                    pass
+        In the 3D view with a render process, the full draw only has the
+        empty axes: put the last rendered surface back, or render the
+        surface again if the view was rotated or resized.
+        """
+        if self.view == "3d":
+            if not self.render_process or not self.grid.count:
+                return
+            if self._surface_image is None or not self._blit_surface(event.renderer):
+                self.request_redraw()
+            return
+        if self.image is None:
+            return
+        try:
+            self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+            self.ax.draw_artist(self.image)
+        except Exception as e:
+            print(f"MeasureApp: could not save plot background: {e}")
+            self._background = None
+
+    def _update_image(self):
+        """Copy the rows received since the last update into the image and blit it."""
+        grid = self.grid
+        if grid.shape != self._image_shape:
+            # the grid grew: start the image over
+            self._new_image()
+        last = grid.last_row
+        if last >= self._image_row:
+            # the previous last row may have been incomplete, copy it again
+            rows = slice(self._image_row, last + 1)
+            z = grid.z[rows].astype(np.float32)
+            z[~grid.filled[rows]] = np.nan
+            self._image_data[rows] = z
+            self._image_row = last
+            self.image.set_data(self._image_data)
+            filled = grid.filled[rows]
+            if filled.any():
+                # widen the color range to the values seen so far
+                values = z[filled]
+                lo, hi = float(values.min()), float(values.max())
+                if self._clim is not None:
+                    lo, hi = min(lo, self._clim[0]), max(hi, self._clim[1])
+                if (lo, hi) != self._clim:
+                    self._clim = (lo, hi)
+                    self.image.set_clim(lo, hi if hi > lo else lo + 1)
+        if self._background is None:
+            # first draw (or after a resize): full draw, _on_draw saves the background
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.image)
+        self.canvas.blit(self.ax.bbox)
+
+    def _draw_surface(self):
+        renderer = self._surface_renderer()
+        if renderer is None:
+            self._draw_surface_local()
+            return
+        # Only the axes frame is drawn here (for rotating with the mouse);
+        # the surface comes back from the render process as an image
+        x_min, x_max, y_min, y_max = self.grid.extent
+        self.ax.set_xlim(x_min, x_max)
+        self.ax.set_ylim(y_min, y_max)
+        self.ax.set_zlim(0, 0xFFFF)
+        renderer.submit(
+            self.grid, self.fig.bbox.width, self.fig.bbox.height,
+            self.fig.dpi, self.ax.elev, self.ax.azim,
+        )
+        self._schedule_render_poll()
+
+    def _draw_surface_local(self):
+        # Clear the plot and redraw
+        self.ax.clear()
+        try:
+            grid = self.grid
+            draw_surface(self.ax, grid.z, grid.filled, grid.extent)
+        except Exception as e:
+            # Protect plotting from any unexpected failures
+            print(f"MeasureApp: error preparing plot data: {e}")
 
         # Redraw the canvas
         self.canvas.draw()
 
+    def _surface_renderer(self):
+        """Render process for the 3D surface ([MEASURE] render_process), or None."""
+        if not self.render_process:
+            return None
+        renderer = surface_renderer.get_renderer()
+        if renderer is None:
+            # draw on the Tk thread from now on
+            self.render_process = False
+        return renderer
+
+    def _schedule_render_poll(self):
+        if self._render_poll_id is None:
+            self._render_poll_id = self.frame.after(RENDER_POLL_MS, self._poll_surface)
+
+    def _poll_surface(self):
+        self._render_poll_id = None
+        renderer = self._surface_renderer()
+        if renderer is None or not self.is_active:
+            return
+        result = renderer.poll()
+        if result is not None and self.view == "3d":
+            request, rgba = result
+            # keep a copy to show again after full draws of the canvas
+            self._surface_image = (request["elev"], request["azim"], rgba.copy())
+            self._blit_surface()
+        if renderer.busy:
+            self._schedule_render_poll()
+
+    def _blit_surface(self, renderer=None):
+        """Copy the rendered surface into the canvas buffer; False if stale."""
+        elev, azim, rgba = self._surface_image
+        if (elev, azim) != (self.ax.elev, self.ax.azim):
+            return False
+        try:
+            buffer = np.asarray((renderer or self.canvas.get_renderer()).buffer_rgba())
+        except Exception:
+            return False
+        if buffer.shape != rgba.shape:
+            # canvas resized while rendering
+            return False
+        buffer[:] = rgba
+        if renderer is None:
+            self.canvas.blit()
+        return True
+
     def reset_rotation(self):
         # Reset the rotation of the 3D plot to its initial state
         self.ax.view_init(
@@ -323,32 +500,40 @@ class MeasureApp:
         self.btn_reset_rotation.pack_forget()  # Hide the Reset Rotation button after resetting
 
     def on_plot_hover(self, event):
-        # Show the Reset Rotation button only if the plot has been rotated
+        # Show the Reset Rotation button only if the 3D plot has been rotated
+        if self.view != "3d":
+            return
         if self.ax.elev != self.initial_elev or self.ax.azim != self.initial_azim:
             self.btn_reset_rotation.pack(anchor="w", padx=10, pady=10)
 
     def _init_plot(self):
-        """Initialize Matplotlib 3D figure, axes and the Tk canvas."""
-        self.fig = plt.figure()
-        self.ax = self.fig.add_subplot(111, projection="3d")
-        self.x_data = []
-        self.y_data = []
-        self.z_data = []
-
-        # Store the initial rotation state
-        self.initial_elev = self.ax.elev
-        self.initial_azim = self.ax.azim
-
-        # Embed the plot in a Tkinter canvas
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.frame)
-        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
-        self.canvas.mpl_connect("motion_notify_event", self.on_plot_hover)
+        """Initialize the Matplotlib figure, the axes of the view and the Tk canvas."""
+        # Figure and canvas come from the pool (no pyplot), reused across opens
+        self.fig, self.canvas = self.figure_pool.acquire("measure", self.frame)
+        # Height map of the scan area; grows if points fall outside it
+        self.grid = HeightGrid(self.start_x, self.start_y, self.max_x, self.max_y)
+        # Live view while scanning ([MEASURE] live_view) and after DATA,DONE
+        # ([MEASURE] done_view); 2d updates row by row, 3d redraws the surface
+        self.view = _config_view("live_view", "2d")
+        self.done_view = _config_view("done_view", "3d")
+        # 3D surface rendered in a worker process instead of the Tk thread
+        self.render_process = str(
+            config_utils.get_config("MEASURE", "render_process", "true")
+        ).strip().lower() in ("1", "true", "yes", "on")
+        self._render_poll_id = None
+        self.image = None
+        self._setup_axes()
+
+        # disconnected again when the pool takes the canvas back
+        self.figure_pool.connect(self.canvas, "motion_notify_event", self.on_plot_hover)
+        self.figure_pool.connect(self.canvas, "draw_event", self._on_draw)
         self.redraw_plot()
 
     def _create_measurement_file(self):
         """Create measurements folder and open a timestamped CSV file.
 
-        If the file already exists, leave it (append mode will be used).
+        The file stays open until the measurement is closed; [MEASURE] fsync
+        (row, done or never) sets when it is synced to disk.
         """
         folder = os.path.join(os.getcwd(), "measurements")
         try:
@@ -359,13 +544,32 @@ class MeasureApp:
         ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         path = os.path.join(folder, f"measurement_{ts}.csv")
         self.measurement_file_path = path
+        self.measurement_writer = None
 
-        # create file with header if not exists
-        if not os.path.exists(self.measurement_file_path):
-            try:
-                with open(
-                    self.measurement_file_path, "w", encoding="utf-8", newline=""
-                ) as f:
-                    f.write("x,y,z\n")
-            except Exception as e:
-                print(f"Warning: could not create measurement file: {e}")
+        fsync = str(config_utils.get_config("MEASURE", "fsync", "done")).strip().lower()
+        if fsync not in FSYNC_POLICIES:
+            print(f"MeasureApp: unknown fsync policy {fsync!r}, using 'done'")
+            fsync = "done"
+        # create file with header if not exists (append mode otherwise)
+        try:
+            self.measurement_writer = MeasurementWriter(path, fsync=fsync)
+        except Exception as e:
+            print(f"Warning: could not create measurement file: {e}")
+
+    def _finish_measurement_file(self):
+        """Scan complete: make sure all points are on disk."""
+        try:
+            if self.measurement_writer is not None:
+                self.measurement_writer.finish()
+        except Exception as e:
+            print(f"Warning: failed to flush measurement file: {e}")
+
+    def close_measurement_file(self):
+        writer = getattr(self, "measurement_writer", None)
+        if writer is None:
+            return
+        self.measurement_writer = None
+        try:
+            writer.close()
+        except Exception as e:
+            print(f"Warning: failed to close measurement file: {e}")
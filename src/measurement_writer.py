@@ -0,0 +1,95 @@
+"""Buffered CSV writer for measurement points.
+
+One file stays open for the whole scan instead of an open/append/close per
+DATA point. Points are collected in the file buffer and handed to the OS
+when a Y row is complete, when the scan is done (`finish`) and on `close`,
+so after a crash of the app every completed row is in the file; only the
+row in progress can be missing or cut off in its last line.
+
+The fsync policy decides when the data is also forced to the disk (which
+protects against power loss / OS crash, and costs a disk round trip):
+
+    row    after every completed row
+    done   on finish() and close()   (default)
+    never  leave it to the OS
+"""
+
+import os
+
+FSYNC_POLICIES = ("row", "done", "never")
+HEADER = "x,y,z\n"
+
+
+class MeasurementWriter:
+    def __init__(self, path, fsync="done", buffer_size=256 * 1024):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"unknown fsync policy {fsync!r}")
+        self.path = path
+        self.fsync = fsync
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", encoding="utf-8", newline="", buffering=buffer_size)
+        if new:
+            self._file.write(HEADER)
+            self._file.flush()
+        self._last_y = None
+        self.points = 0
+        self.rows = 0
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def write_points(self, xs, ys, zs):
+        """Append points; flushes when a new Y row starts."""
+        f = self._file
+        if f is None:
+            return
+        if not ys:
+            return
+        prev_y = self._last_y
+        if prev_y is None:
+            prev_y = ys[0]
+        # A new row starts where y changes: everything before it is complete
+        boundary = None
+        new_rows = 0
+        for i, y in enumerate(ys):
+            if y != prev_y:
+                boundary = i
+                prev_y = y
+                new_rows += 1
+        if boundary is None:
+            f.write("".join(f"{x},{y},{z}\n" for x, y, z in zip(xs, ys, zs)))
+        else:
+            f.write("".join(
+                f"{x},{y},{z}\n" for x, y, z in zip(xs[:boundary], ys[:boundary], zs[:boundary])
+            ))
+            self.rows += new_rows
+            self.flush(sync=self.fsync == "row")
+            f.write("".join(
+                f"{x},{y},{z}\n" for x, y, z in zip(xs[boundary:], ys[boundary:], zs[boundary:])
+            ))
+        self._last_y = ys[-1]
+        self.points += len(ys)
+
+    def flush(self, sync=False):
+        """Hand buffered points to the OS; with `sync` also fsync them."""
+        f = self._file
+        if f is None:
+            return
+        f.flush()
+        if sync:
+            os.fsync(f.fileno())
+
+    def finish(self):
+        """Scan complete (DATA,DONE): flush and, unless fsync=never, sync."""
+        self.flush(sync=self.fsync != "never")
+
+    def close(self):
+        f = self._file
+        if f is None:
+            return
+        try:
+            self.finish()
+        finally:
+            self._file = None
+            f.close()
@@ -0,0 +1,147 @@
+"""Message-type routing for lines received from the device.
+
+`MessageRouter` maps the message type (the text before the first comma,
+e.g. `DATA` in `DATA,12,40,31337`) to the handlers registered for it, so
+routing a line is a single dict lookup. `MasterGui` registers the
+handlers that keep global state and the terminal up to date; the
+`AppManager` panes register their own handlers when they open and remove
+them again when they close.
+
+High-rate streams use batch handlers: consecutive lines of one type are
+handed over as a list together with the result of the parser set for
+that type, which runs once per run of lines no matter how many batch
+handlers consume it. A run is split after each `<TYPE>,DONE` end marker,
+so the marker is always the last line of its batch and handlers see the
+records before it, the marker and the records after it in stream order.
+"""
+
+from itertools import groupby
+
+
+def message_type(msg):
+    """Return the message type of a received line."""
+    return msg.partition(",")[0]
+
+
+def split_after(lines, marker):
+    """Split `lines` after each line equal to `marker` (yields lists)."""
+    start = 0
+    while True:
+        try:
+            end = lines.index(marker, start) + 1
+        except ValueError:
+            break
+        yield lines[start:end]
+        start = end
+    if start < len(lines):
+        yield lines[start:]
+
+
+class MessageRouter:
+    """Dispatch received lines to per-type handlers.
+
+    Line handlers are called with the full line, in registration order.
+    Batch handlers are called with (lines, parsed) for each run of
+    consecutive lines of their type, after the line handlers.
+    Registration may happen on the GUI thread while the reader thread
+    dispatches: the handler tuples are replaced, never mutated.
+
+    on_error: optional callable(message, exception) invoked when a handler
+    raises; without it the exception is printed and dispatch continues.
+
+    count_lines: optional callable(msg_type, n); when set, it is called with
+    the number of lines of each run (see PipelineMetrics.lines_dispatched).
+    """
+
+    def __init__(self, on_error=None):
+        self._handlers = {}
+        self._batch_handlers = {}
+        self._parsers = {}
+        self.on_error = on_error
+        self.count_lines = None
+
+    def register(self, msg_types, handler):
+        """Register a line handler for one message type or an iterable of types."""
+        self._add(self._handlers, msg_types, handler)
+
+    def unregister(self, msg_types, handler):
+        """Remove a line handler; unknown handlers are ignored."""
+        self._remove(self._handlers, msg_types, handler)
+
+    def register_batch(self, msg_types, handler):
+        """Register a batch handler called as handler(lines, parsed)."""
+        self._add(self._batch_handlers, msg_types, handler)
+
+    def unregister_batch(self, msg_types, handler):
+        """Remove a batch handler; unknown handlers are ignored."""
+        self._remove(self._batch_handlers, msg_types, handler)
+
+    def set_parser(self, msg_type, parser):
+        """Set the parser whose result batch handlers receive as `parsed`."""
+        self._parsers[msg_type] = parser
+
+    def handlers(self, msg_type):
+        """Return the line handlers currently registered for `msg_type`."""
+        return self._handlers.get(msg_type, ())
+
+    @staticmethod
+    def _add(table, msg_types, handler):
+        if isinstance(msg_types, str):
+            msg_types = (msg_types,)
+        for msg_type in msg_types:
+            handlers = table.get(msg_type, ())
+            if handler not in handlers:
+                table[msg_type] = handlers + (handler,)
+
+    @staticmethod
+    def _remove(table, msg_types, handler):
+        if isinstance(msg_types, str):
+            msg_types = (msg_types,)
+        for msg_type in msg_types:
+            handlers = tuple(h for h in table.get(msg_type, ()) if h != handler)
+            if handlers:
+                table[msg_type] = handlers
+            else:
+                table.pop(msg_type, None)
+
+    def dispatch(self, messages):
+        """Route every line in `messages` to the handlers of its type."""
+        table = self._handlers
+        batch_table = self._batch_handlers
+        count_lines = self.count_lines
+        for msg_type, run in groupby(messages, key=message_type):
+            handlers = table.get(msg_type, ())
+            batch_handlers = batch_table.get(msg_type, ())
+            if batch_handlers or count_lines is not None:
+                run = list(run)
+                if count_lines is not None:
+                    count_lines(msg_type, len(run))
+            if handlers:
+                for msg in run:
+                    for handler in handlers:
+                        try:
+                            handler(msg)
+                        except Exception as e:
+                            self._report(msg, e)
+            if not batch_handlers:
+                continue
+
+            parser = self._parsers.get(msg_type)
+            for batch in split_after(run, f"{msg_type},DONE"):
+                what = f"{len(batch)} {msg_type} lines"
+                try:
+                    parsed = parser(batch) if parser is not None else None
+                except Exception as e:
+                    self._report(what, e)
+                    continue
+                for handler in batch_handlers:
+                    try:
+                        handler(batch, parsed)
+                    except Exception as e:
+                        self._report(what, e)
+
+    def _report(self, what, error):
+        if self.on_error is not None:
+            self.on_error(what, error)
+        else:
+            print(f"MessageRouter: error handling '{what}': {error}")
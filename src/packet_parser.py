@@ -0,0 +1,123 @@
+"""Vectorized parsing of DATA and TUNNEL packets.
+
+A batch of same-type lines is joined into one string and converted by
+NumPy in a single call, instead of `split` and `int()` per line. The
+result is a structured array:
+
+- DATA,x,y,z         -> DATA_DTYPE   (x, y, z as uint16)
+- TUNNEL,flag,adc,z  -> TUNNEL_DTYPE (adc converted to signed int16)
+
+Lines that are not numeric records (e.g. `DATA,DONE`, `TUNNEL,DONE` or a
+corrupt line) are returned separately, in their original order. Each line
+is checked on its own: a wrong number of fields or a value outside the
+range of its field rejects that line only, so one bad line can neither
+shift the fields of the next ones nor take the DONE marker down with it.
+"""
+
+import numpy as np
+
+DATA_DTYPE = np.dtype([("x", np.uint16), ("y", np.uint16), ("z", np.uint16)])
+TUNNEL_DTYPE = np.dtype([("flag", np.int8), ("adc", np.int16), ("z", np.uint16)])
+
+# Below this many lines the per-line path beats NumPy's fixed call overhead
+SMALL_BATCH = 16
+
+# Accepted (min, max) of each field. The device sends the ADC value as
+# unsigned 16 bit; already signed values are accepted as well.
+DATA_LIMITS = ((0, 0xFFFF), (0, 0xFFFF), (0, 0xFFFF))
+TUNNEL_LIMITS = ((-0x80, 0x7F), (-0x8000, 0xFFFF), (0, 0xFFFF))
+# Stands in for the line prefix while parsing (outside every field range)
+_MARKER = -999999
+
+
+def _parse_ints(lines, prefix, limits):
+    """Return an (n, nfields) int64 array for `lines`, or None if any is invalid."""
+    # The prefix becomes a marker field, so each line has to fill exactly
+    # one row that starts with the marker: a total count alone would let a
+    # short and a long line cancel out and shift every later record
+    body = ",".join(lines).replace(prefix, f"{_MARKER},")
+    try:
+        flat = np.fromstring(body, dtype=np.int64, sep=",")
+    except ValueError:
+        return None
+    # fromstring stops at the first field that is not an integer (with a
+    # DeprecationWarning, not an error): a short result is a bad batch
+    if flat.size != len(lines) * (len(limits) + 1):
+        return None
+    values = flat.reshape(-1, len(limits) + 1)
+    # marker column and field ranges in one pass: value - low, read as
+    # unsigned, exceeds the span for anything below low or above high
+    low = np.array([_MARKER] + [lo for lo, _ in limits], dtype=np.int64)
+    span = np.array([0] + [hi - lo for lo, hi in limits], dtype=np.uint64)
+    if ((values - low).view(np.uint64) > span).any():
+        return None
+    return values[:, 1:]
+
+
+def _split_records(lines, prefix, limits):
+    """Parse `lines` into numbers plus the lines that are not records.
+
+    Returns (matrix, rows, others): `matrix` is an (n, nfields) int64 array
+    from the vectorized path, or None when the batch went through the
+    per-line path, in which case `rows` holds the parsed tuples. A run with
+    any bad line (wrong field count, not a number, out of `limits`) takes
+    the per-line path, which rejects just those lines.
+    """
+    others = []
+    if lines and lines[-1].endswith(",DONE"):
+        # the usual end-of-stream marker: keep the fast path for the rest.
+        # MessageRouter splits runs after each DONE, so a marker is always
+        # last and comes after the records it ends
+        others.append(lines[-1])
+        lines = lines[:-1]
+    if len(lines) >= SMALL_BATCH:
+        values = _parse_ints(lines, prefix, limits)
+        if values is not None:
+            return values, None, others
+
+    # Small or malformed batch: sort line by line
+    nfields = len(limits)
+    rows = []
+    rejected = []
+    for line in lines:
+        parts = line.split(",")
+        try:
+            if len(parts) != nfields + 1:
+                raise ValueError
+            row = tuple(int(p) for p in parts[1:])
+            for value, (lo, hi) in zip(row, limits):
+                if not lo <= value <= hi:
+                    raise ValueError
+            rows.append(row)
+        except ValueError:
+            rejected.append(line)
+    return None, rows, rejected + others
+
+
+def parse_data_lines(lines):
+    """Parse `DATA,x,y,z` lines. Returns (records, other_lines)."""
+    values, rows, others = _split_records(lines, "DATA,", DATA_LIMITS)
+    if values is None:
+        return np.array(rows, dtype=DATA_DTYPE), others
+    records = np.empty(len(values), dtype=DATA_DTYPE)
+    records["x"] = values[:, 0]
+    records["y"] = values[:, 1]
+    records["z"] = values[:, 2]
+    return records, others
+
+
+def parse_tunnel_lines(lines):
+    """Parse `TUNNEL,flag,adc,z` lines. Returns (records, other_lines).
+
+    The device sends the ADC value as unsigned 16 bit; it is reinterpreted
+    as signed int16 here, for the whole batch at once.
+    """
+    values, rows, others = _split_records(lines, "TUNNEL,", TUNNEL_LIMITS)
+    if values is None:
+        rows = [(f, a - 0x10000 if a > 0x7FFF else a, z) for f, a, z in rows]
+        return np.array(rows, dtype=TUNNEL_DTYPE), others
+    records = np.empty(len(values), dtype=TUNNEL_DTYPE)
+    records["flag"] = values[:, 0]
+    records["adc"] = values[:, 1].astype(np.uint16).view(np.int16)
+    records["z"] = values[:, 2]
+    return records, others
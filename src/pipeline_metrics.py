@@ -0,0 +1,261 @@
+"""Counters and latency histograms for the serial -> GUI pipeline.
+
+`PipelineMetrics` is shared by `USBConnection` (bytes in, queue depth,
+decode errors, receive-to-dispatch latency), the `MessageRouter` (lines
+per message type), `MasterGui` and the `GuiPump` (dispatch-to-render
+latency, frame times). All
+updates are per chunk or per batch, never per line, so instrumentation
+stays cheap at full scan rate.
+
+`snapshot()` returns a plain dict; pass the previous snapshot to get
+rates for the interval in between. `MetricsSnapshotWriter` appends a
+snapshot as one JSON line every few seconds for offline analysis.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# First fields of the firmware protocol; lines_by_type counts anything else
+# (noise, debug output, corrupt lines) under OTHER_TYPE, so a noisy link
+# cannot add keys without limit
+MESSAGE_TYPES = frozenset(
+    ("DATA", "TUNNEL", "ADJUST", "FIND", "PARAMETER", "IDLE", "STOPPED", "FORMAT")
+)
+OTHER_TYPE = "other"
+
+# Upper bin edges of the latency histograms in milliseconds (last bin: above)
+LATENCY_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class LatencyHistogram:
+    """Fixed-bin latency histogram with count, mean and max."""
+
+    def __init__(self, bounds=LATENCY_BOUNDS_MS):
+        self.bounds = tuple(bounds)
+        self.bins = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.bins[bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q):
+        """Upper bin edge below which `q` percent of the samples fall."""
+        if not self.count:
+            return None
+        target = self.count * q / 100.0
+        seen = 0
+        for i, n in enumerate(self.bins):
+            seen += n
+            if seen >= target and n:
+                if i < len(self.bounds):
+                    return min(self.bounds[i], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.sum_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+            "bins": list(self.bins),
+        }
+
+
+class PipelineMetrics:
+    """Thread-safe pipeline counters; see the module docstring."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.bytes_in = 0
+        self.chunks_in = 0
+        self.lines_in = 0
+        # message type -> lines dispatched; see lines_dispatched()
+        self.lines_by_type = {}
+        self.queue_depth = 0
+        self.queue_max = 0
+        self.queue_dropped = 0
+        self.queue_spilled = 0
+        self.decode_errors = 0
+        self.dispatch_errors = 0
+        self.batches = 0
+        self.receive_to_dispatch = LatencyHistogram()
+        self.dispatch_to_render = LatencyHistogram()
+        self.frame_time = LatencyHistogram()
+        self._render_pending_ns = None
+        # optional callable returning FigurePool.stats() (live figures)
+        self.figure_stats = None
+
+    # reader thread
+    def received(self, nbytes, nlines, queue_depth):
+        with self._lock:
+            self.bytes_in += nbytes
+            self.chunks_in += 1
+            self.lines_in += nlines
+            self.queue_depth = queue_depth
+            if queue_depth > self.queue_max:
+                self.queue_max = queue_depth
+
+    def queue_overload(self, dropped, spilled):
+        """Totals of lines the receive queue dropped or spilled to disk."""
+        with self._lock:
+            self.queue_dropped = dropped
+            self.queue_spilled = spilled
+
+    def decode_error(self, count=1):
+        with self._lock:
+            self.decode_errors += count
+
+    # dispatcher thread
+    def dispatched(self, received_ns, queue_depth, now_ns=None):
+        """Record one batch whose oldest chunk was read at `received_ns`."""
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        with self._lock:
+            self.batches += 1
+            self.queue_depth = queue_depth
+            self.receive_to_dispatch.add((now_ns - received_ns) / 1e6)
+
+    def lines_dispatched(self, msg_type, count):
+        """Count a run of `count` lines of `msg_type` (MessageRouter.count_lines)."""
+        if msg_type not in MESSAGE_TYPES:
+            msg_type = OTHER_TYPE
+        with self._lock:
+            self.lines_by_type[msg_type] = self.lines_by_type.get(msg_type, 0) + count
+
+    def dispatch_error(self):
+        with self._lock:
+            self.dispatch_errors += 1
+
+    def mark_dispatched(self, now_ns=None):
+        """Note a dispatched batch that is not on screen yet.
+
+        Returns True for the first batch since the last `rendered()` call,
+        i.e. when the caller has to schedule a render probe.
+        """
+        with self._lock:
+            if self._render_pending_ns is not None:
+                return False
+            self._render_pending_ns = (
+                now_ns if now_ns is not None else time.perf_counter_ns()
+            )
+            return True
+
+    # GUI thread
+    def rendered(self, now_ns=None):
+        """The GUI caught up with everything dispatched so far."""
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        with self._lock:
+            pending = self._render_pending_ns
+            self._render_pending_ns = None
+            if pending is not None:
+                self.dispatch_to_render.add((now_ns - pending) / 1e6)
+
+    def frame(self, elapsed_ms=None, caught_up=True):
+        """One GUI pump frame; `elapsed_ms` is None for an idle frame.
+
+        A frame that left no work behind completes dispatch-to-render.
+        """
+        if elapsed_ms is not None:
+            with self._lock:
+                self.frame_time.add(elapsed_ms)
+        if caught_up:
+            self.rendered()
+
+    def snapshot(self, previous=None):
+        """Return the current state as a dict (JSON serializable).
+
+        With the snapshot taken before as `previous`, rates for the interval
+        in between are included under "rates".
+        """
+        with self._lock:
+            snap = {
+                "time": time.time(),
+                "uptime_s": time.monotonic() - self.started,
+                "bytes_in": self.bytes_in,
+                "chunks_in": self.chunks_in,
+                "lines_in": self.lines_in,
+                "lines_by_type": dict(self.lines_by_type),
+                "queue_depth": self.queue_depth,
+                "queue_max": self.queue_max,
+                "queue_dropped": self.queue_dropped,
+                "queue_spilled": self.queue_spilled,
+                "decode_errors": self.decode_errors,
+                "dispatch_errors": self.dispatch_errors,
+                "batches": self.batches,
+                "receive_to_dispatch": self.receive_to_dispatch.as_dict(),
+                "dispatch_to_render": self.dispatch_to_render.as_dict(),
+                "frame_time": self.frame_time.as_dict(),
+            }
+        if self.figure_stats is not None:
+            try:
+                snap["figures"] = self.figure_stats()
+            except Exception:
+                pass
+        if previous:
+            dt = snap["uptime_s"] - previous["uptime_s"]
+            if dt > 0:
+                before = previous["lines_by_type"]
+                snap["rates"] = {
+                    "interval_s": dt,
+                    "bytes_per_s": (snap["bytes_in"] - previous["bytes_in"]) / dt,
+                    "lines_per_s": (snap["lines_in"] - previous["lines_in"]) / dt,
+                    "lines_per_s_by_type": {
+                        t: (n - before.get(t, 0)) / dt
+                        for t, n in snap["lines_by_type"].items()
+                    },
+                }
+        return snap
+
+
+class MetricsSnapshotWriter:
+    """Append a metrics snapshot as a JSON line every `interval_s` seconds."""
+
+    def __init__(self, metrics, path, interval_s=10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread; a last snapshot is written on the way out."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        previous = self.metrics.snapshot()
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                stopping = self._stop.wait(self.interval_s)
+                snap = self.metrics.snapshot(previous)
+                try:
+                    f.write(json.dumps(snap) + "\n")
+                    f.flush()
+                except Exception as e:
+                    print(f"Error writing metrics snapshot: {e}")
+                previous = snap
+                if stopping:
+                    return
@@ -0,0 +1,254 @@
+"""Bounded queue between the serial reader and the dispatcher thread.
+
+Items are `(receive timestamp, list of lines)` chunks as produced by
+`USBConnection`. The queue holds at most `max_lines` lines in memory.
+When a chunk does not fit:
+
+- numeric records of the lossy types (TUNNEL and ADJUST by default) are
+  dropped according to `policy`:
+    "drop-oldest"  drop the oldest queued lossy lines first
+    "drop-newest"  drop the lossy lines of the incoming chunk
+    "coalesce"     keep only the latest line of each lossy type
+- everything else (DATA, DONE markers such as TUNNEL,DONE, IDLE,
+  PARAMETER, ...) is never dropped: if there is still no room, chunks spill to a temporary file
+  and are read back in order once the dispatcher catches up. While the
+  spill file has unread chunks, new chunks are appended to it as well so
+  the order of lines is preserved.
+
+Dropped lines are counted per type in `dropped`, spilled lines in
+`spilled`. Non-chunk items (e.g. a stop marker) are queued as they are.
+"""
+
+import queue
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+
+from message_router import message_type
+
+POLICIES = ("drop-oldest", "drop-newest", "coalesce")
+LOSSY_TYPES = ("TUNNEL", "ADJUST")
+# First character of the first field of a numeric record
+_NUMERIC_START = frozenset("0123456789+-.")
+
+# Spill record header: receive timestamp, number of lines, payload bytes
+_SPILL_HEADER = struct.Struct("<qII")
+
+
+class ReceiveQueue:
+    """Bounded chunk queue with drop policies and a disk spill for DATA.
+
+    Offers the subset of `queue.Queue` used by `USBConnection`:
+    put, get, get_nowait, qsize and empty. qsize() counts lines, including
+    spilled lines not read back yet.
+    """
+
+    def __init__(
+        self,
+        max_lines=200_000,
+        policy="drop-oldest",
+        lossy_types=LOSSY_TYPES,
+        spill_batch=20_000,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown queue policy {policy!r}, use one of {POLICIES}")
+        self.max_lines = max(1, int(max_lines))
+        # drop down to 90% so a full queue does not rescan on every chunk
+        self._low_water = self.max_lines - self.max_lines // 10
+        self.policy = policy
+        self.lossy_types = frozenset(lossy_types)
+        self.spill_batch = spill_batch
+        self._items = deque()
+        self._lines = 0
+        self._cond = threading.Condition()
+        self._spill = None
+        self._spill_read = 0
+        self._spill_write = 0
+        self._spill_lines = 0
+        self.dropped = {}
+        self.spilled = 0
+
+    @property
+    def dropped_total(self):
+        return sum(self.dropped.values())
+
+    def put(self, item):
+        with self._cond:
+            if not isinstance(item, tuple):
+                self._items.append(item)
+            else:
+                self._put_chunk(*item)
+            self._cond.notify()
+
+    def _put_chunk(self, received_ns, lines):
+        if self._spill_lines:
+            # spilled chunks are older, keep appending until they are read back;
+            # while the queue is still full, lossy records are dropped rather
+            # than spilled (a spilled DONE marker must not pull them to disk)
+            if self._lines + len(lines) > self.max_lines:
+                lines = self._filter(lines, len(lines))[0]
+                if not lines:
+                    return
+            self._write_spill(received_ns, lines)
+            return
+        if self._lines + len(lines) > self.max_lines:
+            lines = self._make_room(lines)
+            if not lines:
+                return
+            if self._lines + len(lines) > self.max_lines:
+                self._write_spill(received_ns, lines)
+                return
+        self._items.append((received_ns, lines))
+        self._lines += len(lines)
+
+    def _is_lossy(self, line):
+        # only data records: TUNNEL,DONE ends a cycle and must get through
+        msg_type, _, rest = line.partition(",")
+        return msg_type in self.lossy_types and rest[:1] in _NUMERIC_START
+
+    def _drop(self, line):
+        msg_type = message_type(line)
+        self.dropped[msg_type] = self.dropped.get(msg_type, 0) + 1
+
+    def _make_room(self, incoming):
+        """Apply the drop policy; returns what is left of `incoming`."""
+        excess = self._lines + len(incoming) - self._low_water
+        if self.policy == "drop-newest":
+            return self._filter(incoming, excess)[0]
+        if self.policy == "drop-oldest":
+            items = deque()
+            for item in self._items:
+                if excess > 0 and isinstance(item, tuple):
+                    received_ns, lines = item
+                    kept, excess = self._filter(lines, excess)
+                    self._lines -= len(lines) - len(kept)
+                    if not kept:
+                        continue
+                    item = (received_ns, kept)
+                items.append(item)
+            self._items = items
+            return self._filter(incoming, excess)[0] if excess > 0 else incoming
+        return self._coalesce(incoming)
+
+    def _filter(self, lines, excess):
+        """Drop up to `excess` lossy lines, oldest first."""
+        kept = []
+        for line in lines:
+            if excess > 0 and self._is_lossy(line):
+                self._drop(line)
+                excess -= 1
+            else:
+                kept.append(line)
+        return kept, excess
+
+    def _coalesce(self, incoming):
+        # walk newest to oldest and keep the first (latest) line per lossy type
+        seen = set()
+
+        def latest_only(lines):
+            kept = []
+            for line in reversed(lines):
+                if self._is_lossy(line):
+                    msg_type = message_type(line)
+                    if msg_type in seen:
+                        self._drop(line)
+                        continue
+                    seen.add(msg_type)
+                kept.append(line)
+            kept.reverse()
+            return kept
+
+        incoming = latest_only(incoming)
+        items = deque()
+        for item in reversed(self._items):
+            if isinstance(item, tuple):
+                received_ns, lines = item
+                kept = latest_only(lines)
+                self._lines -= len(lines) - len(kept)
+                if not kept:
+                    continue
+                item = (received_ns, kept)
+            items.appendleft(item)
+        self._items = items
+        return incoming
+
+    def _write_spill(self, received_ns, lines):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="stm_rx_", suffix=".spill")
+        payload = "\n".join(lines).encode("utf-8")
+        self._spill.seek(self._spill_write)
+        self._spill.write(_SPILL_HEADER.pack(received_ns, len(lines), len(payload)))
+        self._spill.write(payload)
+        self._spill_write = self._spill.tell()
+        self._spill_lines += len(lines)
+        self.spilled += len(lines)
+
+    def _read_spill(self):
+        """Read back up to `spill_batch` spilled lines as one chunk."""
+        self._spill.flush()
+        self._spill.seek(self._spill_read)
+        oldest = None
+        lines = []
+        while self._spill_read < self._spill_write and len(lines) < self.spill_batch:
+            received_ns, count, size = _SPILL_HEADER.unpack(
+                self._spill.read(_SPILL_HEADER.size)
+            )
+            lines.extend(self._spill.read(size).decode("utf-8").split("\n"))
+            self._spill_read += _SPILL_HEADER.size + size
+            self._spill_lines -= count
+            if oldest is None:
+                oldest = received_ns
+        if self._spill_read >= self._spill_write:
+            # fully drained: reuse the file from the start
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spill_read = self._spill_write = 0
+        return oldest, lines
+
+    def _pop(self):
+        if self._items:
+            item = self._items.popleft()
+            if isinstance(item, tuple):
+                self._lines -= len(item[1])
+            return item
+        if self._spill_lines:
+            return self._read_spill()
+        raise queue.Empty
+
+    def get(self, block=True, timeout=None):
+        with self._cond:
+            if not block:
+                return self._pop()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items and not self._spill_lines:
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+            return self._pop()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def qsize(self):
+        with self._cond:
+            return self._lines + self._spill_lines
+
+    def empty(self):
+        with self._cond:
+            return not self._items and not self._spill_lines
+
+    def close(self):
+        """Discard everything queued and delete the spill file."""
+        with self._cond:
+            self._items.clear()
+            self._lines = 0
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            self._spill_read = self._spill_write = self._spill_lines = 0
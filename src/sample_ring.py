@@ -0,0 +1,63 @@
+"""Fixed-size ring buffer of the latest tunnel samples.
+
+The rolling tunnel monitor keeps the last `capacity` `(flag, adc, z)`
+samples across TUNNEL cycles. `SampleRing` preallocates one structured
+array (`packet_parser.TUNNEL_DTYPE`) and overwrites the oldest samples
+in place, so memory stays constant however long the monitor runs;
+appending a batch costs at most two slice assignments.
+"""
+
+import numpy as np
+
+from packet_parser import TUNNEL_DTYPE
+
+
+class SampleRing:
+    def __init__(self, capacity, dtype=TUNNEL_DTYPE):
+        self.capacity = max(1, int(capacity))
+        self.data = np.zeros(self.capacity, dtype=dtype)
+        # next slot to write; the oldest sample once the ring is full
+        self.head = 0
+        # samples held (<= capacity) and samples ever appended
+        self.size = 0
+        self.total = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+    def extend(self, flags, adc, z):
+        """Append samples (arrays of equal length), dropping the oldest."""
+        n = len(flags)
+        if not n:
+            return
+        self.total += n
+        if n >= self.capacity:
+            # only the newest `capacity` samples survive
+            self._write(0, flags[-self.capacity:], adc[-self.capacity:], z[-self.capacity:])
+            self.head = 0
+            self.size = self.capacity
+            return
+        first = min(n, self.capacity - self.head)
+        self._write(self.head, flags[:first], adc[:first], z[:first])
+        if first < n:
+            self._write(0, flags[first:], adc[first:], z[first:])
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def ordered(self):
+        """The samples held, oldest first (a view when not wrapped)."""
+        if self.size < self.capacity:
+            return self.data[: self.size]
+        if self.head == 0:
+            return self.data
+        return np.concatenate((self.data[self.head:], self.data[: self.head]))
+
+    def _write(self, start, flags, adc, z):
+        end = start + len(flags)
+        self.data["flag"][start:end] = flags
+        self.data["adc"][start:end] = adc
+        self.data["z"][start:end] = z
@@ -0,0 +1,202 @@
+"""Rotating on-disk log of the terminal stream.
+
+Every line shown in the terminal is written to `logs/terminal_<ts>.log` as
+
+    2026-10-18 21:04:05.123 RX TUNNEL,1,-312,40211
+    2026-10-18 21:04:05.131 TX STOP
+
+TX marks commands sent to the device (the terminal's `To STM:` lines), RX
+everything else. `SessionLog.write` only appends to an in-memory deque, so
+the dispatcher and the Tk thread never wait for the disk. A writer thread
+drains the deque every `flush_interval_s` (or sooner once `batch_lines`
+are waiting), formats the batch and writes it in one call to a file with a
+large buffer, then flushes.
+
+A segment is closed and a new one started once it reaches `max_bytes` or
+is older than `max_age_s`; closed segments are gzipped in the background
+if `compress` is set.
+"""
+
+import gzip
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+SENT_PREFIX = "To STM: "
+BUFFER_SIZE = 1 << 20
+
+
+def _timestamp(t, _cache={}):
+    """'YYYY-mm-dd HH:MM:SS.mmm' for a time.time() value."""
+    sec = int(t)
+    prefix = _cache.get(sec)
+    if prefix is None:
+        # one strftime per second of log, not per line
+        _cache.clear()
+        prefix = _cache[sec] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+    return f"{prefix}.{int((t - sec) * 1000):03d}"
+
+
+class SessionLog:
+    """Asynchronous, rotating writer for terminal lines (thread-safe)."""
+
+    def __init__(
+        self,
+        folder,
+        prefix="terminal",
+        max_bytes=50 * 1024 * 1024,
+        max_age_s=3600.0,
+        compress=True,
+        flush_interval_s=1.0,
+        batch_lines=10_000,
+    ):
+        self.folder = folder
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.compress = compress
+        self.flush_interval_s = flush_interval_s
+        self.batch_lines = batch_lines
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._opened = 0.0
+        self._segment_bytes = 0
+        self._compressors = []
+        self.path = None
+        # statistics
+        self.lines = 0
+        self.bytes = 0
+        self.segments = 0
+        self.errors = 0
+
+    # any thread
+    def write(self, line):
+        """Queue one terminal line; never blocks on the disk."""
+        self._pending.append((time.time(), line))
+        if len(self._pending) >= self.batch_lines:
+            self._wake.set()
+
+    def start(self):
+        os.makedirs(self.folder, exist_ok=True)
+        self._stop.clear()
+        self._open_segment()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout=5.0):
+        """Write what is pending, close the segment and wait for gzip."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        for thread in self._compressors:
+            thread.join(timeout=timeout)
+        self._compressors = []
+
+    # writer thread
+    def _run(self):
+        try:
+            while True:
+                self._wake.wait(self.flush_interval_s)
+                self._wake.clear()
+                stopping = self._stop.is_set()
+                self._write_pending()
+                if stopping:
+                    break
+                if self._due_for_rotation():
+                    self._rotate()
+        finally:
+            self._close_segment(compress=self.compress)
+
+    def _write_pending(self):
+        pending = self._pending
+        if not pending:
+            return
+        chunks = []
+        count = 0
+        while pending:
+            # popleft is atomic; writers only append
+            t, line = pending.popleft()
+            if line.startswith(SENT_PREFIX):
+                chunks.append(f"{_timestamp(t)} TX {line[len(SENT_PREFIX):]}\n")
+            else:
+                chunks.append(f"{_timestamp(t)} RX {line}\n")
+            count += 1
+        data = "".join(chunks).encode("utf-8", "replace")
+        try:
+            self._file.write(data)
+            self._file.flush()
+        except Exception as e:
+            self.errors += 1
+            print(f"Error writing terminal log: {e}")
+            return
+        self.lines += count
+        self.bytes += len(data)
+        self._segment_bytes += len(data)
+
+    def _due_for_rotation(self):
+        if self.max_bytes and self._segment_bytes >= self.max_bytes:
+            return True
+        return bool(self.max_age_s) and time.monotonic() - self._opened >= self.max_age_s
+
+    def _rotate(self):
+        self._close_segment(compress=self.compress)
+        try:
+            self._open_segment()
+        except Exception as e:
+            self.errors += 1
+            print(f"Error opening terminal log: {e}")
+
+    def _open_segment(self):
+        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(self.folder, f"{self.prefix}_{ts}.log")
+        n = 1
+        while os.path.exists(path) or os.path.exists(path + ".gz"):
+            # rotated within the same second
+            path = os.path.join(self.folder, f"{self.prefix}_{ts}_{n}.log")
+            n += 1
+        self._file = open(path, "ab", buffering=BUFFER_SIZE)
+        self._opened = time.monotonic()
+        self._segment_bytes = 0
+        self.path = path
+        self.segments += 1
+
+    def _close_segment(self, compress):
+        if self._file is None:
+            return
+        path = self.path
+        try:
+            self._file.close()
+        except Exception as e:
+            print(f"Error closing terminal log: {e}")
+        self._file = None
+        if not self._segment_bytes:
+            # nothing was logged into this segment
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        elif compress:
+            # gzip off the writer thread so logging continues meanwhile
+            thread = threading.Thread(target=compress_segment, args=(path,), daemon=True)
+            thread.start()
+            self._compressors = [t for t in self._compressors if t.is_alive()]
+            self._compressors.append(thread)
+
+
+def compress_segment(path):
+    """Replace `path` by `path.gz`."""
+    try:
+        with open(path, "rb") as src, gzip.open(path + ".gz", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, BUFFER_SIZE)
+        os.remove(path)
+    except Exception as e:
+        print(f"Error compressing {path}: {e}")
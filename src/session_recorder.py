@@ -0,0 +1,249 @@
+"""Record and replay serial sessions.
+
+A session file (`*.stmrec`) is an append-only sequence of records
+
+    int64   monotonic timestamp in ns (time.monotonic_ns)
+    uint8   direction: 0 = received from the device, 1 = sent to it
+    uint32  length of the line in bytes
+    bytes   the line, UTF-8, without newline
+
+after an 8-byte magic header. Every `INDEX_EVERY` records the recorder
+also appends (timestamp, file offset) to a sidecar `*.stmrec.idx` of
+fixed-size entries, so `SessionReader.seek` can binary-search the index
+and jump into a long session without reading it from the start.
+
+`SessionRecorder` is attached to `USBConnection` and tees every received
+and sent line. `ReplaySource` pushes a recorded session back into a
+dispatcher callback at 1x, Nx or maximum speed.
+"""
+
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"STMREC1\n"
+RECORD = struct.Struct("<qBI")
+INDEX_ENTRY = struct.Struct("<qQ")
+INDEX_EVERY = 256
+
+RECEIVED = 0
+SENT = 1
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+class SessionRecorder:
+    """Append lines with timestamps to a session file (thread-safe)."""
+
+    def __init__(self, path, buffer_size=1 << 20):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "ab", buffering=buffer_size)
+        self._index = open(index_path(path), "ab", buffering=64 * 1024)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._offset = self._file.tell()
+        self._since_index = INDEX_EVERY  # index the first record
+        self.records = 0
+
+    def record(self, direction, lines, t_ns=None):
+        """Append `lines` (an iterable of str) with one shared timestamp."""
+        if t_ns is None:
+            t_ns = time.monotonic_ns()
+        with self._lock:
+            if self._file is None:
+                return
+            pack = RECORD.pack
+            chunks = []
+            for line in lines:
+                if self._since_index >= INDEX_EVERY:
+                    # flush what we have so the indexed offset is exact
+                    self._write(chunks)
+                    chunks = []
+                    self._index.write(INDEX_ENTRY.pack(t_ns, self._offset))
+                    self._since_index = 0
+                data = line.encode("utf-8", "replace")
+                chunks.append(pack(t_ns, direction, len(data)))
+                chunks.append(data)
+                self._since_index += 1
+                self.records += 1
+            self._write(chunks)
+
+    def _write(self, chunks):
+        if chunks:
+            blob = b"".join(chunks)
+            self._file.write(blob)
+            self._offset += len(blob)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._index.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._index.close()
+            self._file = None
+            self._index = None
+
+
+class SessionReader:
+    """Read records from a session file, optionally starting at a timestamp."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a session file")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def first_timestamp(self):
+        """Timestamp of the first record, or None for an empty session."""
+        pos = self._file.tell()
+        self._file.seek(len(MAGIC))
+        head = self._file.read(RECORD.size)
+        self._file.seek(pos)
+        if len(head) < RECORD.size:
+            return None
+        return RECORD.unpack(head)[0]
+
+    def seek(self, t_ns):
+        """Position the reader at the first record with timestamp >= t_ns.
+
+        Uses the index to skip ahead, then scans at most INDEX_EVERY records.
+        """
+        offset = len(MAGIC)
+        try:
+            with open(index_path(self.path), "rb") as index:
+                count = os.fstat(index.fileno()).st_size // INDEX_ENTRY.size
+                lo, hi = 0, count
+                # last index entry with timestamp < t_ns
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    index.seek(mid * INDEX_ENTRY.size)
+                    ts, _ = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+                    if ts < t_ns:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                if lo > 0:
+                    index.seek((lo - 1) * INDEX_ENTRY.size)
+                    offset = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))[1]
+        except OSError:
+            pass
+        self._file.seek(offset)
+        while True:
+            pos = self._file.tell()
+            record = self._read_record()
+            if record is None or record[0] >= t_ns:
+                self._file.seek(pos)
+                return
+
+    def _read_record(self):
+        head = self._file.read(RECORD.size)
+        if len(head) < RECORD.size:
+            return None
+        t_ns, direction, length = RECORD.unpack(head)
+        data = self._file.read(length)
+        if len(data) < length:
+            return None  # truncated tail of a session that is still being written
+        return t_ns, direction, data.decode("utf-8", "replace")
+
+    def __iter__(self):
+        """Yield (t_ns, direction, line) from the current position."""
+        while True:
+            record = self._read_record()
+            if record is None:
+                return
+            yield record
+
+
+class ReplaySource:
+    """Feed a recorded session into `dispatcher_callback` from a thread.
+
+    Received lines that share a timestamp (one serial chunk) are delivered
+    as one batch, like `USBConnection` does. Sent lines go to `on_sent`
+    when given.
+
+    speed: 1.0 = recorded timing, N = N times faster, 0/None = no pauses.
+    start_ns: skip to the first record at or after this timestamp.
+    """
+
+    def __init__(self, path, dispatcher_callback, speed=1.0, start_ns=None, on_sent=None):
+        self.path = path
+        self.dispatcher_callback = dispatcher_callback
+        self.speed = speed
+        self.start_ns = start_ns
+        self.on_sent = on_sent
+        self.lines = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.join()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def run(self):
+        """Replay the session in the calling thread."""
+        with SessionReader(self.path) as reader:
+            if self.start_ns is not None:
+                reader.seek(self.start_ns)
+            t_first = None
+            wall_first = time.perf_counter()
+            batch, batch_ts = [], None
+            for t_ns, direction, line in reader:
+                if self._stop.is_set():
+                    return
+                if batch and t_ns != batch_ts:
+                    self._deliver(batch)
+                    batch = []
+                if t_first is None:
+                    t_first = t_ns
+                if self.speed and t_ns != batch_ts:
+                    delay = wall_first + (t_ns - t_first) / 1e9 / self.speed
+                    delay -= time.perf_counter()
+                    if delay > 0 and self._stop.wait(delay):
+                        return
+                batch_ts = t_ns
+                if direction == RECEIVED:
+                    batch.append(line)
+                elif self.on_sent is not None:
+                    self.on_sent(line)
+            if batch:
+                self._deliver(batch)
+
+    def _deliver(self, batch):
+        self.lines += len(batch)
+        self.dispatcher_callback(batch)
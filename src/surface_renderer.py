@@ -0,0 +1,257 @@
+"""3D surface rendering of the height grid, locally or in a worker process.
+
+`draw_surface` puts the surface of a `HeightGrid` snapshot on a 3D axes;
+`MeasureApp` uses it directly when no worker is available.
+
+`SurfaceRenderer` runs the same drawing in a separate process so the Tk
+thread (and with it the serial dispatch) is not blocked while a large
+surface is rasterized:
+
+- `submit()` copies the grid (z values and filled mask) into a shared
+  memory block and sends a small request (shape, extent, figure size in
+  pixels, dpi and view angles) through a pipe.
+- The worker draws a `matplotlib.figure.Figure` with the Agg canvas
+  off-screen (no pyplot, no Tk) and writes the RGBA pixels into a second
+  shared memory block.
+- `poll()` returns the finished RGBA image; the GUI copies it into its
+  canvas buffer and blits it.
+
+Only one request is in flight at a time; a newer submit while the worker
+is busy replaces the waiting one, so the worker always renders the latest
+snapshot and never falls behind.
+"""
+
+import atexit
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+from matplotlib import cm
+
+# Surface resolution of the 3D plot (cells per axis)
+SURFACE_CELLS = 50
+
+
+def draw_surface(ax, z_grid, filled, extent):
+    """Draw the measured cells of a height grid as a surface on a 3D axes."""
+    x_min, x_max, y_min, y_max = extent
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(y_min, y_max)
+    ax.set_zlim(0, 0xFFFF)
+    # Bounding box of the cells received so far
+    rows = np.flatnonzero(filled.any(axis=1))
+    cols = np.flatnonzero(filled.any(axis=0))
+    if len(rows) >= 2 and len(cols) >= 2:
+        r0, r1 = rows[0], rows[-1] + 1
+        c0, c1 = cols[0], cols[-1] + 1
+        z = z_grid[r0:r1, c0:c1].astype(float)
+        # cells not measured yet (rest of the current row) are left out
+        z[~filled[r0:r1, c0:c1]] = np.nan
+        x, y = np.meshgrid(
+            np.arange(x_min + c0, x_min + c1), np.arange(y_min + r0, y_min + r1)
+        )
+        # plot_surface samples at most SURFACE_CELLS per axis, so
+        # the redraw cost does not grow with the scan
+        ax.plot_surface(
+            x, y, z, cmap=cm.coolwarm, linewidth=0.2,
+            rcount=SURFACE_CELLS, ccount=SURFACE_CELLS,
+        )
+    elif filled.any():
+        # a single row or column so far: no surface yet
+        rows, cols = np.nonzero(filled)
+        z = z_grid[rows, cols]
+        ax.scatter(cols + x_min, rows + y_min, z, c=z, cmap=cm.coolwarm)
+
+
+def _attach(name, cache):
+    block = cache.get(name)
+    if block is None:
+        for old in cache.values():
+            old.close()
+        cache.clear()
+        block = cache[name] = shared_memory.SharedMemory(name=name)
+    return block
+
+
+def _worker_main(conn):
+    """Render loop of the worker process."""
+    # imported here: the worker needs no Tk backend
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    grids, outputs = {}, {}
+    fig = canvas = ax = None
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        t0 = time.perf_counter()
+        # drop the views of the last request before blocks may be replaced
+        z = filled = out = None
+        try:
+            shape = request["shape"]
+            grid_block = _attach(request["grid"], grids)
+            cells = shape[0] * shape[1]
+            z = np.ndarray(shape, dtype=np.uint16, buffer=grid_block.buf)
+            filled = np.ndarray(shape, dtype=bool, buffer=grid_block.buf, offset=cells * 2)
+            width, height, dpi = request["width"], request["height"], request["dpi"]
+            if fig is None or fig.dpi != dpi or canvas.get_width_height() != (width, height):
+                fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+                canvas = FigureCanvasAgg(fig)
+                ax = fig.add_subplot(111, projection="3d")
+            ax.clear()
+            ax.view_init(elev=request["elev"], azim=request["azim"])
+            draw_surface(ax, z, filled, request["extent"])
+            canvas.draw()
+            rgba = np.asarray(canvas.buffer_rgba())
+            out_block = _attach(request["output"], outputs)
+            if rgba.nbytes > out_block.size:
+                raise ValueError("output buffer too small")
+            out = np.ndarray(rgba.shape, dtype=np.uint8, buffer=out_block.buf)
+            out[:] = rgba
+            conn.send({"seq": request["seq"], "shape": rgba.shape,
+                       "ms": (time.perf_counter() - t0) * 1000.0})
+        except Exception as e:
+            conn.send({"seq": request.get("seq"), "error": str(e)})
+    z = filled = out = None
+    for block in list(grids.values()) + list(outputs.values()):
+        block.close()
+
+
+class SurfaceRenderer:
+    """GUI-side handle of the render worker process."""
+
+    def __init__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self._grid_block = None
+        self._output_block = None
+        self._seq = 0
+        self._in_flight = None
+        self._waiting = None
+        # statistics
+        self.rendered = 0
+        self.replaced = 0
+        self.last_render_ms = 0.0
+
+    @property
+    def busy(self):
+        return self._in_flight is not None
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def submit(self, grid, width, height, dpi, elev, azim):
+        """Render a snapshot of `grid` at width x height pixels."""
+        request = {
+            "z": grid.z, "filled": grid.filled, "extent": grid.extent,
+            "width": int(width), "height": int(height), "dpi": float(dpi),
+            "elev": elev, "azim": azim,
+        }
+        if self._in_flight is not None:
+            # the worker is busy: keep only the newest snapshot
+            if self._waiting is not None:
+                self.replaced += 1
+            self._waiting = {**request, "z": grid.z.copy(), "filled": grid.filled.copy()}
+            return
+        self._send(request)
+
+    def poll(self):
+        """Return (request, rgba array) of a finished render, or None.
+
+        The array is a view of shared memory and only valid until the next
+        submit; copy it out before that.
+        """
+        if self._in_flight is None or not self._conn.poll():
+            return None
+        reply = self._conn.recv()
+        request, self._in_flight = self._in_flight, None
+        result = None
+        if "error" in reply:
+            print(f"SurfaceRenderer: render failed: {reply['error']}")
+        elif reply["seq"] == request["seq"]:
+            self.rendered += 1
+            self.last_render_ms = reply["ms"]
+            result = request, np.ndarray(
+                reply["shape"], dtype=np.uint8, buffer=self._output_block.buf
+            )
+        waiting, self._waiting = self._waiting, None
+        if waiting is not None:
+            if result is not None:
+                # hand out a copy, the next render reuses the buffer
+                result = result[0], result[1].copy()
+            self._send(waiting)
+        return result
+
+    def close(self):
+        try:
+            self._conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        for block in (self._grid_block, self._output_block):
+            if block is not None:
+                block.close()
+                block.unlink()
+        self._grid_block = self._output_block = None
+
+    def _send(self, request):
+        z, filled = request.pop("z"), request.pop("filled")
+        cells = z.size
+        self._grid_block = self._ensure_block(self._grid_block, cells * 3)
+        np.ndarray(z.shape, dtype=np.uint16, buffer=self._grid_block.buf)[:] = z
+        np.ndarray(z.shape, dtype=bool, buffer=self._grid_block.buf, offset=cells * 2)[:] = filled
+        self._output_block = self._ensure_block(
+            self._output_block, request["width"] * request["height"] * 4
+        )
+        self._seq += 1
+        request.update(
+            seq=self._seq, shape=z.shape,
+            grid=self._grid_block.name, output=self._output_block.name,
+        )
+        self._conn.send(request)
+        self._in_flight = request
+
+    @staticmethod
+    def _ensure_block(block, size):
+        if block is not None and block.size >= size:
+            return block
+        if block is not None:
+            block.close()
+            block.unlink()
+        return shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+
+_renderer = None
+
+
+def get_renderer():
+    """Shared render worker, started on first use; None if it cannot run."""
+    global _renderer
+    if _renderer is not None and not _renderer.alive():
+        _renderer = None
+    if _renderer is None:
+        try:
+            _renderer = SurfaceRenderer()
+        except Exception as e:
+            print(f"SurfaceRenderer: worker process not available: {e}")
+            return None
+        # stop the worker and free the shared memory on exit
+        atexit.register(shutdown)
+    return _renderer
+
+
+def shutdown():
+    global _renderer
+    if _renderer is not None:
+        _renderer.close()
+        _renderer = None
@@ -1,22 +1,41 @@
 """Terminal widget used by the app: a simple scrollable output area
 with an entry/combo for sending commands and basic history.
 
+Output is buffered: `update` may be called from any thread and only
+appends to a bounded ring buffer. The buffer is flushed on the Tk thread
+with one `Text.insert` per GUI frame, and the widget keeps at most
+`max_lines` lines by trimming from the top.
+
 Refactor: keep imports minimal and reuse helper methods where possible.
 """
 
 import os
+import threading
+from collections import deque
 from tkinter import (
     END,
     Button,
     Frame,
+    IntVar,
     Label,
     PhotoImage,
     Scrollbar,
+    StringVar,
     Text,
     Toplevel,
     ttk,
 )
 
+from terminal_filter import FILTER_TYPES, TerminalFilter
+
+# Labels of the filter modes in the filter dialog
+MODE_LABELS = {
+    "all": "All",
+    "nth": "Every Nth",
+    "summary": "Summary/s",
+    "hide": "Hide",
+}
+
 
 class _Tooltip:
     def __init__(self, widget, text):
@@ -60,10 +79,31 @@ class _Tooltip:
             self.tw = None
 
 
+# Default scrollback of the output area ([TERMINAL] max_lines)
+MAX_LINES = 2000
+
+
 class TerminalView:
-    def __init__(self, parent, write_command=None):
+    def __init__(
+        self,
+        parent,
+        write_command=None,
+        gui_pump=None,
+        max_lines=MAX_LINES,
+        terminal_filter=None,
+    ):
         self.parent = parent
         self.write_command = write_command
+        self._init_buffer(gui_pump, max_lines)
+        # Per-type display modes; the dispatcher consults it before formatting
+        if terminal_filter is None:
+            try:
+                terminal_filter = TerminalFilter.from_config()
+            except Exception as e:
+                print(f"TerminalView: terminal filter not loaded from config: {e}")
+                terminal_filter = TerminalFilter()
+        self.filter = terminal_filter
+        self.filter_window = None
 
         # Frame already provided as parent; create widgets inside
         self.terminal = Text(self.parent, height=15, width=30)
@@ -181,6 +221,81 @@ class TerminalView:
         except Exception:
             pass
 
+        # filter button on the left of the same row
+        self.filter_btn = Button(
+            self.parent, text="Filter", command=self.open_filter_dialog
+        )
+        self.filter_btn.grid(row=1, column=0, pady=10, sticky="w", padx=(6, 0))
+        try:
+            _Tooltip(self.filter_btn, "Show, thin out or hide message types")
+        except Exception:
+            pass
+
+    def _init_buffer(self, gui_pump, max_lines):
+        # Lines waiting for the next flush; older ones fall out when it is full
+        # because they would be trimmed from the widget right away anyway
+        self.max_lines = max(1, int(max_lines))
+        self.gui_pump = gui_pump
+        self._pending = deque(maxlen=self.max_lines)
+        self._flush_scheduled = False
+        self._line_count = 0
+        self.skipped = 0
+
+    def open_filter_dialog(self):
+        """Small window with a display mode per message type."""
+        try:
+            if self.filter_window is not None and self.filter_window.winfo_exists():
+                self.filter_window.lift()
+                return
+        except Exception:
+            pass
+        win = Toplevel(self.parent)
+        win.title("Terminal filter")
+        win.resizable(False, False)
+        self.filter_window = win
+        container = ttk.Frame(win, padding=12)
+        container.pack(fill="both", expand=True)
+        ttk.Label(container, text="Type").grid(row=0, column=0, sticky="w")
+        ttk.Label(container, text="Display").grid(row=0, column=1, sticky="w")
+        ttk.Label(container, text="N").grid(row=0, column=2, sticky="w")
+        labels = list(MODE_LABELS.values())
+        by_label = {v: k for k, v in MODE_LABELS.items()}
+
+        for row, msg_type in enumerate(FILTER_TYPES, start=1):
+            mode, n = self.filter.mode(msg_type)
+            mode_var = StringVar(win, value=MODE_LABELS[mode])
+            n_var = IntVar(win, value=n)
+
+            def apply(*_args, msg_type=msg_type, mode_var=mode_var, n_var=n_var):
+                try:
+                    n = max(1, int(n_var.get()))
+                except Exception:
+                    n = 1
+                self.filter.set_mode(msg_type, by_label[mode_var.get()], n)
+                try:
+                    self.filter.save()
+                except Exception as e:
+                    print(f"TerminalView: could not save terminal filter: {e}")
+
+            ttk.Label(container, text=msg_type).grid(
+                row=row, column=0, sticky="w", padx=(0, 8), pady=2
+            )
+            combo = ttk.Combobox(
+                container, textvariable=mode_var, values=labels, state="readonly", width=11
+            )
+            combo.grid(row=row, column=1, sticky="w", pady=2)
+            combo.bind("<<ComboboxSelected>>", apply)
+            spin = ttk.Spinbox(
+                container, from_=1, to=10000, textvariable=n_var, width=6, command=apply
+            )
+            spin.grid(row=row, column=2, sticky="w", padx=(8, 0), pady=2)
+            spin.bind("<Return>", apply)
+            spin.bind("<FocusOut>", apply)
+
+        ttk.Button(container, text="Close", command=win.destroy).grid(
+            row=len(FILTER_TYPES) + 1, column=0, columnspan=3, sticky="e", pady=(12, 0)
+        )
+
     def set_write_command(self, fn):
         self.write_command = fn
 
@@ -252,49 +367,35 @@ class TerminalView:
         return "break"
 
     def update(self, message):
+        """Queue `message` for display; safe to call from any thread."""
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.skipped += 1
+        pending.append(message)
         try:
-            # If the underlying widget was destroyed, skip update
-            if not getattr(self, "terminal", None):
-                return
-            try:
-                if not self.terminal.winfo_exists():
-                    return
-            except Exception:
-                pass
-
-            # Use after() when called from a background thread so Tk calls run on GUI thread.
-            try:
-                import threading
-
-                if threading.current_thread() is threading.main_thread():
-                    # main thread: update directly
-                    self._do_update(message)
-                else:
-                    # background thread: schedule on GUI event loop
-                    try:
-                        self.parent.after(0, lambda: self._do_update(message))
-                    except Exception:
-                        # last-resort: attempt direct update and fallback to printing
-                        try:
-                            self.terminal.insert(END, message + "\n")
-                            self.terminal.see(END)
-                        except Exception:
-                            print(message)
-            except Exception:
-                # If threading import fails or unexpected error, schedule via after when possible
-                try:
-                    self.parent.after(0, lambda: self._do_update(message))
-                except Exception:
-                    try:
-                        self.terminal.insert(END, message + "\n")
-                        self.terminal.see(END)
-                    except Exception:
-                        print(message)
+            if self.gui_pump is not None:
+                # flushed once at the end of the next GUI frame
+                self.gui_pump.request_redraw(self, self.flush)
+            elif threading.current_thread() is threading.main_thread():
+                self.flush()
+            elif not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.parent.after(0, self.flush)
         except Exception as e:
             print(f"TerminalView update error: {e}")
 
-    def _do_update(self, message):
-        """Perform the actual Text widget update. Must run on GUI thread."""
+    def flush(self):
+        """Write all queued lines with one insert. Must run on GUI thread."""
+        self._flush_scheduled = False
+        pending = self._pending
+        lines = []
+        try:
+            while True:
+                lines.append(pending.popleft())
+        except IndexError:
+            pass
+        if not lines:
+            return
         try:
             if not getattr(self, "terminal", None):
                 return
@@ -303,11 +404,18 @@ class TerminalView:
                     return
             except Exception:
                 pass
-            self.terminal.insert(END, message + "\n")
+            text = "\n".join(lines) + "\n"
+            self.terminal.insert(END, text)
+            self._line_count += text.count("\n")
+            excess = self._line_count - self.max_lines
+            if excess > 0:
+                # trim the oldest lines from the top
+                self.terminal.delete("1.0", f"{excess + 1}.0")
+                self._line_count = self.max_lines
             self.terminal.see(END)
         except Exception as e:
             # Avoid noisy Tcl errors when the widget was destroyed concurrently
-            print(f"TerminalView _do_update error: {e}")
+            print(f"TerminalView flush error: {e}")
 
     def clear(self):
         try:
@@ -319,6 +427,8 @@ class TerminalView:
             except Exception:
                 pass
             self.terminal.delete(1.0, END)
+            self._pending.clear()
+            self._line_count = 0
         except Exception as e:
             print(f"TerminalView clear error: {e}")
 
@@ -0,0 +1,154 @@
+"""Per-message-type display filter for the terminal.
+
+High-rate streams (TUNNEL, ADJUST) flood the terminal with lines nobody
+reads. Each message type has a display mode:
+
+    all      show every line
+    nth      show every Nth line
+    summary  one line per second with the line count and the last line
+    hide     show nothing
+
+The dispatcher asks the filter *before* formatting a line, so filtered
+lines cost a counter update and nothing else. Modes are persisted in the
+[TERMINAL] section of config.ini as `filter_<type> = all|nth:N|summary|hide`.
+"""
+
+import threading
+import time
+
+import config_utils
+
+MODES = ("all", "nth", "summary", "hide")
+# Types offered in the terminal's filter dialog; all others are always shown
+FILTER_TYPES = ("TUNNEL", "ADJUST", "DATA", "PARAMETER")
+DEFAULT_N = 10
+SUMMARY_PERIOD_S = 1.0
+
+_ALL = slice(None)
+_NONE = slice(0, 0)
+
+
+def parse_mode(text):
+    """Parse 'all', 'hide', 'summary' or 'nth:N' into (mode, n)."""
+    mode, _, n = str(text).strip().lower().partition(":")
+    if mode not in MODES:
+        return "all", DEFAULT_N
+    try:
+        n = max(1, int(n)) if n else DEFAULT_N
+    except ValueError:
+        n = DEFAULT_N
+    return mode, n
+
+
+def format_mode(mode, n=DEFAULT_N):
+    return f"nth:{n}" if mode == "nth" else mode
+
+
+class TerminalFilter:
+    """Decide which lines of each message type reach the terminal."""
+
+    def __init__(self, modes=None, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._modes = {}
+        # per type: lines seen (nth) and the open summary window [start, count, last]
+        self._seen = {}
+        self._window = {}
+        self.hidden = 0
+        for msg_type, (mode, n) in (modes or {}).items():
+            self.set_mode(msg_type, mode, n)
+
+    @classmethod
+    def from_config(cls):
+        modes = {}
+        for msg_type in FILTER_TYPES:
+            text = config_utils.get_config("TERMINAL", f"filter_{msg_type.lower()}", "all")
+            modes[msg_type] = parse_mode(text)
+        return cls(modes)
+
+    def save(self):
+        """Persist the modes of FILTER_TYPES to config.ini."""
+        for msg_type in FILTER_TYPES:
+            mode, n = self.mode(msg_type)
+            config_utils.set_config(
+                "TERMINAL", f"filter_{msg_type.lower()}", format_mode(mode, n)
+            )
+
+    def mode(self, msg_type):
+        return self._modes.get(msg_type, ("all", DEFAULT_N))
+
+    def set_mode(self, msg_type, mode, n=DEFAULT_N):
+        if mode not in MODES:
+            raise ValueError(f"unknown terminal filter mode {mode!r}")
+        with self._lock:
+            if mode == "all":
+                self._modes.pop(msg_type, None)
+            else:
+                self._modes[msg_type] = (mode, max(1, int(n)))
+            self._seen[msg_type] = 0
+            self._window.pop(msg_type, None)
+
+    def take(self, msg_type, count, last=None):
+        """Account for `count` new lines of `msg_type`.
+
+        Returns (selection, summary): `selection` is a slice of the new
+        lines to display (applies to lists and NumPy arrays alike) and
+        `summary` a summary line to display first, or None.
+        `last` is the newest raw line, used for summaries.
+        """
+        entry = self._modes.get(msg_type)
+        if entry is None:
+            return _ALL, None
+        mode, n = entry
+        if mode == "hide":
+            self.hidden += count
+            return _NONE, None
+        if mode == "nth":
+            with self._lock:
+                seen = self._seen.get(msg_type, 0)
+                self._seen[msg_type] = seen + count
+            self.hidden += count - len(range(count)[(-seen) % n :: n])
+            return slice((-seen) % n, None, n), None
+        # summary
+        self.hidden += count
+        now = self.clock()
+        with self._lock:
+            window = self._window.get(msg_type)
+            if window is None:
+                self._window[msg_type] = [now, count, last]
+                return _NONE, None
+            window[1] += count
+            if last is not None:
+                window[2] = last
+            if now - window[0] < SUMMARY_PERIOD_S:
+                return _NONE, None
+            del self._window[msg_type]
+        return _NONE, self._summary(msg_type, window, now)
+
+    def lines(self, msg_type, lines):
+        """Return the raw `lines` to display, with a summary line if due."""
+        selection, summary = self.take(msg_type, len(lines), lines[-1] if lines else None)
+        shown = lines[selection]
+        return [summary] + shown if summary else shown
+
+    def finish(self, msg_type):
+        """Close an open summary window (e.g. on DONE); returns its line or None."""
+        with self._lock:
+            window = self._window.pop(msg_type, None)
+        if window is None:
+            return None
+        return self._summary(msg_type, window, self.clock())
+
+    def finish_all(self):
+        """Close all open summary windows (e.g. when the device is idle)."""
+        with self._lock:
+            windows, self._window = self._window, {}
+        now = self.clock()
+        return [self._summary(t, w, now) for t, w in windows.items()]
+
+    @staticmethod
+    def _summary(msg_type, window, now):
+        start, count, last = window
+        elapsed = max(now - start, 1e-3)
+        text = f"{msg_type}: {count} lines in {elapsed:.1f} s"
+        return f"{text}, last {last}" if last else text
@@ -3,16 +3,51 @@
 This module provides `TunnelApp`, a small UI that requests tunnel
 measurements from the device and displays ADC/DAC-Z data in a matplotlib
 scatter plot.
+
+The tunnel loop runs in cycles: `TUNNEL,n` is sent, n points arrive,
+`TUNNEL,DONE` ends the cycle and after `RESTART_DELAY_MS` the next one
+starts. The figure, its canvas and the plot artists are created once per
+pane; a new cycle only resets the data and sends the command again.
+
+The points of a cycle are kept in NumPy arrays and the plot is refreshed
+while they stream in: the ADC markers (one artist per flag, green within
+and red out of limits) and the DAC Z markers are animated `Line2D`
+artists whose data are set from the arrays and blitted over a cached
+background (axes, labels, limit lines). Only a resize or a new
+pane redraws the whole figure.
+
+Rolling mode ([TUNNEL] mode = rolling, or the Rolling view button) is a
+continuous monitor: the last `rolling_samples` samples are kept in a
+`SampleRing` across cycles, the plot scrolls with the newest sample at
+x = 0, and the next `TUNNEL,n` is sent as soon as `TUNNEL,DONE` arrives
+instead of after the restart delay. Its redraws go through a
+`RedrawScheduler` (`rolling_redraw_ms`), as every frame redraws the
+whole window of samples.
+
+A side panel shows the statistics of the current cycle and since the pane
+was opened (`TunnelStats`, updated per batch), and with "Export stats"
+checked one row per finished cycle is appended to
+`measurements/tunnel_stats_<date>.csv` ([TUNNEL] stats_export).
 """
 
-from tkinter import Button, Frame
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import os
+from datetime import datetime
+from tkinter import BooleanVar, Button, Checkbutton, Frame, Label
+import numpy as np
 
 import config_utils
+from gui.figure_pool import FigurePool
+from gui.redraw_scheduler import RedrawScheduler
+from sample_ring import SampleRing
+from tunnel_stats import StatsCsvWriter, TunnelStats, format_panel
 
 
 class TunnelApp:
+    # pause between TUNNEL,DONE and the next cycle
+    RESTART_DELAY_MS = 500
+    # pixels around the axes included in the blitted region
+    BLIT_PAD = 3
+
     def __init__(
         self,
         master,
@@ -21,6 +56,9 @@ class TunnelApp:
         target_adc,
         tolerance_adc,
         simulate=False,
+        gui_pump=None,
+        figure_pool=None,
+        adc_limits=None,
     ):
 
         # Initialize TunnelApp with callbacks and settings
@@ -30,7 +68,12 @@ class TunnelApp:
         self.is_active = True
         self.target_adc = target_adc
         self.tolerance_adc = tolerance_adc
+        # optional callable returning the current (target_adc, tolerance_adc);
+        # re-read before every cycle so set-point changes reach the plot
+        self.adc_limits = adc_limits
         self.simulate = simulate
+        # optional GuiPump; redraws then happen at most once per frame
+        self.gui_pump = gui_pump
 
         # Create a frame to hold the widgets
         self.frame = Frame(master)
@@ -52,9 +95,19 @@ class TunnelApp:
         )
         self.btn_freeze.grid(row=0, column=1, padx=10, pady=10, sticky="e")
 
+        # Switch between one cycle per plot and the rolling monitor
+        self.btn_mode = Button(
+            self.button_frame, text="Rolling view", command=self.toggle_mode
+        )
+        self.btn_mode.grid(row=0, column=2, padx=10, pady=10, sticky="e")
+
         # Initialize the freeze state
         self.is_frozen = False
         self.after_id = None
+        # set once the pane is being closed: no further TUNNEL commands
+        self.closing = False
+        # completed TUNNEL cycles since the pane was opened
+        self.cycles = 0
 
         # Bind the Escape key globally to the wrapper_return_to_main method
         try:
@@ -73,16 +126,67 @@ class TunnelApp:
         self.tunnel_counts = float(
             config_utils.get_config("TUNNEL", "tunnelcounts", 200)
         )
-        self.fig, self.ax = plt.subplots()
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.frame)
-        self.canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+        # Rolling monitor: window size and redraw interval
+        try:
+            self.rolling_samples = int(
+                config_utils.get_config("TUNNEL", "rolling_samples", 2000)
+            )
+        except (TypeError, ValueError):
+            self.rolling_samples = 2000
+        try:
+            interval_ms = float(
+                config_utils.get_config("TUNNEL", "rolling_redraw_ms", 50)
+            )
+        except (TypeError, ValueError):
+            interval_ms = 50.0
+        self.redraw_scheduler = RedrawScheduler(self.frame, self.redraw_plot, interval_ms)
+        self.ring = None
+        self.rolling = False
+        mode = str(config_utils.get_config("TUNNEL", "mode", "cycle")).strip().lower()
+        if mode == "rolling":
+            self.ring = SampleRing(self.rolling_samples)
+            self.rolling = True
+            self.btn_mode.config(text="Cycle view")
 
-        # Initialize data lists
-        self.adc_data = []
-        self.z_data = []
-        self.colors = []
+        # Statistics side panel, packed before the canvas so the plot
+        # takes the remaining space
+        self._init_stats()
+        self.stats_frame = Frame(self.frame)
+        self.stats_frame.pack(side="right", fill="y", padx=(0, 10))
+        self.stats_label = Label(
+            self.stats_frame, font="TkFixedFont", justify="left", anchor="nw"
+        )
+        self.stats_label.pack(anchor="nw")
+        export = str(
+            config_utils.get_config("TUNNEL", "stats_export", "false")
+        ).strip().lower() in ("1", "true", "yes", "on")
+        self.export_var = BooleanVar(master=self.frame, value=export)
+        Checkbutton(
+            self.stats_frame,
+            text="Export stats",
+            variable=self.export_var,
+            command=self._on_export_toggled,
+        ).pack(anchor="w", pady=(6, 0))
+        if export:
+            self.start_stats_export()
+
+        # Figure and canvas come from the pool (no pyplot), reused across opens
+        self.figure_pool = figure_pool if figure_pool is not None else FigurePool(self.frame)
+        self.fig, self.canvas = self.figure_pool.acquire("tunnel", self.frame)
+        self.ax = self.fig.add_subplot(111)
+        self._init_plot_elements()
+
+        # Cancel a pending restart when the pane is torn down
+        self.frame.bind("<Destroy>", lambda event: self._on_destroy(), add="+")
+
+        # Initialize the data arrays
+        self.clear_plot_data()
 
         # Start the measurement process with the read tunnelcounts value
+        self.send_tunnel_command()
+
+    def send_tunnel_command(self):
+        """Request one cycle of `tunnel_counts` points from the device."""
         cmd = (
             f"TUNNEL SIMULATE,{int(abs(self.tunnel_counts))}"
             if self.simulate
@@ -96,18 +200,91 @@ class TunnelApp:
         except Exception as e:
             print(f"TunnelApp: error sending command '{cmd}': {e}")
 
-    def update_adc_limits(self, target_adc, limit_adc):
+    def _init_stats(self):
+        """Statistics of the current cycle and since the pane was opened."""
+        self.cycle_stats = TunnelStats(self.target_adc, self.tolerance_adc)
+        self.session_stats = TunnelStats(self.target_adc, self.tolerance_adc)
+        self.stats_writer = None
+        self.stats_label = None
+
+    def start_stats_export(self):
+        """Append one row per finished cycle to measurements/tunnel_stats_<ts>.csv."""
+        if self.stats_writer is not None:
+            return
+        folder = os.path.join(os.getcwd(), "measurements")
+        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(folder, f"tunnel_stats_{ts}.csv")
+        try:
+            os.makedirs(folder, exist_ok=True)
+            self.stats_writer = StatsCsvWriter(path)
+            print(f"TunnelApp: exporting cycle statistics to {path}")
+        except Exception as e:
+            print(f"TunnelApp: could not open statistics file {path}: {e}")
+            self.stats_writer = None
+
+    def stop_stats_export(self):
+        if self.stats_writer is not None:
+            try:
+                self.stats_writer.close()
+            except Exception as e:
+                print(f"TunnelApp: error closing statistics file: {e}")
+            self.stats_writer = None
+
+    def _on_export_toggled(self):
+        if self.export_var.get():
+            self.start_stats_export()
+        else:
+            self.stop_stats_export()
+
+    def _update_stats_panel(self):
+        if self.stats_label is None:
+            return
+        try:
+            self.stats_label.config(text=format_panel(self.cycle_stats, self.session_stats))
+        except Exception:
+            pass
+
+    def update_adc_limits(self, target_adc, tolerance_adc):
+        """Move the limit lines and restart the statistics for new limits."""
         self.target_adc = target_adc
-        self.limit_adc = limit_adc
+        self.tolerance_adc = tolerance_adc
+        self.limit_hi_line.set_ydata([target_adc + tolerance_adc] * 2)
+        self.limit_lo_line.set_ydata([target_adc - tolerance_adc] * 2)
+        # the histogram bins follow the limits: counts of the old bins
+        # cannot be carried over
+        self.cycle_stats = TunnelStats(target_adc, tolerance_adc)
+        self.session_stats = TunnelStats(target_adc, tolerance_adc)
+        # the limit lines are part of the background
+        self._background = None
 
-    def _init_plot_elements(self):
-        """(Re)create the basic plot elements (plots and limit lines).
+    def _refresh_adc_limits(self):
+        """Pick up a changed set-point or tolerance before the next cycle."""
+        if self.adc_limits is None:
+            return
+        try:
+            target_adc, tolerance_adc = self.adc_limits()
+        except Exception as e:
+            print(f"TunnelApp: could not read the ADC limits: {e}")
+            return
+        if (target_adc, tolerance_adc) != (self.target_adc, self.tolerance_adc):
+            print(f"TunnelApp: ADC limits changed to {target_adc} +- {tolerance_adc}")
+            self.update_adc_limits(target_adc, tolerance_adc)
 
-        This is safe to call after clearing the axes.
-        """
-        # create empty plots for adc and z
-        (self.adc_plot,) = self.ax.plot([], [], "o", label="Tunnel")
-        (self.z_plot,) = self.ax.plot([], [], "x", label="DAC Z")
+    def _init_plot_elements(self):
+        """Create the plot artists once; cycles only update their data."""
+        # ADC points by flag (1 within, 0 out of limits), DAC Z as black
+        # crosses; animated: left out of full draws and blitted over the
+        # background (_on_draw). Marker lines draw much faster than a
+        # scatter with one color per point.
+        (self.adc_in_plot,) = self.ax.plot(
+            [], [], "o", color="green", linestyle="none", label="Tunnel", animated=True
+        )
+        (self.adc_out_plot,) = self.ax.plot(
+            [], [], "o", color="red", linestyle="none", label="Out of limits", animated=True
+        )
+        (self.z_plot,) = self.ax.plot(
+            [], [], "x", color="black", linestyle="none", label="DAC Z", animated=True
+        )
         # create horizontal limit lines
         self.limit_hi_line = self.ax.axhline(
             y=self.target_adc + self.tolerance_adc,
@@ -122,9 +299,56 @@ class TunnelApp:
             label="Limit Lo",
         )
 
+        # Axes and labels do not change between cycles
+        self._setup_x_axis()
+        self.ax.set_ylim(-1000, 0xFFFF)  # Set y-axis limit to int16_t range
+        self.ax.set_ylabel("ADC and DAC Z")
+        self.ax.set_title("Tunnel Current ADC and DAC Z")
+        self.ax.legend()
+        self.fig.subplots_adjust(left=0.2, right=0.95, top=0.9, bottom=0.1)
+
+        # Everything but the points, saved after each full draw, and the
+        # same with the first `_drawn` points of the cycle on it
+        self._background = None
+        self._points_background = None
+        self._drawn = 0
+        self.figure_pool.connect(self.canvas, "draw_event", self._on_draw)
+
+    def _setup_x_axis(self):
+        if self.rolling:
+            # newest sample at 0, older ones to the left
+            self.ax.set_xlim(-self.ring.capacity, 0)
+            self.ax.set_xlabel("Samples (0 = newest)")
+            self._ring_x = np.arange(1 - self.ring.capacity, 1, dtype=float)
+        else:
+            self.ax.set_xlim(0, self.tunnel_counts)
+            self.ax.set_xlabel("Counter")
+
+    def toggle_mode(self):
+        self.set_rolling(not self.rolling)
+
+    def set_rolling(self, rolling):
+        """Switch between cycle plots and the rolling monitor."""
+        if rolling == self.rolling:
+            return
+        if rolling and self.ring is None:
+            self.ring = SampleRing(self.rolling_samples)
+        self.rolling = rolling
+        try:
+            self.btn_mode.config(text="Cycle view" if rolling else "Rolling view")
+        except Exception:
+            pass
+        self.redraw_scheduler.cancel()
+        self._setup_x_axis()
+        # new axis limits: the next redraw is a full one
+        self._background = None
+        self.request_redraw()
+
     def wrapper_return_to_main(self):
         # Set is_active to False and return to the main interface
+        self.closing = True
         self.is_active = False
+        self._cancel_restart()
         # Unbind the Escape handler to avoid leaking handlers
         try:
             toplevel = self.frame.winfo_toplevel()
@@ -137,32 +361,75 @@ class TunnelApp:
         self.return_to_main()
 
     def restart(self):
+        """Start the next cycle on the existing figure and artists."""
+        self.after_id = None
+        if self.closing:
+            # STOP was sent; a late TUNNEL,DONE must not start tunneling again
+            return
+        self._refresh_adc_limits()
         # Clear the plot data
         self.clear_plot_data()
-        # Restart the TunnelApp
-        # Destroy existing UI and recreate the TunnelApp instance in-place.
-        try:
-            self.frame.destroy()
-        except Exception:
-            pass
-        try:
-            # Re-initialize the object safely; write_command may be None.
-            self.__init__(
-                self.master,
-                self.write_command,
-                self.return_to_main,
-                self.target_adc,
-                self.tolerance_adc,
-                self.simulate,
-            )
-        except Exception as e:
-            print(f"TunnelApp.restart: failed to reinitialize TunnelApp: {e}")
+        self.is_active = True
+        self.send_tunnel_command()
+
+    def _cancel_restart(self):
+        if self.after_id is not None:
+            try:
+                self.master.after_cancel(self.after_id)
+            except Exception:
+                pass
+            self.after_id = None
+
+    def _on_destroy(self):
+        # the pane was closed or replaced: no further cycles
+        self.closing = True
+        self.is_active = False
+        self._cancel_restart()
+        self.redraw_scheduler.cancel()
+        self.stop_stats_export()
 
     def clear_plot_data(self):
-        # Clear the plot data
-        self.adc_data = []
-        self.z_data = []
-        self.colors = []
+        """Empty the point arrays (sized for one cycle) for the next cycle."""
+        self.count = 0
+        self.cycle_stats.reset()
+        # the cached points image belongs to the previous cycle; a new cycle
+        # that arrives in a few large batches can reach the old `_drawn`
+        # before the first frame, so the count alone cannot tell
+        self._points_background = None
+        self._drawn = 0
+        capacity = max(1, int(abs(self.tunnel_counts)))
+        if getattr(self, "adc", None) is None or len(self.adc) != capacity:
+            self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """(Re)allocate the point arrays, keeping the points of this cycle."""
+        n = self.count
+        flags = np.zeros(capacity, dtype=np.uint8)
+        adc = np.zeros(capacity, dtype=np.int16)
+        z = np.zeros(capacity, dtype=np.uint16)
+        if n:
+            flags[:n] = self.flags[:n]
+            adc[:n] = self.adc[:n]
+            z[:n] = self.z[:n]
+        self.flags, self.adc, self.z = flags, adc, z
+        # x positions (point counter) shared by both artists
+        self._x = np.arange(capacity, dtype=float)
+
+    def _append(self, flags, adc, z):
+        """Append points; the arrays grow if a cycle sends more than asked for."""
+        n = len(flags)
+        end = self.count + n
+        if end > len(self.adc):
+            self._allocate(max(end, 2 * len(self.adc)))
+        self.flags[self.count:end] = flags
+        self.adc[self.count:end] = adc
+        self.z[self.count:end] = z
+        self.count = end
+        # O(1) per sample, never recomputed from the history
+        self.cycle_stats.update(flags, adc, z)
+        self.session_stats.update(flags, adc, z)
+        if self.ring is not None:
+            self.ring.extend(flags, adc, z)
 
     def toggle_freeze(self):
         # Toggle the freeze state
@@ -171,9 +438,7 @@ class TunnelApp:
         if self.is_frozen:
             self.btn_freeze.config(text="Run cycle")
             # Cancel the scheduled restart if it exists
-            if self.after_id is not None:
-                self.master.after_cancel(self.after_id)
-                self.after_id = None  # Reset the after_id
+            self._cancel_restart()
             # Show the "STOP - ESC" button when the loop is stopped
             self.btn_back.grid()
         else:
@@ -183,42 +448,45 @@ class TunnelApp:
             # Restart the loop when unfreezing
             self.restart()
 
-    def update_data(self, message):
-        if not hasattr(self, "adc_plot"):
-            # Initialize plot elements
-            self._init_plot_elements()
+    def update_batch(self, lines, parsed):
+        """Router entry point for a run of TUNNEL lines.
 
+        parsed: (records, other_lines) from `packet_parser.parse_tunnel_lines`;
+        the ADC values in `records` are already signed.
+        """
+        records, others = parsed
+        if len(records):
+            flags = records["flag"]
+            # flag 1: within limits, flag 0: out of limits, anything else is ignored
+            keep = (flags == 0) | (flags == 1)
+            if keep.all():
+                self._append(flags, records["adc"], records["z"])
+            else:
+                self._append(flags[keep], records["adc"][keep], records["z"][keep])
+        if "TUNNEL,DONE" in others:
+            self._on_cycle_done()
+        elif len(records):
+            # live refresh while the cycle streams in
+            self.request_redraw()
+
+    def update_data(self, message):
         # Update the plot with new data
         data = message.split(",")
         try:
             if data[0] == "TUNNEL":
                 if len(data) >= 2 and data[1] == "DONE":
-                    # End of data reached
-                    self.redraw_plot()
-                    self.is_active = False  # Stop the tunnel loop
-
-                    # Wait for 500ms, then restart the tunnel loop if not frozen
-                    if not self.is_frozen:  # Check if the loop is frozen
-                        print("Restarting tunnel loop...")  # Debugging
-                        self.after_id = self.master.after(500, self.restart)
-                    else:
-                        print("Tunnel loop is frozen. Restart skipped.")  # Debugging
-                        # Show the "STOP - ESC" button only when the loop is stopped
-                        self.btn_back.grid()
-                        self.btn_freeze.config(text="Run Cycle")
+                    self._on_cycle_done()
                     return True
 
                 elif len(data) >= 4:
                     flag, adc, z = int(data[1]), int(data[2]), int(data[3])
+                    if adc > 0x7FFF:  # ADC is sent as unsigned int16
+                        adc -= 0x10000
 
-                    if flag == 0:  # Data out of limits
-                        self.adc_data.append(adc)
-                        self.z_data.append(z)
-                        self.colors.append("red")
-                    elif flag == 1:  # Data within limits
-                        self.adc_data.append(adc)
-                        self.z_data.append(z)
-                        self.colors.append("green")
+                    # 0: data out of limits, 1: data within limits
+                    if flag in (0, 1):
+                        self._append((flag,), (adc,), (z,))
+                        self.request_redraw()
                 else:
                     return False
             else:
@@ -227,36 +495,110 @@ class TunnelApp:
             print(f"Error: {e}, \n{message}")
             return False
 
+    def _on_cycle_done(self):
+        # End of data reached
+        if self.closing:
+            # return_to_main waits for IDLE while the GUI pump still runs
+            self.is_active = False
+            return
+        self.cycles += 1
+        if self.stats_writer is not None:
+            try:
+                self.stats_writer.write(self.cycles, self.cycle_stats)
+            except Exception as e:
+                print(f"TunnelApp: error writing cycle statistics: {e}")
+        self.request_redraw()
+        self.is_active = False  # Stop the tunnel loop
+
+        # Wait for 500ms, then restart the tunnel loop if not frozen
+        if not self.is_frozen:  # Check if the loop is frozen
+            self._cancel_restart()
+            if self.rolling:
+                # no pause in the monitor: request the next cycle right away
+                self.restart()
+            else:
+                self.after_id = self.master.after(self.RESTART_DELAY_MS, self.restart)
+        else:
+            print("Tunnel loop is frozen. Restart skipped.")  # Debugging
+            # Show the "STOP - ESC" button only when the loop is stopped
+            self.btn_back.grid()
+            self.btn_freeze.config(text="Run Cycle")
+
+    def request_redraw(self):
+        """Redraw now, or once at the end of the GUI pump frame.
+
+        The rolling monitor redraws at most once per `rolling_redraw_ms`.
+        """
+        if self.rolling:
+            self.redraw_scheduler.request()
+        elif self.gui_pump is not None:
+            self.gui_pump.request_redraw(self, self.redraw_plot)
+        else:
+            self.redraw_plot()
+
     def redraw_plot(self):
-        # Clear the plot and redraw from stored data
-        self.ax.clear()
-        # recreate plot elements
-        self._init_plot_elements()
+        """Show the points of this cycle.
 
-        # scatter adc and z data
-        self.ax.scatter(
-            range(len(self.adc_data)),
-            self.adc_data,
-            c=self.colors,
-            marker="o",
-            label="Tunnel",
-        )
-        self.ax.scatter(
-            range(len(self.z_data)),
-            self.z_data,
-            c="black",
-            marker="x",
-            label="DAC Z",
+        Points are only appended during a cycle, so the image with the
+        points drawn so far is kept and each frame only draws the new ones
+        on it; the cost of a frame depends on the batch, not on the cycle.
+        """
+        self._update_stats_panel()
+        n = self.count
+        if self._background is None:
+            # full draw; _on_draw saves the background and adds the points
+            self.canvas.draw()
+            return
+        if self.rolling:
+            # the window scrolls: all samples move on every frame
+            self.canvas.restore_region(self._background)
+            self._draw_ring()
+            self.canvas.blit(self._blit_box)
+            return
+        if self._points_background is None:
+            # new cycle: start again from the empty plot
+            self.canvas.restore_region(self._background)
+            start = 0
+        else:
+            self.canvas.restore_region(self._points_background)
+            start = self._drawn
+        self._draw_points(start, n)
+        self._points_background = self.canvas.copy_from_bbox(self._blit_box)
+        self._drawn = n
+        self.canvas.blit(self._blit_box)
+
+    def _on_draw(self, event):
+        """After a full draw: save the background, then draw the points on it."""
+        # markers at the edge overhang the axes by a pixel; a region padded
+        # beyond the spines restores those pixels as well
+        self._blit_box = self.ax.bbox.padded(self.BLIT_PAD)
+        self._background = self.canvas.copy_from_bbox(self._blit_box)
+        if self.rolling:
+            self._points_background = None
+            self._draw_ring()
+            return
+        self._draw_points(0, self.count)
+        self._points_background = self.canvas.copy_from_bbox(self._blit_box)
+        self._drawn = self.count
+
+    def _draw_points(self, start, end):
+        """Draw points start..end-1 of this cycle."""
+        self._draw_samples(
+            self._x[start:end], self.flags[start:end], self.adc[start:end], self.z[start:end]
         )
 
-        # Adjust axes and labels
-        self.ax.set_xlim(0, self.tunnel_counts)
-        self.ax.set_ylim(-1000, 0xFFFF)  # Set y-axis limit to int16_t range
-        self.ax.set_xlabel("Counter")
-        self.ax.set_ylabel("ADC and DAC Z")
-        self.ax.set_title("Tunnel Current ADC and DAC Z")
-        self.ax.legend()
+    def _draw_ring(self):
+        """Draw the rolling window, newest sample at x = 0."""
+        samples = self.ring.ordered()
+        x = self._ring_x[len(self._ring_x) - len(samples):]
+        self._draw_samples(x, samples["flag"], samples["adc"], samples["z"])
 
-        # Adjust margins and redraw
-        self.fig.subplots_adjust(left=0.2, right=0.95, top=0.9, bottom=0.1)
-        self.canvas.draw()
+    def _draw_samples(self, x, flags, adc, z):
+        """Draw samples with the persistent artists."""
+        inside = flags == 1
+        self.adc_in_plot.set_data(x[inside], adc[inside])
+        self.adc_out_plot.set_data(x[~inside], adc[~inside])
+        self.z_plot.set_data(x, z)
+        self.ax.draw_artist(self.adc_in_plot)
+        self.ax.draw_artist(self.adc_out_plot)
+        self.ax.draw_artist(self.z_plot)
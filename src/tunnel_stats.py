@@ -0,0 +1,203 @@
+"""Incremental statistics of tunnel samples.
+
+`TunnelStats` is updated with each batch of `(flag, adc, z)` samples and
+never looks at earlier samples again:
+
+- in-limit ratio from the `flag` field (1 = within limits),
+- running mean and variance of ADC and DAC Z (Welford; a batch is merged
+  with Chan's parallel update, so the cost is O(1) per sample),
+- min/max of both,
+- an ADC histogram with fixed bins over target_adc +- 2 * tolerance_adc
+  (plus one bin below and one above that range), so the limits at
+  target +- tolerance fall on bin edges.
+
+`StatsCsvWriter` appends one row per finished cycle to a CSV file. Each
+row carries the target and tolerance it was counted against; the bins
+are numbered (hist_0 is the lowest bin of the range), so the columns stay
+the same when the limits change.
+"""
+
+import csv
+import math
+import time
+
+import numpy as np
+
+# Bins between target - 2 * tolerance and target + 2 * tolerance
+HISTOGRAM_BINS = 8
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of numbers."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values):
+        """Merge a batch (array or sequence) into the running values."""
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        if not n:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+        low, high = float(values.min()), float(values.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    @property
+    def variance(self):
+        """Sample variance (0 for fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class TunnelStats:
+    def __init__(self, target_adc, tolerance_adc, bins=HISTOGRAM_BINS):
+        self.target_adc = int(target_adc)
+        # a zero tolerance (limits not set yet) still gets usable bins
+        tolerance = max(1, abs(int(tolerance_adc)))
+        self.tolerance_adc = tolerance
+        self.bins = max(2, int(bins))
+        self.low = self.target_adc - 2 * tolerance
+        self.bin_width = 4.0 * tolerance / self.bins
+        self.adc = RunningStats()
+        self.z = RunningStats()
+        # [below range, bins..., above range]
+        self.histogram = np.zeros(self.bins + 2, dtype=np.int64)
+        self.in_limit = 0
+
+    @property
+    def count(self):
+        return self.adc.count
+
+    @property
+    def in_limit_ratio(self):
+        return self.in_limit / self.count if self.count else 0.0
+
+    def reset(self):
+        self.adc.reset()
+        self.z.reset()
+        self.histogram[:] = 0
+        self.in_limit = 0
+
+    def edges(self):
+        """Bin edges of the histogram range (len bins + 1)."""
+        return self.low + self.bin_width * np.arange(self.bins + 1)
+
+    def update(self, flags, adc, z):
+        """Add a batch of samples (arrays of equal length)."""
+        flags = np.asarray(flags)
+        if not len(flags):
+            return
+        adc = np.asarray(adc, dtype=float)
+        self.in_limit += int(np.count_nonzero(flags == 1))
+        self.adc.update(adc)
+        self.z.update(z)
+        index = np.floor((adc - self.low) / self.bin_width).astype(np.int64) + 1
+        np.clip(index, 0, self.bins + 1, out=index)
+        self.histogram += np.bincount(index, minlength=self.bins + 2)
+
+    def as_dict(self):
+        """Flat dict of the current values (one CSV row)."""
+        row = {
+            "target_adc": self.target_adc,
+            "tolerance_adc": self.tolerance_adc,
+            "samples": self.count,
+            "in_limit": self.in_limit,
+            "in_limit_ratio": round(self.in_limit_ratio, 4),
+        }
+        for name, stats in (("adc", self.adc), ("z", self.z)):
+            row[f"{name}_mean"] = round(stats.mean, 2)
+            row[f"{name}_std"] = round(stats.std, 2)
+            row[f"{name}_min"] = stats.min
+            row[f"{name}_max"] = stats.max
+        row["hist_below"] = int(self.histogram[0])
+        for i in range(self.bins):
+            row[f"hist_{i}"] = int(self.histogram[i + 1])
+        row["hist_above"] = int(self.histogram[-1])
+        return row
+
+
+class StatsCsvWriter:
+    """Appends one row of `TunnelStats.as_dict()` per cycle to a CSV file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = None
+        self.rows = 0
+
+    def write(self, cycle, stats):
+        row = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "cycle": cycle}
+        row.update(stats.as_dict())
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(row))
+            if self._file.tell() == 0:
+                self._writer.writeheader()
+        self._writer.writerow(row)
+        # one row per cycle: keep the file current
+        self._file.flush()
+        self.rows += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def _value(stats, attr, fmt):
+    if not stats.count:
+        return "-"
+    value = getattr(stats, attr)
+    return "-" if value is None else format(value, fmt)
+
+
+def format_panel(cycle, total, bar_width=16):
+    """Text of the tunnel statistics panel: current cycle and since opening."""
+    rows = [
+        f"{'':<11}{'cycle':>9}{'total':>10}",
+        f"{'Samples':<11}{cycle.count:>9}{total.count:>10}",
+        f"{'In limits':<11}{cycle.in_limit_ratio * 100:>8.1f}%{total.in_limit_ratio * 100:>9.1f}%",
+    ]
+    for label, name in (("ADC", "adc"), ("DAC Z", "z")):
+        a, b = getattr(cycle, name), getattr(total, name)
+        rows.append(f"{label + ' mean':<11}{_value(a, 'mean', '.1f'):>9}{_value(b, 'mean', '.1f'):>10}")
+        rows.append(f"{label + ' std':<11}{_value(a, 'std', '.1f'):>9}{_value(b, 'std', '.1f'):>10}")
+        rows.append(f"{label + ' min':<11}{_value(a, 'min', '.0f'):>9}{_value(b, 'min', '.0f'):>10}")
+        rows.append(f"{label + ' max':<11}{_value(a, 'max', '.0f'):>9}{_value(b, 'max', '.0f'):>10}")
+
+    # histogram since opening; * marks the bins within target +- tolerance
+    rows.append("")
+    rows.append("ADC histogram (total)")
+    edges = total.edges()
+    counts = total.histogram
+    peak = max(1, int(counts.max()))
+    limit_lo = total.target_adc - total.tolerance_adc
+    limit_hi = total.target_adc + total.tolerance_adc
+    labels = [f"<{edges[0]:.0f}"]
+    marks = [" "]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        labels.append(f"{lo:.0f}")
+        marks.append("*" if limit_lo <= lo and hi <= limit_hi else " ")
+    labels.append(f">={edges[-1]:.0f}")
+    marks.append(" ")
+    width = max(len(label) for label in labels)
+    for label, mark, count in zip(labels, marks, counts):
+        bar = "#" * int(round(bar_width * count / peak))
+        rows.append(f"{label:>{width}}{mark}|{bar:<{bar_width}} {count}")
+    return "\n".join(rows)
@@ -2,9 +2,10 @@
 
 Responsibilities:
 - open/close serial connection
-- background reader thread that pushes incoming lines into a queue
+- background reader thread that pushes each received chunk into a queue
+    as (receive timestamp, list of complete lines)
 - background dispatcher thread that consumes the queue and forwards
-    lines to the application's dispatcher
+    batches of lines to the application's dispatcher
 
 The class keeps lightweight thread management: threads are stored and
 joined on close to avoid background threads lingering after shutdown.
@@ -18,6 +19,37 @@ import serial
 from serial import SerialException
 
 import config_utils
+from binary_framer import BinaryFramer
+from line_framer import LineFramer
+from receive_queue import ReceiveQueue
+from session_recorder import RECEIVED, SENT
+
+# Upper bound for a blocking serial read. The reader thread sleeps in the OS
+# until bytes arrive; the timeout only bounds how long a stop request waits.
+READ_TIMEOUT_S = 0.1
+
+# Queue marker that wakes the dispatcher thread up for shutdown
+_STOP = object()
+
+# Upper bound of lines handed to the dispatcher in one call, so reading
+# back a large spill does not build one huge batch
+MAX_BATCH_LINES = 50_000
+
+# Minimum seconds between two "receive queue full" terminal messages
+OVERLOAD_REPORT_S = 1.0
+
+# Handshake for binary DATA/TUNNEL records (see binary_framer)
+FORMAT_BINARY_CMD = "FORMAT,BINARY"
+FORMAT_BINARY_OK = "FORMAT,BINARY,OK"
+
+
+def _decode_errors(decoder):
+    """Dropped or corrupt input counted by a LineFramer/BinaryFramer."""
+    return (
+        decoder.overflows
+        + getattr(decoder, "crc_errors", 0)
+        + getattr(decoder, "lost", 0)
+    )
 
 
 class USBConnection:
@@ -28,7 +60,7 @@ class USBConnection:
         self.connection = None
         self.is_connected = False
         self.connection_established = False
-        self.data_queue = queue.Queue()
+        self.data_queue = self._create_queue()
         self.esp_to_queue = None
         self.waiting_for_idle = False
         self.running = False
@@ -38,11 +70,43 @@ class USBConnection:
         self.esp_thread = None
         self.port = config_utils.get_config("USB", "port")
         self.baudrate = config_utils.get_config("USB", "baudrate") or 460800
+        try:
+            max_line = int(config_utils.get_config("USB", "max_line_length", 4096))
+        except (TypeError, ValueError):
+            max_line = 4096
+        self.max_line_length = max_line if max_line > 0 else None
+        # Turns received bytes into lines; see set_decoder()
+        self.decoder = LineFramer(max_line_length=self.max_line_length)
+        self.binary_mode = False
+        self._format_reply = None
+        # FORMAT,BINARY was re-sent after a late answer (see _on_format_ok)
+        self._format_resent = False
+        # Optional SessionRecorder that tees all received and sent lines
+        self.recorder = None
+        # Optional PipelineMetrics updated per chunk and per batch
+        self.metrics = None
+        # (dropped, spilled) totals last shown in the terminal
+        self._overload_reported = (0, 0)
+        self._overload_time = 0.0
+
+    @staticmethod
+    def _create_queue():
+        """Bounded receive queue configured by [USB] queue_max_lines/queue_policy."""
+        try:
+            max_lines = int(config_utils.get_config("USB", "queue_max_lines", 200_000))
+        except (TypeError, ValueError):
+            max_lines = 200_000
+        policy = str(config_utils.get_config("USB", "queue_policy", "drop-oldest"))
+        try:
+            return ReceiveQueue(max_lines=max_lines, policy=policy.strip().lower())
+        except ValueError as e:
+            print(f"{e}; using drop-oldest")
+            return ReceiveQueue(max_lines=max_lines)
 
     def establish_connection(self):
         try:
             self.connection = serial.Serial(
-                self.port, self.baudrate, timeout=1, write_timeout=1
+                self.port, self.baudrate, timeout=READ_TIMEOUT_S, write_timeout=1
             )
             self.is_connected = True
             self.connection_established = True
@@ -87,6 +151,67 @@ class USBConnection:
             except Exception as e:
                 self.update_terminal(f"Error sending restart to ESP: {e}")
 
+    def set_decoder(self, decoder):
+        """Replace the byte-stream decoder used by the reader thread.
+
+        decoder: object with `feed(bytes) -> list of lines`, `reset()` and an
+        `overflows` counter, e.g. `LineFramer` or `BinaryFramer`. Switch
+        only while the device is idle: a partial line held by the old
+        decoder is dropped.
+        """
+        self.decoder = decoder
+
+    def set_recorder(self, recorder):
+        """Tee received and sent lines into `recorder` (None to stop)."""
+        self.recorder = recorder
+
+    def set_metrics(self, metrics):
+        """Report I/O counters and latencies to `metrics` (None to stop)."""
+        self.metrics = metrics
+
+    def negotiate_binary(self, timeout=0.5):
+        """Ask the firmware for binary DATA/TUNNEL records.
+
+        Sends FORMAT,BINARY and waits up to `timeout` seconds for
+        FORMAT,BINARY,OK. Without an answer the text protocol stays in use.
+        Call while the device is idle and receiving is running.
+        Returns True when binary records are enabled.
+
+        The binary decoder stays active after a timeout: it decodes text
+        lines exactly like LineFramer, so an answer that comes too late,
+        after which the device sends records, cannot desync the stream.
+        """
+        reply = threading.Event()
+        self._format_reply = reply
+        self._format_resent = False
+        # The binary decoder also handles text, so it can be active before the reply
+        self.set_decoder(BinaryFramer(max_line_length=self.max_line_length))
+        try:
+            ok = self.write_command(FORMAT_BINARY_CMD) and reply.wait(timeout)
+        finally:
+            self._format_reply = None
+        self.binary_mode = bool(ok)
+        return self.binary_mode
+
+    def _on_format_ok(self):
+        """FORMAT,BINARY,OK received (reader thread)."""
+        reply = self._format_reply
+        if reply is not None:
+            # negotiate_binary is waiting for it
+            reply.set()
+        elif self._format_resent:
+            self._format_resent = False
+            self.binary_mode = True
+            self.update_terminal("Binary scan data enabled")
+        elif not self.binary_mode:
+            # The answer came after negotiate_binary gave up: the device
+            # sends binary records now. Ask again and take the new answer
+            # as the confirmation.
+            print("USBConnection: late FORMAT,BINARY,OK, re-sending FORMAT,BINARY")
+            self.update_terminal("Late FORMAT,BINARY,OK: re-sending FORMAT,BINARY")
+            self._format_resent = True
+            self.write_command(FORMAT_BINARY_CMD)
+
     def start_receiving(self):
         if self.is_connected:
             self.start_esp_to_queue()
@@ -103,6 +228,9 @@ class USBConnection:
 
         try:
             self.connection.write((command + "\n").encode())
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.record(SENT, (command,))
             self.update_terminal(f"To STM: {command}")
             return True
         except serial.SerialTimeoutException as e:
@@ -128,25 +256,43 @@ class USBConnection:
         self.reading_thread.start()
 
     def read_queue_loop(self):
-        # Loop to read messages from the data queue and dispatch them
-        global STATUS
-        buffer = ""
+        # Block on the data queue and dispatch everything available in one batch
         while self.running:
-            while not self.data_queue.empty():
-                buffer += (
-                    self.data_queue.get() + "\n"
-                )  # Add newline to simulate complete lines
-                lines = buffer.split("\n")
-                buffer = lines.pop()  # Keep the last partial line in the buffer
-
-                if lines:
-                    self.dispatcher_callback("\n".join(lines))
-            # prevent busy-spin
-            time.sleep(0.01)
+            try:
+                item = self.data_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = []
+            oldest = None
+            stop = False
+            while True:
+                if item is _STOP:
+                    # stale markers from an earlier stop are ignored after restart
+                    stop = not self.running
+                else:
+                    # items are (perf_counter_ns when read, lines)
+                    received_ns, lines = item
+                    if oldest is None:
+                        oldest = received_ns
+                    batch.extend(lines)
+                if len(batch) >= MAX_BATCH_LINES:
+                    break
+                try:
+                    item = self.data_queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                metrics = self.metrics
+                if metrics is not None:
+                    metrics.dispatched(oldest, self.data_queue.qsize())
+                self.dispatcher_callback(batch)
+            if stop:
+                break
 
     def stop_read_queue(self):
-        # Stop the read queue loop
+        # Stop the read queue loop and wake it up if it is waiting
         self.running = False
+        self.data_queue.put(_STOP)
         # join thread to ensure clean stop
         try:
             if self.reading_thread:
@@ -169,32 +315,49 @@ class USBConnection:
 
     def esp_to_queue_loop(self):
         # Loop to read responses from the ESP device and put them in the data queue
-        buffer = ""
+        decoder = self.decoder
+        decoder.reset()
+        overflows = decoder.overflows
+        errors = _decode_errors(decoder)
         while self.receive_running:
             try:
-                # Read available data from the serial port
                 if not self.connection:
                     time.sleep(0.01)
                     continue
 
-                in_wait = 0
-                try:
-                    in_wait = self.connection.in_waiting
-                except Exception:
-                    in_wait = 0
-
-                if in_wait > 0:
-                    raw = self.connection.read(in_wait)
-                    try:
-                        buffer += raw.decode(errors="replace")
-                    except Exception:
-                        buffer += str(raw)
-                    lines = buffer.split("\n")
-                    buffer = lines.pop()  # Keep the last partial line in the buffer
-
-                    for line in lines:
-                        if line.strip():
-                            self.data_queue.put(line.strip())
+                # Blocks until data arrives or the read timeout expires
+                raw = self._read_available()
+                if self.decoder is not decoder:
+                    decoder = self.decoder
+                    overflows = decoder.overflows
+                    errors = _decode_errors(decoder)
+                if not raw:
+                    # quiet line: report drops the rate limit held back
+                    self._report_overload(force=True)
+                    continue
+                received_ns = time.perf_counter_ns()
+                # One queue item per chunk instead of one per line
+                lines = decoder.feed(raw)
+                if lines:
+                    recorder = self.recorder
+                    if recorder is not None:
+                        recorder.record(RECEIVED, lines)
+                    self.data_queue.put((received_ns, lines))
+                    if FORMAT_BINARY_OK in lines:
+                        self._on_format_ok()
+                    self._report_overload()
+                metrics = self.metrics
+                if metrics is not None:
+                    metrics.received(len(raw), len(lines), self.data_queue.qsize())
+                    total = _decode_errors(decoder)
+                    if total != errors:
+                        metrics.decode_error(total - errors)
+                        errors = total
+                if decoder.overflows != overflows:
+                    overflows = decoder.overflows
+                    self.update_terminal(
+                        f"Discarded overlong line from serial ({overflows} total)"
+                    )
             except Exception as e:
                 # Log the error, stop receiving and inform the UI
                 print(f"Error in esp_to_queue: {e}")
@@ -202,6 +365,46 @@ class USBConnection:
                 self.receive_running = False
                 break
 
+    def _report_overload(self, force=False):
+        """Show dropped and spilled line counts of the receive queue."""
+        data_queue = self.data_queue
+        state = (data_queue.dropped_total, data_queue.spilled)
+        if state == self._overload_reported:
+            return
+        now = time.monotonic()
+        if not force and now - self._overload_time < OVERLOAD_REPORT_S:
+            return
+        self._overload_reported = state
+        self._overload_time = now
+        dropped = ", ".join(f"{n} {t}" for t, n in sorted(data_queue.dropped.items()))
+        self.update_terminal(
+            f"Receive queue full ({data_queue.policy}): "
+            f"dropped {dropped or 'nothing'}, {data_queue.spilled} lines spilled to disk"
+        )
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.queue_overload(*state)
+
+    def _read_available(self):
+        """Block on the port until bytes arrive, then return the whole burst.
+
+        Returns b"" when the read timeout expires without data.
+        """
+        try:
+            waiting = self.connection.in_waiting
+        except Exception:
+            waiting = 0
+        raw = self.connection.read(waiting or 1)
+        if raw and not waiting:
+            # The first byte woke us up; pick up the rest of the burst too
+            try:
+                waiting = self.connection.in_waiting
+            except Exception:
+                waiting = 0
+            if waiting:
+                raw += self.connection.read(waiting)
+        return raw
+
     def stop_esp_to_queue(self):
         # Stop the ESP to queue loop
         self.receive_running = False
@@ -220,5 +423,7 @@ class USBConnection:
                 self.connection.close()
         except Exception:
             pass
+        # frees the spill file; nothing is left to dispatch once the threads stopped
+        self.data_queue.close()
         self.is_connected = False
         self.connection_established = False
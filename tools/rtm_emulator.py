@@ -0,0 +1,422 @@
+"""Pseudo-terminal emulator of the 500 EUR RTM firmware (Linux/macOS).
+
+Opens a pty pair and answers the serial protocol on the master side, so
+`USBConnection` can open the slave side (`emulator.port`) like a real
+ESP32 on /dev/ttyUSB0.
+
+Supported commands:
+- STOP                    -> IDLE (cancels a running stream)
+- PARAMETER,?             -> one PARAMETER,key,value line per parameter
+- PARAMETER,v1,...,v12    -> store all parameters (ParameterApp order)
+- PARAMETER,DEFAULT       -> restore the default parameters
+- FORMAT,BINARY           -> FORMAT,BINARY,OK, then DATA/TUNNEL as binary records
+- MEASURE [SIMULATE]      -> DATA,x,y,z over startX..maxX / startY..maxY,
+                             then DATA,DONE
+- TUNNEL[ SIMULATE],n     -> n x TUNNEL,flag,adc,z, then TUNNEL,DONE
+- ADJUST                  -> ADJUST,v,nA,raw stream until STOP
+- TIP,x,y,z               -> move the emulated tip (shifts ADJUST readings)
+- SINUS                   -> accepted, no output
+
+Usage as a module:
+
+    emu = RTMEmulator(speed=10, surface="atoms", noise=200)
+    emu.start()
+    conn.port = emu.port
+    ...
+    emu.stop()
+
+Usage from the command line (then point [USB] port at the printed path
+or at --link):
+
+    python tools/rtm_emulator.py --speed 5 --surface waves --link /tmp/ttyRTM
+"""
+
+import argparse
+import math
+import os
+import random
+import select
+import sys
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from binary_framer import KIND_DATA, KIND_TUNNEL, encode_record  # noqa: E402
+
+# Order used by ParameterApp when it sends PARAMETER,v1,...,v12
+PARAMETER_KEYS = [
+    "kP",
+    "kI",
+    "kD",
+    "targetNa",
+    "toleranceNa",
+    "startX",
+    "startY",
+    "measureMs",
+    "direction",
+    "maxX",
+    "maxY",
+    "multiplicator",
+]
+
+DEFAULT_PARAMETERS = {
+    "kP": "1.000",
+    "kI": "0.100",
+    "kD": "0.000",
+    "targetNa": "1.000",
+    "toleranceNa": "0.200",
+    "startX": "0",
+    "startY": "0",
+    "measureMs": "1",
+    "direction": "0",
+    "maxX": "199",
+    "maxY": "199",
+    "multiplicator": "1.000",
+}
+
+# ADC conversion, same defaults as config.ini [ADC_TO_NA]
+ADC_VOLTAGE_DIVIDER = 1000000.0
+ADC_VALUE_MAX = 65535.0
+ADC_VOLTAGE_MAX = 3.3
+
+
+def na_to_adc(na):
+    """Convert nA to ADC digits the way MasterGui.calculate_adc_value does."""
+    return int((float(na) / ADC_VOLTAGE_DIVIDER) * (ADC_VALUE_MAX / ADC_VOLTAGE_MAX))
+
+
+def _surface_plane(x, y):
+    return 12000 + 120 * x + 60 * y
+
+
+def _surface_waves(x, y):
+    return 32768 + 12000 * math.sin(x / 9.0) * math.cos(y / 13.0)
+
+
+def _surface_steps(x, y):
+    return 8000 + 9000 * ((x + y // 2) // 40)
+
+
+def _surface_atoms(x, y, spacing=12.0, width=3.5, height=20000):
+    # hexagonal lattice of gaussian bumps
+    row = round(y / (spacing * 0.866))
+    cy = row * spacing * 0.866
+    cx = round((x - (row % 2) * spacing / 2) / spacing) * spacing + (row % 2) * spacing / 2
+    d2 = (x - cx) ** 2 + (y - cy) ** 2
+    return 20000 + height * math.exp(-d2 / (2 * width * width))
+
+
+SURFACES = {
+    "plane": _surface_plane,
+    "waves": _surface_waves,
+    "steps": _surface_steps,
+    "atoms": _surface_atoms,
+}
+
+
+class RTMEmulator:
+    """Device emulator on a pty pair.
+
+    Parameters
+    - binary: answer the FORMAT,BINARY handshake (False emulates old firmware)
+    - format_delay: seconds before the first FORMAT,BINARY answer (a busy device)
+    - rate: DATA/TUNNEL points per second (None = as fast as the host reads)
+    - speed: alternative to `rate`, multiple of the real hardware rate of
+      one point per `measureMs`
+    - surface: name in SURFACES or callable(x, y) -> height
+    - noise: standard deviation of gaussian noise on heights and ADC values
+    - adjust_hz: ADJUST readings per second
+    - chunk: points per write to the pty
+    - seed: random seed for reproducible noise
+    """
+
+    def __init__(
+        self,
+        binary=True,
+        format_delay=0.0,
+        rate=None,
+        speed=None,
+        surface="waves",
+        noise=0.0,
+        adjust_hz=20.0,
+        chunk=64,
+        seed=0,
+    ):
+        self.binary_supported = binary
+        self.format_delay = format_delay
+        self.rate = rate
+        self.speed = speed
+        self.surface = SURFACES[surface] if isinstance(surface, str) else surface
+        self.noise = noise
+        self.adjust_hz = adjust_hz
+        self.chunk = chunk
+        self.parameters = dict(DEFAULT_PARAMETERS)
+        self.tip = (0, 0, 32768)
+        self.binary = False
+        self.bytes_sent = 0
+        self.points_sent = 0
+        self.commands = []
+        self._rng = random.Random(seed)
+        self.master_fd, self._slave_fd = os.openpty()
+        tty.setraw(self._slave_fd)
+        self.port = os.ttyname(self._slave_fd)
+        self._running = False
+        self._thread = None
+        self._job = None
+        self._cancel = threading.Event()
+        self._write_lock = threading.Lock()
+        self._seq = 0
+
+    # lifecycle
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._command_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._cancel_job()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        for fd in (self.master_fd, self._slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def points_per_second(self):
+        """Effective DATA/TUNNEL rate, or None when unthrottled."""
+        if self.rate:
+            return float(self.rate)
+        if self.speed:
+            try:
+                ms = max(1.0, float(self.parameters.get("measureMs", 1)))
+            except ValueError:
+                ms = 1.0
+            return self.speed * 1000.0 / ms
+        return None
+
+    # I/O
+    def _write(self, data):
+        with self._write_lock:
+            view = memoryview(data)
+            while view:
+                n = os.write(self.master_fd, view)
+                view = view[n:]
+            self.bytes_sent += len(data)
+
+    def _send_line(self, line):
+        self._write((line + "\n").encode())
+
+    def _command_loop(self):
+        buffer = b""
+        while self._running:
+            try:
+                ready, _, _ = select.select([self.master_fd], [], [], 0.1)
+                if not ready:
+                    continue
+                buffer += os.read(self.master_fd, 4096)
+            except OSError:
+                break
+            *lines, buffer = buffer.split(b"\n")
+            for raw in lines:
+                line = raw.decode(errors="replace").strip()
+                if line:
+                    self.commands.append(line)
+                    self.handle_command(line)
+
+    # protocol
+    def handle_command(self, line):
+        name, _, arg = line.partition(",")
+        name = name.split(" ")[0].upper()
+        if name == "STOP":
+            self._cancel_job()
+            self._send_line("IDLE")
+        elif name == "PARAMETER":
+            self._parameter(arg)
+        elif name == "FORMAT":
+            if self.binary_supported and arg.upper() == "BINARY":
+                if self.format_delay:
+                    delay, self.format_delay = self.format_delay, 0.0
+                    time.sleep(delay)
+                self.binary = True
+                self._send_line("FORMAT,BINARY,OK")
+        elif name == "MEASURE":
+            self._start_job(self._measure)
+        elif name == "TUNNEL":
+            try:
+                count = int(arg)
+            except ValueError:
+                count = 100
+            self._start_job(self._tunnel, count)
+        elif name == "ADJUST":
+            self._start_job(self._adjust)
+        elif name == "TIP":
+            try:
+                x, y, z = (int(v) for v in arg.split(","))
+                self.tip = (x, y, z)
+            except ValueError:
+                pass
+
+    def _parameter(self, arg):
+        if arg == "?":
+            self._write(
+                "".join(
+                    f"PARAMETER,{key},{self.parameters[key]}\n" for key in PARAMETER_KEYS
+                ).encode()
+            )
+        elif arg.upper() == "DEFAULT":
+            self.parameters = dict(DEFAULT_PARAMETERS)
+        else:
+            values = arg.split(",")
+            if len(values) == len(PARAMETER_KEYS):
+                self.parameters.update(zip(PARAMETER_KEYS, values))
+
+    def _param_int(self, key):
+        try:
+            return int(float(self.parameters.get(key, DEFAULT_PARAMETERS[key])))
+        except ValueError:
+            return int(DEFAULT_PARAMETERS[key])
+
+    def _start_job(self, fn, *args):
+        self._cancel_job()
+        self._cancel.clear()
+        self._job = threading.Thread(target=fn, args=args, daemon=True)
+        self._job.start()
+
+    def _cancel_job(self):
+        self._cancel.set()
+        job = self._job
+        if job and job is not threading.current_thread():
+            job.join(timeout=1.0)
+        self._job = None
+
+    def _encode_points(self, kind, points):
+        if self.binary:
+            out = bytearray()
+            for a, b, c in points:
+                out += encode_record(kind, self._seq, a, b, c)
+                self._seq = (self._seq + 1) & 0xFFFF
+            return bytes(out)
+        prefix = "DATA" if kind == KIND_DATA else "TUNNEL"
+        return "".join(f"{prefix},{a},{b},{c}\n" for a, b, c in points).encode()
+
+    def _stream(self, kind, points):
+        """Send points in chunks, paced to points_per_second(). False if cancelled."""
+        rate = self.points_per_second()
+        t0 = time.perf_counter()
+        sent = 0
+        batch = []
+        for point in points:
+            batch.append(point)
+            if len(batch) < self.chunk:
+                continue
+            if self._cancel.is_set():
+                return False
+            self._write(self._encode_points(kind, batch))
+            sent += len(batch)
+            self.points_sent += len(batch)
+            batch = []
+            if rate:
+                delay = t0 + sent / rate - time.perf_counter()
+                if delay > 0 and self._cancel.wait(delay):
+                    return False
+        if self._cancel.is_set():
+            return False
+        if batch:
+            self._write(self._encode_points(kind, batch))
+            self.points_sent += len(batch)
+        return True
+
+    def _noisy(self, value):
+        if self.noise:
+            value += self._rng.gauss(0.0, self.noise)
+        return value
+
+    def _measure(self):
+        x0, x1 = self._param_int("startX"), self._param_int("maxX")
+        y0, y1 = self._param_int("startY"), self._param_int("maxY")
+        surface = self.surface
+
+        def points():
+            for y in range(y0, y1 + 1):
+                for x in range(x0, x1 + 1):
+                    z = int(self._noisy(surface(x, y)))
+                    yield x, y, min(0xFFFF, max(0, z))
+
+        if self._stream(KIND_DATA, points()):
+            self._send_line("DATA,DONE")
+
+    def _tunnel(self, count):
+        target = na_to_adc(self.parameters["targetNa"])
+        tolerance = na_to_adc(self.parameters["toleranceNa"])
+        z = self.tip[2]
+
+        def points():
+            nonlocal z
+            for _ in range(count):
+                adc = int(round(self._noisy(target)))
+                flag = 1 if abs(adc - target) <= tolerance else 0
+                # the controller nudges z against the deviation
+                z = min(0xFFFF, max(0, z + (target - adc) // 4))
+                yield flag, adc & 0xFFFF, z
+
+        if self._stream(KIND_TUNNEL, points()):
+            self._send_line("TUNNEL,DONE")
+
+    def _adjust(self):
+        period = 1.0 / self.adjust_hz if self.adjust_hz else 0.05
+        while not self._cancel.wait(period):
+            raw = int(self._noisy(self.tip[2] // 2))
+            raw = min(0x7FFF, max(0, raw))
+            volts = raw * ADC_VOLTAGE_MAX / ADC_VALUE_MAX
+            na = volts * ADC_VOLTAGE_DIVIDER  # inverse of na_to_adc
+            self._send_line(f"ADJUST,{volts:.4f},{int(na)},{raw}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="500 EUR RTM firmware emulator on a pty")
+    parser.add_argument("--rate", type=float, help="points per second (default: unthrottled)")
+    parser.add_argument("--speed", type=float, help="multiple of real hardware speed")
+    parser.add_argument("--surface", choices=sorted(SURFACES), default="waves")
+    parser.add_argument("--noise", type=float, default=0.0, help="gaussian noise sigma")
+    parser.add_argument("--adjust-hz", type=float, default=20.0)
+    parser.add_argument("--no-binary", action="store_true", help="ignore FORMAT,BINARY")
+    parser.add_argument(
+        "--format-delay", type=float, default=0.0, help="seconds before the first FORMAT,BINARY answer"
+    )
+    parser.add_argument("--link", help="create a symlink to the pty, e.g. /tmp/ttyRTM")
+    args = parser.parse_args()
+
+    emu = RTMEmulator(
+        binary=not args.no_binary,
+        format_delay=args.format_delay,
+        rate=args.rate,
+        speed=args.speed,
+        surface=args.surface,
+        noise=args.noise,
+        adjust_hz=args.adjust_hz,
+    ).start()
+    port = emu.port
+    if args.link:
+        if os.path.islink(args.link):
+            os.remove(args.link)
+        os.symlink(emu.port, args.link)
+        port = args.link
+    print(f"RTM emulator listening on {port} (Ctrl+C to quit)")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emu.stop()
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+
+
+if __name__ == "__main__":
+    main()
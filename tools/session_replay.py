@@ -0,0 +1,82 @@
+"""Inspect and replay recorded serial sessions (`sessions/*.stmrec`).
+
+    python tools/session_replay.py info sessions/session_2024-01-01_12-00-00.stmrec
+    python tools/session_replay.py replay SESSION --speed 10 [--start 30]
+
+`info` prints the duration and line counts per message type. `replay`
+pushes the session through `ReplaySource` at the given speed (0 = as fast
+as possible) into a counting dispatcher and reports the achieved rate.
+`--start` skips the first N seconds using the session index.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from message_router import message_type  # noqa: E402
+from session_recorder import RECEIVED, ReplaySource, SessionReader  # noqa: E402
+
+
+def info(path):
+    counts = Counter()
+    sent = 0
+    first = last = None
+    with SessionReader(path) as reader:
+        for t_ns, direction, line in reader:
+            if first is None:
+                first = t_ns
+            last = t_ns
+            if direction == RECEIVED:
+                counts[message_type(line)] += 1
+            else:
+                sent += 1
+    duration = (last - first) / 1e9 if first is not None else 0.0
+    print(f"{path}: {duration:.1f} s, {sum(counts.values())} received, {sent} sent")
+    for msg_type, count in counts.most_common():
+        print(f"  {msg_type:<12} {count:>10}")
+
+
+def replay(path, speed, start_s):
+    counts = Counter()
+
+    def dispatcher(lines):
+        for line in lines:
+            counts[message_type(line)] += 1
+
+    start_ns = None
+    if start_s:
+        with SessionReader(path) as reader:
+            first = reader.first_timestamp()
+        if first is not None:
+            start_ns = first + int(start_s * 1e9)
+    source = ReplaySource(path, dispatcher, speed=speed, start_ns=start_ns)
+    t0 = time.perf_counter()
+    source.run()
+    elapsed = time.perf_counter() - t0
+    print(f"replayed {source.lines} lines in {elapsed:.2f} s ({source.lines / max(elapsed, 1e-9):.0f} lines/s)")
+    for msg_type, count in counts.most_common():
+        print(f"  {msg_type:<12} {count:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay serial sessions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_info = sub.add_parser("info")
+    p_info.add_argument("path")
+    p_replay = sub.add_parser("replay")
+    p_replay.add_argument("path")
+    p_replay.add_argument("--speed", type=float, default=1.0, help="0 = max speed")
+    p_replay.add_argument("--start", type=float, default=0.0, help="skip seconds")
+    args = parser.parse_args()
+    if args.command == "info":
+        info(args.path)
+    else:
+        replay(args.path, args.speed, args.start)
+
+
+if __name__ == "__main__":
+    main()